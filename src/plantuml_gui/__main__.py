@@ -22,8 +22,59 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+"""``python -m plantuml_gui`` runs the Flask development server and
+``python -m plantuml_gui serve`` the pre-fork production server."""
+
+import argparse
+import os
 
 from .app import app
+from .server import (
+    DEFAULT_GRACEFUL_TIMEOUT,
+    DEFAULT_THREADS,
+    DEFAULT_WORKERS,
+    serve,
+)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m plantuml_gui")
+    commands = parser.add_subparsers(dest="command")
+    serve_command = commands.add_parser(
+        "serve", help="run the multi-process production server"
+    )
+    serve_command.add_argument(
+        "--host", default=os.environ.get("PLANTUML_HOST", "127.0.0.1")
+    )
+    serve_command.add_argument(
+        "--port", type=int, default=int(os.environ.get("PLANTUML_PORT", 5000))
+    )
+    serve_command.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.environ.get("PLANTUML_WORKERS", DEFAULT_WORKERS)),
+        help="worker processes (default %(default)s)",
+    )
+    serve_command.add_argument(
+        "--threads",
+        type=int,
+        default=int(os.environ.get("PLANTUML_THREADS", DEFAULT_THREADS)),
+        help="request threads per worker (default %(default)s)",
+    )
+    serve_command.add_argument(
+        "--graceful-timeout",
+        type=float,
+        default=float(
+            os.environ.get("PLANTUML_GRACEFUL_TIMEOUT", DEFAULT_GRACEFUL_TIMEOUT)
+        ),
+        help="seconds a stopping worker may finish its requests (default %(default)s)",
+    )
+    args = parser.parse_args(argv)
+    if args.command == "serve":
+        serve(args.host, args.port, args.workers, args.threads, args.graceful_timeout)
+    else:
+        app.run(debug=True)
+
 
 if __name__ == "__main__":
-    app.run(debug=True)
+    main()
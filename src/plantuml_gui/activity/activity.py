@@ -24,73 +24,41 @@
 
 import re
 
-from pyquery import PyQuery as Pq  # pragma: no cover
+from ..shared.label_counters import next_label
+from .classes import RectElement, SvgChunk
+from .structure import activity_structure
+from .svg_index import SvgNode, memoized, svg_index, text_run
+from .util import SvgChunkList, chunk_ordinal
 
-from .classes import RectElement, SvgChunk, TextElement
+
+def activity_rects(svg) -> list[SvgNode]:
+    """Return the rect of every activity box, in SVG order."""
+    return [
+        rect
+        for rect in svg_index(svg).rects
+        if rect.numbers.get("height", 0) > 6
+        and rect.attrs.get("style") == "stroke:#181818;stroke-width:0.5;"
+    ]  # check that the rect is an activity and not a fork bar
 
 
 def index_of_clicked_activity(svg, clickedelement):
-    count = 0
-    d = Pq(svg)
-
-    rects = d("rect")
-    for rect in rects:
-        if (
-            float(rect.get("height")) > 6
-            and rect.get("style") == "stroke:#181818;stroke-width:0.5;"
-        ):  # check that the rect is an activity and not a fork bar
-            rect = Pq(rect)  # rect svg is self closing, so no </rect> is in this.
-            rect_svg = str(rect)
-            rect_svg = rect_svg[:-2] + "></rect>"
-            rect_obj = RectElement.from_svg(rect_svg)
-            count += 1
-            if rect_obj == clickedelement:
-                break
-    return count
+    return chunk_ordinal(svgtochunklist(svg), clickedelement)
 
 
 def activity_indices(lines, i) -> list[int]:
-    return _activity_indices(lines, i)[0]
-
+    """Return the first line of every activity from line ``i`` on, in SVG order.
 
-def _activity_indices(lines, i) -> tuple[list[int], int]:
-    index = i
-    indices = []
-    backward = -1
-
-    while index < len(lines):
-        line = lines[index]
-        clean_line = line.strip()
-
-        if (
-            clean_line.startswith("#") and not clean_line.endswith(")")
-        ) or clean_line.startswith(":"):
-            indices.append(index)
-
-        if clean_line.startswith("backward"):
-            backward = index
-
-        if clean_line == "repeat":
-            rlist, index = _activity_indices(lines, index + 1)
-            indices += rlist
-        if clean_line.startswith("repeat while") or clean_line.startswith(
-            "repeatwhile"
-        ):
-            indices.append(backward)
-            return indices, index
-        index += 1
-    return indices, index
+    A repeat's backward activity is drawn when its loop closes (-1 when the
+    repeat has none).
+    """
+    return [
+        index + i if index != -1 else -1
+        for index in activity_structure(lines[i:]).activities
+    ]
 
 
 def find_activity_start(lines, count) -> int:
-    indices = activity_indices(lines, 0)
-    start = -1
-    for index in indices:
-        if count == 1:
-            start = index
-            break
-        count -= 1
-    return start
+    return activity_structure(lines).activity_start(count)
 
 
 def find_activity_end(lines, start) -> int:
@@ -208,18 +176,7 @@ def add_arrow_label(puml, svg, where, clickedelement):
     lines = puml.splitlines()
     start, end = find_full_bounds(puml, svg, clickedelement)
 
-    # Find all existing arrow labels in the format "-> Arrow label x;" where x is an integer.
-    arrow_label_numbers = []
-    for line in lines:
-        match = re.search(r"-> Arrow label (\d+);", line)
-        if match:
-            arrow_label_numbers.append(int(match.group(1)))
-
-    # Determine the next arrow label number
-    if arrow_label_numbers:
-        next_label_number = max(arrow_label_numbers) + 1
-    else:
-        next_label_number = 1
+    next_label_number = next_label(puml, "arrow_label")
 
     # Insert the arrow label at the correct position
     if where == "above":
@@ -230,49 +187,15 @@ def add_arrow_label(puml, svg, where, clickedelement):
     return "\n".join(lines)
 
 
-def svgtochunklist(svg: str) -> list[SvgChunk]:
-    chunks = []
-    d = Pq(svg)
-
-    rects = d("rect")
-    for rect in rects:
-        if (
-            float(rect.get("height")) > 6
-            and rect.get("style") == "stroke:#181818;stroke-width:0.5;"
-        ):  # check that the rect is an activity and not a fork bar
-            rect = Pq(rect)  # rect svg is self-closing, so no </rect> is in this.
-            rect_svg = str(rect)
-            rect_svg = rect_svg[:-2] + "></rect>"
-            rect_obj = RectElement.from_svg(rect_svg)
-
-            text_elements = []
-            next_elem = rect.next()
-
-            # Unified handling for both 'text' and 'a' elements
-            while next_elem and next_elem[0].tag in {"text", "a"}:
-                if next_elem[0].tag == "text":
-                    # Handle text elements as before
-                    element = TextElement.from_svg(next_elem)
-                    next_elem = next_elem.next()
-                elif next_elem[0].tag == "a":
-                    # Handle 'a' elements similarly to text
-                    link_href = next_elem[0].get("href")
-                    link_text = next_elem[0].find("text").text
-
-                    # Create a temporary TextElement for the <a> tag, excluding the link text itself from the label
-                    element = TextElement(
-                        label=f"[[{link_href} {link_text}]]",
-                        x=float(next_elem[0].find("text").get("x")),
-                        y=float(next_elem[0].find("text").get("y")),
-                    )
-                    next_elem = next_elem.next()
-
-                # Append to the text elements list
-                text_elements.append(element)
-
-            chunks.append(SvgChunk(object=rect_obj, text_elements=text_elements))
-
-    return chunks
+def svgtochunklist(svg: str) -> SvgChunkList:
+    return memoized(
+        svg,
+        "activity_chunks",
+        lambda _: SvgChunkList(
+            SvgChunk(object=rect.element, text_elements=text_run(rect))
+            for rect in activity_rects(svg)
+        ),
+    )
 
 
 def svgchunktotext(svgchunklist: list[SvgChunk], clickedsvg: RectElement):
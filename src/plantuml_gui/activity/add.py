@@ -23,9 +23,10 @@
 # SOFTWARE.
 
 
-import re
 from typing import Literal
 
+from ..shared.label_counters import next_label
+
 
 def add(
     puml: str,
@@ -47,18 +48,7 @@ def add(
     lines = puml.splitlines()
 
     if type == "activity":
-        activity_numbers = []
-        for line in lines:
-            match = re.search(r":Activity (\d+)", line)
-            if match:
-                activity_numbers.append(int(match.group(1)))
-
-        if activity_numbers:
-            next_activity_number = max(activity_numbers) + 1
-        else:
-            next_activity_number = 1
-
-        lines.insert(index, f":Activity {next_activity_number};")
+        lines.insert(index, f":Activity {next_label(puml, 'activity')};")
 
     if type == "connector":
         lines.insert(index, "(C)")
@@ -24,23 +24,20 @@
 
 import re
 
-from pyquery import PyQuery as Pq  # pragma: no cover
+from .classes import PolyElement
+from .svg_index import svg_index
 
 
 def svgtoarrowtext(svg, clickedelement):  # works for arrows and switch condition text
     text = []
-    d = Pq(svg)
-
-    polys = d("polygon")
-    for poly in polys:
-        poly = Pq(poly)
-        poly_svg = str(poly)
-        poly_svg = poly_svg[:-2] + "></polygon>"
-        if poly_svg == clickedelement:
-            next_elem = poly.next()
-            while next_elem and next_elem[0].tag == "text":
-                text.append(next_elem.text())
-                next_elem = next_elem.next()
+    clicked = PolyElement.from_svg(clickedelement)
+
+    for poly in svg_index(svg).polygons:
+        if poly.element == clicked:
+            next_elem = poly.next
+            while next_elem is not None and next_elem.tag == "text":
+                text.append(next_elem.element.label)
+                next_elem = next_elem.next
     return "\n".join(text)
 
 
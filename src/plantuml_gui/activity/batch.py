@@ -0,0 +1,225 @@
+# SPDX-License-Identifier: MIT
+#
+# MIT License
+#
+# Copyright (c) 2026 Ericsson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""Several activity edits applied to one puml in a single request.
+
+Bulk cleanup (deleting ten activities, renaming every note) would otherwise
+be one edit request per element, each uploading the diagram and waiting for
+a render before the next click. ``run_batch()`` applies a list of
+operations, named and shaped like the edit routes' requests, in order.
+Every step runs the route itself against the SVG of the base puml, so the
+SVG is parsed and indexed once and only the final puml is rendered.
+
+A shape stops matching its element once an earlier step adds or removes
+elements of its kind before it. Each clicked shape is therefore resolved to
+the puml line it was drawn from before the first step, that line is moved
+through the lines each step changes, and the step gets the base SVG's
+shape with the ordinal the line has by then. Clicks that do not identify
+an element by position (arrows, found by their label) are passed on as
+they are, as are the ``line`` fields of the fork routes once moved.
+"""
+
+import re
+
+from flask import current_app
+from werkzeug.exceptions import HTTPException
+
+from ..shared.line_delta import edit_routes, line_delta, moved_line
+from .classes import Ellipse, PathElement, PolyElement, RectElement
+from .element_map import Shape, activity_shapes
+from .structure import Structure, activity_structure, edited_structure
+
+# The Structure order each kind of shape counts its ordinal in.
+_ORDERS = {
+    "activity": "activities",
+    "if": "statements",
+    "while": "whiles",
+    "ellipse": "ellipses",
+    "connector": "connectors",
+    "fork": "fork_bars",
+    "note": "notes",
+    "group": "groups",
+    "merge": "merges",
+}
+_PARSERS = {
+    "rect": RectElement.from_svg,
+    "polygon": PolyElement.from_svg,
+    "ellipse": Ellipse.from_svg,
+    "path": PathElement.from_svg,
+}
+_SHAPE_TAG = re.compile(r"<(rect|polygon|ellipse|path)\b")
+# Request fields that describe the batch rather than a step.
+_BATCH_FIELDS = ("endpoint", "document", "revision", "trimlines", "delta")
+# What an edit route raises when the puml and the click do not agree.
+_STEP_ERRORS = (
+    AttributeError,
+    IndexError,
+    KeyError,
+    TypeError,
+    UnboundLocalError,
+    ValueError,
+)
+
+
+class BatchError(Exception):
+    """An operation of a batch could not be applied; no edit is kept."""
+
+    def __init__(self, index: int, message: str):
+        super().__init__(message)
+        self.index = index
+
+
+def run_batch(puml: str, fragment: str, operations: list[dict]) -> str:
+    """Apply ``operations`` to ``puml`` in order and return the result.
+
+    ``fragment`` is the SVG markup ``puml`` was rendered to. Each operation
+    is an edit route's request body plus ``endpoint``, the route's name
+    (``"deleteActivity"``); ``plantuml`` and ``svg`` are filled in. Raises
+    BatchError naming the first operation that fails.
+    """
+    shapes = activity_shapes(fragment)
+    ordinals = {shape: (kind, ordinal) for kind, ordinal, shape in shapes}
+    by_kind: dict[str, list[Shape]] = {}
+    for kind, _, shape in shapes:
+        by_kind.setdefault(kind, []).append(shape)
+
+    base = activity_structure(puml.splitlines())
+    targets: list[tuple[str, int | None] | None] = [
+        _target(base, ordinals, operation) for operation in operations
+    ]
+    lines: list[int | None] = [
+        operation.get("line") if isinstance(operation.get("line"), int) else None
+        for operation in operations
+    ]
+
+    current = puml
+    for index, operation in enumerate(operations):
+        view = _view(index, operation)
+        body = {
+            name: value
+            for name, value in operation.items()
+            if name not in _BATCH_FIELDS
+        }
+        body["plantuml"] = current
+        body["svg"] = fragment
+        target = targets[index]
+        if target is not None:
+            kind, line = target
+            body["svgelement"] = _markup(
+                index, by_kind[kind], _ordinal(index, current, kind, line)
+            )
+        if "line" in body and isinstance(body["line"], int):
+            if lines[index] is None:
+                raise BatchError(index, "its line was removed by an earlier operation")
+            body["line"] = lines[index]
+
+        path = "/" + str(operation["endpoint"])
+        with current_app.test_request_context(path, method="POST", json=body):
+            try:
+                edited = view()
+            except _STEP_ERRORS as error:
+                raise BatchError(index, f"{operation['endpoint']} failed: {error!r}")
+        if not isinstance(edited, str):
+            raise BatchError(index, f"{operation['endpoint']} did not return puml")
+
+        ops = line_delta(current, edited)
+        for later in range(index + 1, len(operations)):
+            target = targets[later]
+            if target is not None and target[1] is not None:
+                targets[later] = (target[0], moved_line(target[1], ops))
+            fork_line = lines[later]
+            if fork_line is not None:
+                lines[later] = moved_line(fork_line, ops)
+        edited_structure(current.splitlines(), edited.splitlines())
+        current = edited
+    return current
+
+
+def _view(index: int, operation: dict):
+    """Return the activity edit route ``operation["endpoint"]`` names."""
+    path = f"/{operation.get('endpoint')}"
+    try:
+        endpoint, _ = current_app.url_map.bind("").match(path, method="POST")
+    except HTTPException:
+        endpoint = None
+    view = current_app.view_functions.get(endpoint) if endpoint else None
+    if (
+        view is None
+        or not endpoint.startswith("activity.")
+        or edit_routes.get(view, "") is not None
+        or path == "/batch"
+    ):
+        raise BatchError(index, f"{path} is not an activity edit route")
+    return view
+
+
+def _target(
+    structure: Structure, ordinals: dict[Shape, tuple[str, int]], operation: dict
+) -> tuple[str, int | None] | None:
+    """Return the kind of the clicked shape and the line it was drawn from.
+
+    None when the click does not identify an element by its position.
+    """
+    markup = operation.get("svgelement")
+    if not isinstance(markup, str):
+        return None
+    match = _SHAPE_TAG.search(markup)
+    if match is None:
+        return None
+    try:
+        shape = _PARSERS[match.group(1)](markup)
+    except (TypeError, ValueError, AttributeError):
+        return None
+    if shape not in ordinals:
+        return None
+    kind, ordinal = ordinals[shape]
+    order = getattr(structure, _ORDERS[kind])
+    if ordinal > len(order) or order[ordinal - 1] < 0:
+        return None
+    return kind, order[ordinal - 1]
+
+
+def _ordinal(index: int, puml: str, kind: str, line: int | None) -> int:
+    """Return the ordinal the element drawn from ``line`` has in ``puml``."""
+    order = getattr(activity_structure(puml.splitlines()), _ORDERS[kind])
+    if line is None or line not in order:
+        raise BatchError(
+            index, f"the clicked {kind} was removed by an earlier operation"
+        )
+    return order.index(line) + 1
+
+
+def _markup(index: int, shapes: list[Shape], ordinal: int) -> str:
+    """Return markup for the ``ordinal``-th shape of a kind in the base SVG."""
+    if ordinal > len(shapes):
+        raise BatchError(index, "the clicked element is not drawn in the base SVG")
+    shape = shapes[ordinal - 1]
+    if isinstance(shape, RectElement):
+        return f'<rect x="{shape.x}" y="{shape.y}"></rect>'
+    if isinstance(shape, PolyElement):
+        return f'<polygon points="{shape.points}"></polygon>'
+    if isinstance(shape, PathElement):
+        return f'<path d="{shape.d}"></path>'
+    return f'<ellipse cx="{shape.cx}" cy="{shape.cy}"></ellipse>'
@@ -24,32 +24,26 @@
 
 import re
 
-from pyquery import PyQuery as Pq
+from .classes import SvgChunk
+from .structure import activity_structure
+from .svg_index import SvgIndex, memoized
+from .util import SvgChunkList, index_of_clicked_element  # pragma: no cover
 
-from .classes import Ellipse, SvgChunk
-from .util import index_of_clicked_element  # pragma: no cover
 
+def svgtochunklistconnector(svg) -> SvgChunkList:
+    return memoized(svg, "connector_chunks", _connector_chunks)
 
-def svgtochunklistconnector(svg):
-    chunks = []
-    d = Pq(svg)
 
-    ellipses = d("ellipse")
-    for ellipse in ellipses:
-        ellipse = Pq(
-            ellipse
-        )  # ellipse svg is self closing, so no </ellipse> is in this.
-        ellipse_svg = str(ellipse)
-        ellipse_svg = ellipse_svg[:-2] + "></ellipse>"
-        ellipse_obj = Ellipse.from_svg(ellipse_svg)
-
-        next_elem = ellipse.next()
+def _connector_chunks(index: SvgIndex) -> SvgChunkList:
+    chunks = SvgChunkList()
+    for ellipse in index.ellipses:
+        next_elem = ellipse.next
         if (
-            next_elem
-            and next_elem[0].tag == "path"
-            and next_elem[0].get("fill") == "#000000"
-        ):
-            chunks.append(SvgChunk(object=ellipse_obj, text_elements=[]))
+            next_elem is not None
+            and next_elem.tag == "path"
+            and next_elem.attrs.get("fill") == "#000000"
+        ):  # the connector's letter is drawn as a black path
+            chunks.append(SvgChunk(object=ellipse.element, text_elements=[]))
     return chunks
 
 
@@ -61,48 +55,26 @@ def delete_connector(puml, svgchunklist, clickedelement):
 
 
 def get_index_connector(puml, svgchunklist, clickedelement, where) -> tuple[int, int]:
-    index = 0
+    """Return the clicked connector's line and, "below" it, its note and detach."""
     count = index_of_clicked_element(svgchunklist, clickedelement)
     lines = puml.splitlines()
-    for index, line in enumerate(lines):
-        clean_line = line.strip()
-        if clean_line.startswith("(") or (
-            clean_line.startswith("#") and clean_line.endswith(")")
-        ):
-            count -= 1
-        if count == 0:
-            if clean_line.startswith("(") or (
-                clean_line.startswith("#") and clean_line.endswith(")")
-            ):
-                start = index
-                if where == "below":
-                    if lines[index + 1].startswith("note"):
-                        while lines[index] != "end note":
-                            index += 1
-                    if lines[index + 1] == "detach":
-                        index += 1
-                    break
-    end = index
-    return start, end
+    start = activity_structure(lines).connector_line(count)
+    if start == -1:
+        raise ValueError(f"no connector for ordinal {count}")
+    index = start
+    if where == "below":
+        if lines[index + 1].startswith("note"):
+            while lines[index] != "end note":
+                index += 1
+        if lines[index + 1] == "detach":
+            index += 1
+    return start, index
 
 
 def find_index_connector(puml, svgchunklist, clickedelement):
-    index = 0
     count = index_of_clicked_element(svgchunklist, clickedelement)
-    lines = puml.splitlines()
-    while index < len(lines):
-        line = lines[index]
-        clean_line = line.strip()
-        if clean_line.startswith("(") or (
-            clean_line.startswith("#") and clean_line.endswith(")")
-        ):
-            count -= 1
-        if count == 0:
-            if clean_line.startswith("(") or (
-                clean_line.startswith("#") and clean_line.endswith(")")
-            ):
-                return index + 1
-        index += 1
+    index = activity_structure(puml.splitlines()).connector_line(count)
+    return index + 1 if index != -1 else None
 
 
 def detach_connector(puml, svgchunklist, clickedelement):
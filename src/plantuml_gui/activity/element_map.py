@@ -0,0 +1,116 @@
+# SPDX-License-Identifier: MIT
+#
+# MIT License
+#
+# Copyright (c) 2026 Ericsson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""The clickable shapes of a rendered activity diagram and their lookups.
+
+``activity_shapes()`` lists every clickable shape with its kind and its
+ordinal among shapes of that kind, the count the element modules derive
+from a click on it.
+
+``prepare_activity_lookups()`` builds, when a render is stored, the
+tables the element modules resolve a click through: the puml's structure
+and the ordinal of every shape of every kind, so the edit requests that
+follow find them cached.
+"""
+
+from ..shared.documents import editor_text
+from .activity import svgtochunklist
+from .classes import Ellipse, PathElement, PolyElement, RectElement
+from .connector import svgtochunklistconnector
+from .ellipse import svgtochunklistellipse
+from .fork import svgtochunklistfork
+from .group import group_ordinals, group_paths
+from .if_statements import svgtochunklistpolygon
+from .merge import merge_ordinals, merge_polygons
+from .note import note_ordinals, note_paths
+from .structure import activity_structure, edited_structure
+from .util import checkifwhile, chunk_ordinals, is_statement_chunk, is_while_chunk
+
+Shape = RectElement | PolyElement | Ellipse | PathElement
+
+
+def activity_shapes(fragment: str) -> list[tuple[str, int, Shape]]:
+    """List every clickable shape of ``fragment`` as (kind, ordinal, shape).
+
+    The ordinal is the shape's position among those of its kind, the count
+    the element modules derive from a click on it.
+    """
+    shapes: list[tuple[str, int, Shape]] = [
+        ("activity", ordinal, chunk.object)
+        for ordinal, chunk in enumerate(svgtochunklist(fragment), 1)
+    ]
+
+    if_ordinal = while_ordinal = 0
+    for chunk in svgtochunklistpolygon(fragment):
+        if not chunk.text_elements:
+            continue
+        if checkifwhile(chunk):
+            while_ordinal += 1
+            shapes.append(("while", while_ordinal, chunk.object))
+        else:
+            if_ordinal += 1
+            shapes.append(("if", if_ordinal, chunk.object))
+
+    kinds: list[tuple[str, list[Shape]]] = [
+        ("ellipse", [chunk.object for chunk in svgtochunklistellipse(fragment)]),
+        ("connector", [chunk.object for chunk in svgtochunklistconnector(fragment)]),
+        ("fork", [chunk.object for chunk in svgtochunklistfork(fragment)]),
+        ("note", list(note_paths(fragment))),
+        ("group", list(group_paths(fragment))),
+        ("merge", list(merge_polygons(fragment))),
+    ]
+    for kind, objects in kinds:
+        shapes.extend(
+            (kind, ordinal, shape) for ordinal, shape in enumerate(objects, 1)
+        )
+    return shapes
+
+
+def prepare_activity_lookups(
+    puml: str, fragment: str, previous: str | None = None
+) -> None:
+    """Build the tables that resolve a click on ``fragment`` to puml lines.
+
+    Each is cached by content (the structure by the puml, the ordinals on
+    the SVG's index), so the element routes only look them up. ``previous``
+    is the puml this one was edited from; its cached structure is patched
+    rather than the new one scanned in full.
+    """
+    before = {puml: previous}  # edit requests send either text
+    before[editor_text(puml)] = editor_text(previous) if previous is not None else None
+    for text, old in before.items():
+        if old is None:
+            activity_structure(text.splitlines())
+        else:
+            edited_structure(old.splitlines(), text.splitlines())
+    polygons = svgtochunklistpolygon(fragment)
+    chunk_ordinals(polygons, is_statement_chunk)
+    chunk_ordinals(polygons, is_while_chunk)
+    chunk_ordinals(svgtochunklist(fragment))
+    chunk_ordinals(svgtochunklistellipse(fragment))
+    chunk_ordinals(svgtochunklistconnector(fragment))
+    chunk_ordinals(svgtochunklistfork(fragment))
+    note_ordinals(fragment)
+    group_ordinals(fragment)
+    merge_ordinals(fragment)
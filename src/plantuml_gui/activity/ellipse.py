@@ -23,73 +23,47 @@
 # SOFTWARE.
 
 
-from pyquery import PyQuery as Pq
+from .classes import SvgChunk
+from .structure import activity_structure
+from .svg_index import SvgIndex, memoized
+from .util import SvgChunkList, index_of_clicked_element  # pragma: no cover
 
-from .classes import Ellipse, SvgChunk
-from .util import index_of_clicked_element  # pragma: no cover
 
+def svgtochunklistellipse(svg) -> SvgChunkList:
+    return memoized(svg, "ellipse_chunks", _ellipse_chunks)
 
-def svgtochunklistellipse(svg):
-    chunks = []
-    d = Pq(svg)
 
-    ellipses = d("ellipse")
-    for ellipse in ellipses:
-        ellipse = Pq(
-            ellipse
-        )  # ellipse svg is self closing, so no </ellipse> is in this.
-        ellipse_svg = str(ellipse)
-        ellipse_svg = ellipse_svg[:-2] + "></ellipse>"
-        ellipse_obj = Ellipse.from_svg(ellipse_svg)
-
-        next_elem = ellipse.next()
+def _ellipse_chunks(index: SvgIndex) -> SvgChunkList:
+    chunks = SvgChunkList()
+    for ellipse in index.ellipses:
+        next_elem = ellipse.next
         if (
-            next_elem and next_elem[0].tag == "ellipse"
+            next_elem is not None
+            and next_elem.tag == "ellipse"
+            and next_elem.element == ellipse.element
         ):  # this part is done because the "end" element has two ellipses and we only want to count one of
-            next_elem = Pq(next_elem)
-            next_elem_svg = str(next_elem)
-            next_elem_svg = next_elem_svg[:-2] + "></ellipse>"
-            next_elem_obj = Ellipse.from_svg(next_elem_svg)
-            if next_elem_obj == ellipse_obj:
-                continue
+            continue
         if (
-            next_elem
-            and next_elem[0].tag == "path"
-            and next_elem[0].get("fill") == "#000000"
+            next_elem is not None
+            and next_elem.tag == "path"
+            and next_elem.attrs.get("fill") == "#000000"
         ):
             continue
-        chunks.append(SvgChunk(object=ellipse_obj, text_elements=[]))
+        chunks.append(SvgChunk(object=ellipse.element, text_elements=[]))
     return chunks
 
 
 def delete_ellipse_element(puml, svgchunklist, clickedelement):
-    index = 0
     count = index_of_clicked_element(svgchunklist, clickedelement)
     lines = puml.splitlines()
-    while index < len(lines):
-        line = lines[index]
-        clean_line = line.strip()
-        if not lines[index - 1].startswith("note"):
-            if clean_line.startswith(("stop", "start", "end")):
-                count -= 1
-            if count == 0:
-                if clean_line.startswith(("stop", "start", "end")):
-                    del lines[index]
-                    break
-        index += 1
+    index = activity_structure(lines).ellipse_line(count)
+    if index != -1:
+        del lines[index]
     return "\n".join(lines)
 
 
 def get_index_ellipse(puml, svgchunklist, clickedelement, where) -> int:
-    index = 0
     count = index_of_clicked_element(svgchunklist, clickedelement)
     lines = puml.splitlines()
-    for index, line in enumerate(lines):
-        clean_line = line.strip()
-        if not lines[index - 1].startswith("note"):
-            if clean_line in ["stop", "start", "end"]:
-                count -= 1
-            if count == 0:
-                if clean_line in ["stop", "start", "end"]:
-                    break
-    return index + 1
+    index = activity_structure(lines).ellipse_line(count)
+    return index + 1 if index != -1 else max(len(lines), 1)
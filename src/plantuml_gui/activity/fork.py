@@ -22,69 +22,35 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-from pyquery import PyQuery as Pq  # pragma: no cover
-
 from .classes import RectElement, SvgChunk
+from .structure import activity_structure
+from .svg_index import memoized
+from .util import SvgChunkList, chunk_ordinal
 
 
-def svgtochunklistfork(svg: str) -> list[SvgChunk]:
-    chunks = []
-    d = Pq(svg)
-
-    rects = d("rect")
-    for rect in rects:
-        if float(rect.get("height")) == 6:
-            rect = Pq(rect)
-            rect_svg = str(rect)
-            rect_svg = rect_svg[:-2] + "></rect>"
-            rect_obj = RectElement.from_svg(rect_svg)
-            chunks.append(SvgChunk(object=rect_obj, text_elements=[]))
-    return chunks
+def svgtochunklistfork(svg: str) -> SvgChunkList:
+    return memoized(
+        svg,
+        "fork_chunks",
+        lambda index: SvgChunkList(
+            SvgChunk(object=rect.element, text_elements=[])
+            for rect in index.rects
+            if rect.numbers.get("height") == 6
+        ),
+    )
 
 
 def findforkbounds(lines, count):
-    start_fork = -1
-    end_fork = -1
-    index = 0
-    level = 0
-    inside_fork = False
-
-    while index < len(lines):
-        line = lines[index]
-        clean_line = line.strip()
-
-        if clean_line == "fork":
-            if count == 1 and not inside_fork:
-                start_fork = index
-                inside_fork = True
-                continue
-            count -= 1
-        if inside_fork and clean_line == "fork":
-            level += 1
-        if (
-            clean_line == "end fork" or clean_line == "end merge"
-        ):  # fork can end in both
-            if inside_fork:
-                level -= 1
-                if level == 0:
-                    end_fork = index
-                    break
-            if (
-                clean_line == "end fork"
-            ):  # if its an end merge there wasnt an extra count due to the rect.
-                count -= 1
-        index += 1
-    return start_fork, end_fork
+    """Find the fork whose top bar is the count-th fork bar in the SVG.
+
+    ``end fork`` draws a bar too (``end merge`` does not), so bars of
+    earlier forks' ends take an ordinal as well.
+    """
+    return activity_structure(lines).fork_bounds(count)
 
 
 def forkcount(svgchunklist: list[SvgChunk], clickedelement: RectElement):
-    count = 0
-    for svgchunk in svgchunklist:  # counts occurances of poly chunks (if statements)
-        count += 1
-        if svgchunk.object == clickedelement:
-            print("found clicked fork")
-            break
-    return count
+    return chunk_ordinal(svgchunklist, clickedelement)
 
 
 # def add_note_fork(puml: str, svgchunklist: list[SvgChunk], clickedelement: RectElement):
@@ -24,56 +24,35 @@
 
 from typing import Literal
 
-from pyquery import PyQuery as Pq  # pragma: no cover
+from .classes import PathElement
+from .structure import activity_structure
+from .svg_index import Ordinals, memoized, ordinals, svg_index
+
+
+def group_paths(svg) -> list[PathElement]:
+    """Return the header path of every group/partition, in SVG order."""
+    return [
+        path.element
+        for path in svg_index(svg).paths
+        if path.attrs.get("style") == "stroke:#000000;stroke-width:1.5;"
+    ]
 
 
 def group_count(svg, clickedelement):
-    count = 0
-    d = Pq(svg)
+    clicked = PathElement.from_svg(clickedelement)
+    return group_ordinals(svg).of(clicked)
 
-    paths = d("path")
-    for path in paths:
-        path = Pq(path)
-        path_svg = str(path)
-        path_svg = path_svg[:-2] + "></path>"
-        if path[0].get("style") == "stroke:#000000;stroke-width:1.5;":
-            count += 1
-            if path_svg == clickedelement:
-                break
-    return count
+
+def group_ordinals(svg) -> Ordinals:
+    return memoized(
+        svg,
+        "group_ordinals",
+        lambda _: ordinals((path, True) for path in group_paths(svg)),
+    )
 
 
 def find_group_bounds(lines, count):
-    group_start, group_end = -1, -1
-    index = 0
-    inside_group = False
-    level = 0
-
-    while index < len(lines):
-        line = lines[index]
-        clean_line = line.strip()
-
-        if clean_line.startswith("group") or clean_line.startswith("partition"):
-            if count == 1:
-                group_start = index
-                inside_group = True
-                count -= 1
-                index += 1
-                continue
-            count -= 1
-        if (
-            inside_group
-            and clean_line.startswith("group")
-            or clean_line.startswith("partition")
-        ):
-            level += 1
-        if inside_group and clean_line == "end group" or clean_line == "}":
-            if level == 0:
-                group_end = index
-                break
-            level -= 1
-        index += 1
-    return group_start, group_end
+    return activity_structure(lines).group_bounds(count)
 
 
 def get_group_text(puml, svg, clickedelement: Literal["group", "partition"]) -> str:
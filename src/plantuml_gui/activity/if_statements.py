@@ -25,61 +25,24 @@
 import re
 from typing import Literal
 
-from pyquery import PyQuery as Pq
-
-from .classes import (
-    IfElseNode,
-    PolyElement,
-    RepeatSwitchNode,
-    SvgChunk,
-    TextElement,
-    find_end,
-    findelsebounds,
-)
-from .util import checkifwhile  # pragma: no cover
-
-
-def svgtochunklistpolygon(svg: str) -> list[SvgChunk]:
-    chunks = []
-    d = Pq(svg)
-
-    polys = d("polygon")
-    for poly in polys:
-        poly = Pq(poly)
-        poly_svg = str(poly)
-        poly_svg = poly_svg[:-2] + "></polygon>"
-        poly_obj = PolyElement.from_svg(poly_svg)
-        if poly_obj.is_merge():
-            continue  # differentiate between merge polygons and statements.
-
-        text_elements = []
-        next_elem = poly.next()
-
-        # Unified handling for both 'text' and 'a' elements
-        while next_elem and next_elem[0].tag in {"text", "a"}:
-            if next_elem[0].tag == "text":
-                # Handle text elements as before
-                element = TextElement.from_svg(next_elem)
-                next_elem = next_elem.next()
-            elif next_elem[0].tag == "a":
-                # Handle 'a' elements similarly to text
-                link_href = next_elem[0].get("href")
-                link_text = next_elem[0].find("text").text
-
-                # Create a temporary TextElement for the <a> tag, excluding the link text itself from the label
-                element = TextElement(
-                    label=f"[[{link_href} {link_text}]]",
-                    x=float(next_elem[0].find("text").get("x")),
-                    y=float(next_elem[0].find("text").get("y")),
-                )
-                next_elem = next_elem.next()
-
-            # Append to the text elements list
-            text_elements.append(element)
-
-        chunks.append(SvgChunk(object=poly_obj, text_elements=text_elements))
-
-    return chunks
+from ..shared.label_counters import next_label
+from .classes import PolyElement, SvgChunk, findelsebounds
+from .structure import activity_structure
+from .svg_index import memoized, text_run
+from .util import SvgChunkList, chunk_ordinal, is_statement_chunk  # pragma: no cover
+
+
+def svgtochunklistpolygon(svg: str) -> SvgChunkList:
+    return memoized(
+        svg,
+        "polygon_chunks",
+        lambda index: SvgChunkList(
+            SvgChunk(object=poly.element, text_elements=text_run(poly))
+            for poly in index.polygons
+            # differentiate between merge polygons and statements.
+            if not poly.element.is_merge()
+        ),
+    )
 
 
 def polychunktotext(
@@ -141,9 +104,10 @@ def polychunktotext(
 
     count = polyelementcount(svgchunklist, clickedelement)
     start = find_start(lines, count)
-    end = find_end(lines, start)
-    if_start, if_end = findifbounds(lines, start)
-    else_start, else_end = findelsebounds(lines, start)
+    structure = activity_structure(lines)
+    end = structure.end(start)
+    if_start, if_end = structure.if_header(start)
+    else_start, else_end = structure.else_bounds(start)
     if if_start == else_start - 1 and end - 1 != else_end:
         texts[1], texts[2] = texts[2], texts[1]
     return texts
@@ -161,10 +125,11 @@ def edittextinternalif2(
     lines = puml.splitlines()
 
     start = find_start(lines, count)
-    end = find_end(lines, start)
+    structure = activity_structure(lines)
+    end = structure.end(start)
 
     if lines[start].startswith("if"):
-        if_start, if_end = findifbounds(lines, start)
+        if_start, if_end = structure.if_header(start)
 
         if_lines = lines[if_start : if_end + 1]
         if_text = "\n".join(if_lines)
@@ -187,7 +152,7 @@ def edittextinternalif2(
         else_start, else_end = findelsebounds(lines, if_start)
         if else_start == -1 and else_end == -1 and branch2 != "":
             start = find_start(lines, count)
-            end = find_end(lines, start)
+            end = activity_structure(lines).end(start)
             lines.insert(end, f"else ({branch2})")
 
         else:
@@ -239,26 +204,12 @@ def edittextinternalif2(
 
 
 def findifbounds(lines, start):
-    start_if = start
-    end_if = -1
-    index = start
-    parentheses = 0
-    then_found = False
-
-    while index < len(lines):  # find index of the correct if statement.
-        line = lines[index]
-        clean_line = line.strip()
-        parentheses += clean_line.count("(")
-        parentheses -= clean_line.count(")")
+    """Find the first and last line of the if condition starting at ``start``.
 
-        if "then" in clean_line:
-            then_found = True
-
-        if parentheses == 0 and then_found:
-            end_if = index
-            break
-        index += 1
-    return start_if, end_if
+    The condition spans lines until ``then`` has been seen and its
+    parentheses balance.
+    """
+    return activity_structure(lines).if_header(start)
 
 
 # def add_note_if(puml: str, svgchunklist: list[SvgChunk], clickedelement: PolyElement):
@@ -277,104 +228,38 @@ def deleteif(puml: str, svgchunklist: list[SvgChunk], clickedelement: PolyElemen
     lines = puml.splitlines()
 
     start_if = find_start(lines, count)
-    end_if = find_end(lines, start_if)
+    end_if = activity_structure(lines).end(start_if)
     if lines[end_if + 1] == "detach":
         end_if += 1
     del lines[start_if : end_if + 1]
     return "\n".join(lines)
 
 
-def findwholeifbounds(lines: list[str], count: int):
-    start_if, end_if = -1, -1
-    index = 0
-    level = 0
-    inside_if = False
-    while index < len(lines):
-        line = lines[index]
-        clean_line = line.strip()
-
-        if clean_line.startswith("if") or clean_line == "repeat":
-            if count == 1 and not inside_if:
-                start_if = index  # found start if index
-                inside_if = True
-                continue
-            count -= 1
-        if inside_if and clean_line.startswith("if") or clean_line == "repeat":
-            level += 1
-        if (
-            clean_line.startswith("endif")
-            or clean_line.startswith("repeat while")
-            or clean_line.startswith("repeatwhile")
-        ):
-            level -= 1
-            if inside_if and level == 0:
-                end_if = index
-                break
-        index += 1
-
-    return start_if, end_if
-
-
 def build_tree(lines):
-    indices = []
-    roots = []
-    stack = []
-    for index, line in enumerate(lines):
-        line = line.strip()
-        if line.startswith("if"):
-            newnode = IfElseNode(
-                index=index, ifbranch=[], elsebranch=[], inside_ifbranch=True
-            )
-            add_node(roots, stack, newnode)
-
-        if line.startswith("else"):
-            stack[-1].inside_ifbranch = False
-
-        if line == "repeat" or line.startswith("switch"):
-            newnode = RepeatSwitchNode(index=index, branch=[])
-            add_node(roots, stack, newnode)
-        if startswith(line, "endif", "repeat while", "repeatwhile", "switch"):
-            stack.pop()
-    for node in roots:
-        node.add_indices(indices, lines)
-    return indices
-
-
-def add_node(roots, stack, newnode):
-    if not stack:
-        roots.append(newnode)
-    else:
-        stack[-1].add_node(newnode)
-    stack.append(newnode)
-
-
-def startswith(line, *args):
-    return any(line.startswith(arg) for arg in args)
+    """Return the if/repeat/switch lines in the order the SVG draws them."""
+    return list(activity_structure(lines).statements)
 
 
 def find_start(lines, count):
-    elements = build_tree(lines)
-    for index in elements:
-        if count == 1:
-            return index
-            break
-        count -= 1
-
-    raise ValueError
+    start = activity_structure(lines).statement_start(count)
+    if start == -1:
+        raise ValueError
+    return start
 
 
 def get_if_line(puml, svgchunklist, clickedelement):
     count = polyelementcount(svgchunklist, clickedelement)
     lines = puml.splitlines()
     start = find_start(lines, count)
-    end = find_end(lines, start)
+    structure = activity_structure(lines)
+    end = structure.end(start)
     if lines[start].strip() == "repeat":
         return end
     elif lines[start].strip().startswith("switch"):
         return start, end
 
     else:
-        else_start, else_end = findelsebounds(lines, start)
+        else_start, else_end = structure.else_bounds(start)
         return start, else_start, end
 
 
@@ -385,11 +270,11 @@ def get_line_for_adding_into_if(
     count = polyelementcount(svgchunklist, clickedelement)
     lines = puml.splitlines()
     start = find_start(lines, count)
-    end = find_end(lines, start)
+    structure = activity_structure(lines)
+    end = structure.end(start)
 
     if lines[start].startswith("if"):
-        start_if, end_if = findifbounds(lines, count)
-        start_else, end_else = findelsebounds(lines, start_if)
+        start_else, end_else = structure.else_bounds(start)
 
         if where == "left":
             return end_else
@@ -404,13 +289,7 @@ def get_line_for_adding_into_if(
 
 
 def polyelementcount(svgchunklist: list[SvgChunk], clickedelement: PolyElement):
-    count = 0
-    for svgchunk in svgchunklist:  # counts occurances of poly chunks (if statements)
-        if svgchunk.text_elements and not checkifwhile(svgchunk):
-            count += 1
-        if svgchunk.object == clickedelement:
-            break
-    return count
+    return chunk_ordinal(svgchunklist, clickedelement, is_statement_chunk)
 
 
 def check_what_poly(puml, svgchunklist, clickedelement):
@@ -426,7 +305,7 @@ def add_backwards(puml, svgchunklist, clickedelement):
     lines = puml.splitlines()
 
     start = find_start(lines, count)
-    end = find_end(lines, start)
+    end = activity_structure(lines).end(start)
     index = start
     while index < end:
         line = lines[index].strip()
@@ -442,7 +321,7 @@ def check_if_repeat_has_backward(puml, svgchunklist, clickedelement):
     lines = puml.splitlines()
 
     start = find_start(lines, count)
-    end = find_end(lines, start)
+    end = activity_structure(lines).end(start)
     index = start
     while index < end:
         line = lines[index].strip()
@@ -455,7 +334,8 @@ def check_if_repeat_has_backward(puml, svgchunklist, clickedelement):
 def detach_if(puml, svgchunklist, clickedelement):
     count = polyelementcount(svgchunklist, clickedelement)
     lines = puml.splitlines()
-    start, end = findwholeifbounds(lines, count)
+    start = find_start(lines, count)
+    end = activity_structure(lines).end(start)
     if lines[end + 1] == "detach":
         del lines[end + 1]
     else:
@@ -467,19 +347,9 @@ def switch_again(puml, svgchunklist, clickedelement):
     count = polyelementcount(svgchunklist, clickedelement)
     lines = puml.splitlines()
     start = find_start(lines, count)
-    end = find_end(lines, start)
+    end = activity_structure(lines).end(start)
 
-    condition_label_numbers = []
-    for line in lines:
-        match = re.search(r"case \( condition (\d+)\)", line)
-        if match:
-            condition_label_numbers.append(int(match.group(1)))
-
-    # Determine the next condition label number
-    if condition_label_numbers:
-        next_label_number = max(condition_label_numbers) + 1
-    else:
-        next_label_number = 1
+    next_label_number = next_label(puml, "case")
 
     lines.insert(end, ":Activity;")
     lines.insert(end, f"case ( condition {next_label_number})")
@@ -22,9 +22,9 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-from pyquery import PyQuery as Pq  # pragma: no cover
-
 from .classes import PolyElement
+from .structure import activity_structure
+from .svg_index import Ordinals, memoized, ordinals, svg_index
 
 
 def get_index_merge(puml, svg, clickedelement):
@@ -33,70 +33,33 @@ def get_index_merge(puml, svg, clickedelement):
     return find_merge_index(lines, count)
 
 
-def index_of_clicked_merge(svg, clickedelement):
-    count = 0
-    d = Pq(svg)
-
-    polys = d("polygon")
-    for poly in polys:
-        poly = Pq(poly)
-        poly_svg = str(poly)
-        poly_svg = poly_svg[:-2] + "></polygon>"
-        poly_obj = PolyElement.from_svg(poly_svg)
-        if (
-            poly[0].get("style") == "stroke:#181818;stroke-width:0.5;"
-            and poly_obj.is_merge()
-        ):
-            count += 1
-            if poly_svg == clickedelement:
-                break
-    return count
-
+def merge_polygons(svg) -> list[PolyElement]:
+    """Return every merge diamond's polygon, in SVG order."""
+    return [
+        poly.element
+        for poly in svg_index(svg).polygons
+        if poly.attrs.get("style") == "stroke:#181818;stroke-width:0.5;"
+        and poly.element.is_merge()
+    ]
 
-def find_merge_index(lines, count):
-    merge_index = -1
-    index = 0
-
-    while index < len(lines):
-        line = lines[index]
-        clean_line = line.strip()
 
-        if clean_line in {"endif", "end merge", "repeat", "endswitch"}:
-            if clean_line == "endif":
-                if not check_endif_merge(
-                    lines, index
-                ):  # checks if the endif merge exists or not, detach can make it dissapear.
-                    index += 1
-                    continue
-            if count == 1:
-                merge_index = index
-                break
-            count -= 1
-        index += 1
-    return merge_index
+def index_of_clicked_merge(svg, clickedelement):
+    clicked = PolyElement.from_svg(clickedelement)
+    return merge_ordinals(svg).of(clicked)
 
 
-def check_endif_merge(lines, index):
-    if (
-        lines[index + 1].strip() == "detach"
-        or lines[index - 1].strip() == "detach"
-        or lines[index - 1].strip().startswith("else")
-        or lines[index - 1].strip() in ["stop", "end"]
-    ):  # checks for detach before and after endif line
-        return False
+def merge_ordinals(svg) -> Ordinals:
+    return memoized(
+        svg,
+        "merge_ordinals",
+        lambda _: ordinals((poly, True) for poly in merge_polygons(svg)),
+    )
 
-    while (
-        index > 0
-    ):  # checks for endif before else statements and also works for nested ifs.
-        level = 0
-        if lines[index].strip().startswith("else") and level == 0:
-            if lines[index - 1].strip() == "detach":
-                return False
-        if lines[index].strip() == "endif":
-            level += 1
-        if lines[index].startswith("if"):
-            level -= 1
 
-        index -= 1
+def find_merge_index(lines, count):
+    """Return the line drawing the count-th merge diamond, -1 if none.
 
-    return True
+    An endif draws no merge when a detach (or stop/end) next to it, or an
+    else right after a detach, leaves nothing to merge.
+    """
+    return activity_structure(lines).merge_line(count)
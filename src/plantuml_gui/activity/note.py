@@ -22,49 +22,45 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-from pyquery import PyQuery as Pq  # pragma: no cover
+from .classes import PathElement
+from .structure import activity_structure
+from .svg_index import Ordinals, memoized, ordinals, svg_index
 
 
-def note_count(svg, clickedelement):
-    count = 0
-    d = Pq(svg)
-
-    paths = d("path")
-    for path in paths:
-        path = Pq(path)
+def note_paths(svg) -> list[PathElement]:
+    """Return the outline path of every note, in SVG order."""
+    note_svgs = []
+    for path in svg_index(svg).paths:
         if (
-            path[0].get("style") == "pointer-events: none;"
+            path.attrs.get("style") == "pointer-events: none;"
+            or path.attrs.get("fill") == "#000000"
         ):  # to make sure the path creating the text inside connectors doesnt affect note count
             continue
-        path_svg = str(path)
-        path_svg = path_svg[:-2] + "></path>"
-        next = path.next()
-        if next[0].tag == "path":  # notes have a second path in top corner
-            count += 1
-            if path_svg == clickedelement:
-                break
-    return count
+        next = path.next
+        if (
+            next is not None and next.tag == "path"
+        ):  # notes have a second path in top corner
+            note_svgs.append(path.element)
+    return note_svgs
+
+
+def note_count(svg, clickedelement):
+    # Compared by path data: hover styling may have changed the clicked
+    # element's other attributes since the SVG was captured.
+    clicked = PathElement.from_svg(clickedelement)
+    return note_ordinals(svg).of(clicked)
+
+
+def note_ordinals(svg) -> Ordinals:
+    return memoized(
+        svg,
+        "note_ordinals",
+        lambda _: ordinals((path, True) for path in note_paths(svg)),
+    )
 
 
 def find_note_bounds(lines, count):
-    note_start, note_end = -1, -1
-    index = 0
-    inside_note = False
-
-    while index < len(lines):
-        line = lines[index]
-        clean_line = line.strip()
-
-        if clean_line.startswith("note left") or clean_line.startswith("note right"):
-            if count == 1:
-                note_start = index
-                inside_note = True
-            count -= 1
-        if inside_note and clean_line.startswith("end note"):
-            note_end = index
-            break
-        index += 1
-    return note_start, note_end
+    return activity_structure(lines).note_bounds(count)
 
 
 def get_note_text(puml, svg, clickedelement):
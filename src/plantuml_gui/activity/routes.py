@@ -22,8 +22,10 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify
 
+from ..shared.documents import request_data
+from ..shared.line_delta import puml_edit
 from .activity import (
     add_arrow_label,
     add_note_activity,
@@ -47,6 +49,7 @@ from .arrow import (
     get_arrow_type,
     svgtoarrowtext,
 )
+from .batch import BatchError, run_batch
 from .classes import Ellipse, PolyElement, RectElement
 from .connector import (
     delete_connector,
@@ -112,8 +115,9 @@ activity_bp = Blueprint("activity", __name__)
 
 
 @activity_bp.route("/editText", methods=["POST"])
+@puml_edit()
 def edittext():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     newname = data["newname"]
@@ -124,7 +128,7 @@ def edittext():
 
 @activity_bp.route("/getText", methods=["POST"])
 def gettext():
-    data = request.get_json()
+    data = request_data()
     svg = data["svg"]
     clickedelement = data["svgelement"]
     clickedelement = RectElement.from_svg(clickedelement)
@@ -134,8 +138,9 @@ def gettext():
 
 
 @activity_bp.route("/deleteActivity", methods=["POST"])
+@puml_edit()
 def deleteactivity():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     clickedelement = data["svgelement"]
@@ -145,8 +150,9 @@ def deleteactivity():
 
 
 @activity_bp.route("/addNoteActivity", methods=["POST"])
+@puml_edit()
 def addnoteactivity():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     clickedelement = data["svgelement"]
@@ -156,8 +162,9 @@ def addnoteactivity():
 
 
 @activity_bp.route("/addToActivity", methods=["POST"])
+@puml_edit()
 def addtoactivity():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     type = data["type"]
@@ -168,8 +175,9 @@ def addtoactivity():
 
 
 @activity_bp.route("/detachActivity", methods=["POST"])
+@puml_edit()
 def detachactivity():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     clickedelement = data["svgelement"]
@@ -178,8 +186,9 @@ def detachactivity():
 
 
 @activity_bp.route("/breakActivity", methods=["POST"])
+@puml_edit()
 def breakactivity():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     clickedelement = data["svgelement"]
@@ -189,7 +198,7 @@ def breakactivity():
 
 @activity_bp.route("/checkBackward", methods=["POST"])
 def checkbackward():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     clickedelement = data["svgelement"]
@@ -199,7 +208,7 @@ def checkbackward():
 
 @activity_bp.route("/getActivityLine", methods=["POST"])
 def getactivityline():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     clickedelement = data["svgelement"]
@@ -211,8 +220,9 @@ def getactivityline():
 
 
 @activity_bp.route("/addArrowLabel", methods=["POST"])
+@puml_edit()
 def addarrowlabel():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     where = data["where"]
@@ -223,7 +233,7 @@ def addarrowlabel():
 
 @activity_bp.route("/checkWhatPoly", methods=["POST"])
 def checkwhatpoly():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     clickedsvg = data["svgelement"]
@@ -235,7 +245,7 @@ def checkwhatpoly():
 
 @activity_bp.route("/checkIfRepeatHasBackward", methods=["POST"])
 def checkifrepeathasbackward():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     clickedsvg = data["svgelement"]
@@ -246,8 +256,9 @@ def checkifrepeathasbackward():
 
 
 @activity_bp.route("/addBackwards", methods=["POST"])
+@puml_edit()
 def addbackwards():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     clickedsvg = data["svgelement"]
@@ -258,8 +269,9 @@ def addbackwards():
 
 
 @activity_bp.route("/editTextIf", methods=["POST"])
+@puml_edit()
 def edittextif():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     statement = data["statement"]
@@ -276,7 +288,7 @@ def edittextif():
 
 @activity_bp.route("/getTextPoly", methods=["POST"])
 def gettextpoly():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     clickedelement = data["svgelement"]
@@ -286,8 +298,9 @@ def gettextpoly():
 
 
 @activity_bp.route("/delIf", methods=["POST"])
+@puml_edit()
 def delif():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     clickedsvg = data["svgelement"]
@@ -297,8 +310,9 @@ def delif():
 
 
 @activity_bp.route("/switchAgain", methods=["POST"])
+@puml_edit()
 def switchagain():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     clickedsvg = data["svgelement"]
@@ -309,7 +323,7 @@ def switchagain():
 
 @activity_bp.route("/getIfLine", methods=["POST"])
 def getifline():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     clickedelement = data["svgelement"]
@@ -320,8 +334,9 @@ def getifline():
 
 
 @activity_bp.route("/addToIf", methods=["POST"])
+@puml_edit()
 def addtoif():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     clickedsvg = data["svgelement"]
@@ -333,8 +348,9 @@ def addtoif():
 
 
 @activity_bp.route("/detachIf", methods=["POST"])
+@puml_edit()
 def detachif():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     clickedsvg = data["svgelement"]
@@ -344,8 +360,9 @@ def detachif():
 
 
 @activity_bp.route("/addToEllipse", methods=["POST"])
+@puml_edit()
 def addtoellipse():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     where = data["where"]
@@ -358,8 +375,9 @@ def addtoellipse():
 
 
 @activity_bp.route("/deleteEllipse", methods=["POST"])
+@puml_edit()
 def deleteellipse():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     clickedsvg = data["svgelement"]
@@ -370,7 +388,7 @@ def deleteellipse():
 
 @activity_bp.route("/getEllipseLine", methods=["POST"])
 def getellipseline():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     clickedelement = data["svgelement"]
@@ -381,22 +399,24 @@ def getellipseline():
 
 
 @activity_bp.route("/addTitle", methods=["POST"])
+@puml_edit()
 def addtitle():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     return add_title(puml)
 
 
 @activity_bp.route("/getTextTitle", methods=["POST"])
 def gettexttile():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     return get_title_text(puml)
 
 
 @activity_bp.route("/editTitle", methods=["POST"])
+@puml_edit()
 def edittitle():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     title = data["title"]
     return edit_title_text(puml, title)
@@ -404,7 +424,7 @@ def edittitle():
 
 @activity_bp.route("/getTitleLine", methods=["POST"])
 def gettitle():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     lines = puml.splitlines()
     result = find_title_bounds(lines)
@@ -412,15 +432,17 @@ def gettitle():
 
 
 @activity_bp.route("/deleteTitle", methods=["POST"])
+@puml_edit()
 def deletetitle():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     return delete_title(puml)
 
 
 @activity_bp.route("/deleteFork", methods=["POST"])
+@puml_edit()
 def delfork():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     clickedsvg = data["svgelement"]
@@ -430,8 +452,9 @@ def delfork():
 
 
 @activity_bp.route("/forkAgain", methods=["POST"])
+@puml_edit()
 def forkagain():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     clickedsvg = data["svgelement"]
@@ -441,8 +464,9 @@ def forkagain():
 
 
 @activity_bp.route("/forkToggle", methods=["POST"])
+@puml_edit()
 def forktoggle():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     clickedsvg = data["svgelement"]
@@ -452,24 +476,27 @@ def forktoggle():
 
 
 @activity_bp.route("/forkToggle2", methods=["POST"])
+@puml_edit()
 def forktoggle2():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     index = data["line"]
     return fork_toggle2(puml, index)
 
 
 @activity_bp.route("/deleteFork2", methods=["POST"])
+@puml_edit()
 def deletefork2():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     index = data["line"]
     return delete_fork2(puml, index)
 
 
 @activity_bp.route("/addToFork", methods=["POST"])
+@puml_edit()
 def addtofork():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     index = data["line"]
     type = data["type"]
@@ -478,7 +505,7 @@ def addtofork():
 
 @activity_bp.route("/getNoteText", methods=["POST"])
 def getnotetext():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     clickedelement = data["svgelement"]
@@ -486,8 +513,9 @@ def getnotetext():
 
 
 @activity_bp.route("/editNote", methods=["POST"])
+@puml_edit()
 def editnote():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     text = data["text"]
@@ -496,8 +524,9 @@ def editnote():
 
 
 @activity_bp.route("/deleteNote", methods=["POST"])
+@puml_edit()
 def deletenote():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     clickedelement = data["svgelement"]
@@ -505,8 +534,9 @@ def deletenote():
 
 
 @activity_bp.route("/noteToggle", methods=["POST"])
+@puml_edit()
 def notetoggle():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     clickedelement = data["svgelement"]
@@ -515,7 +545,7 @@ def notetoggle():
 
 @activity_bp.route("/getNoteLine", methods=["POST"])
 def getnoteline():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     clickedelement = data["svgelement"]
@@ -525,7 +555,7 @@ def getnoteline():
 
 @activity_bp.route("/getGroupText", methods=["POST"])
 def getgrouptext():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     clickedelement = data["svgelement"]
@@ -534,7 +564,7 @@ def getgrouptext():
 
 @activity_bp.route("/getGroupLine", methods=["POST"])
 def getgroupline():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     clickedelement = data["svgelement"]
@@ -543,8 +573,9 @@ def getgroupline():
 
 
 @activity_bp.route("/editGroup", methods=["POST"])
+@puml_edit()
 def editgroup():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     clickedelement = data["svgelement"]
@@ -553,8 +584,9 @@ def editgroup():
 
 
 @activity_bp.route("/deleteGroup", methods=["POST"])
+@puml_edit()
 def deletegroup():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     clickedelement = data["svgelement"]
@@ -563,7 +595,7 @@ def deletegroup():
 
 @activity_bp.route("/getMergeLine", methods=["POST"])
 def getmergeline():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     clickedelement = data["svgelement"]
@@ -572,8 +604,9 @@ def getmergeline():
 
 
 @activity_bp.route("/addToMerge", methods=["POST"])
+@puml_edit()
 def addtomerge():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     clickedelement = data["svgelement"]
@@ -585,7 +618,7 @@ def addtomerge():
 
 @activity_bp.route("/getTextWhile", methods=["POST"])
 def gettextwhile():
-    data = request.get_json()
+    data = request_data()
     svg = data["svg"]
     clickedelement = data["svgelement"]
     clickedelement = PolyElement.from_svg(clickedelement)
@@ -594,8 +627,9 @@ def gettextwhile():
 
 
 @activity_bp.route("/editTextWhile", methods=["POST"])
+@puml_edit()
 def edittextwhile():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     clickedelement = data["svgelement"]
@@ -610,8 +644,9 @@ def edittextwhile():
 
 
 @activity_bp.route("/delWhile", methods=["POST"])
+@puml_edit()
 def delwhile():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     clickedelement = data["svgelement"]
@@ -621,8 +656,9 @@ def delwhile():
 
 
 @activity_bp.route("/addToWhile", methods=["POST"])
+@puml_edit()
 def addactivitywhile():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     clickedelement = data["svgelement"]
@@ -639,7 +675,7 @@ def addactivitywhile():
 
 @activity_bp.route("/getWhileLine", methods=["POST"])
 def getwhileline():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     clickedelement = data["svgelement"]
@@ -650,8 +686,9 @@ def getwhileline():
 
 
 @activity_bp.route("/editCharConnector", methods=["POST"])
+@puml_edit()
 def editcharconnector():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     text = data["text"]
@@ -663,7 +700,7 @@ def editcharconnector():
 
 @activity_bp.route("/getCharConnector", methods=["POST"])
 def getcharconnector():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     clickedsvg = data["svgelement"]
@@ -673,8 +710,9 @@ def getcharconnector():
 
 
 @activity_bp.route("/connectorDelete", methods=["POST"])
+@puml_edit()
 def connectordelete():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     clickedsvg = data["svgelement"]
@@ -685,7 +723,7 @@ def connectordelete():
 
 @activity_bp.route("/getConnectorLine", methods=["POST"])
 def getconnectorline():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     clickedsvg = data["svgelement"]
@@ -696,8 +734,9 @@ def getconnectorline():
 
 
 @activity_bp.route("/detachConnector", methods=["POST"])
+@puml_edit()
 def detachconnector():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     clickedsvg = data["svgelement"]
@@ -707,8 +746,9 @@ def detachconnector():
 
 
 @activity_bp.route("/addToConnector", methods=["POST"])
+@puml_edit()
 def addtoconnector():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     clickedsvg = data["svgelement"]
@@ -721,8 +761,9 @@ def addtoconnector():
 
 
 @activity_bp.route("/delArrow", methods=["POST"])
+@puml_edit()
 def delarrow():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     clickedelement = data["svgelement"]
@@ -731,7 +772,7 @@ def delarrow():
 
 @activity_bp.route("/checkDuplicateArrow", methods=["POST"])
 def checkdupearrow():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     clickedelement = data["svgelement"]
@@ -742,15 +783,16 @@ def checkdupearrow():
 
 @activity_bp.route("/getArrowText", methods=["POST"])
 def getarrowtext():
-    data = request.get_json()
+    data = request_data()
     svg = data["svg"]
     clickedelement = data["svgelement"]
     return svgtoarrowtext(svg, clickedelement)
 
 
 @activity_bp.route("/editArrow", methods=["POST"])
+@puml_edit()
 def editarrow():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     text = data["text"]
@@ -760,9 +802,28 @@ def editarrow():
 
 @activity_bp.route("/getArrowLine", methods=["POST"])
 def getarrowline():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     clickedelement = data["svgelement"]
     result = get_arrow_line(puml, svg, clickedelement)
     return jsonify({"result": result})  # int is not accepted by flask
+
+
+@activity_bp.route("/batch", methods=["POST"])
+@puml_edit()
+def batch():
+    data = request_data()
+    puml = data["plantuml"]
+    svg = data["svg"]
+    operations = data["operations"]
+    return run_batch(puml, svg, operations)
+
+
+@activity_bp.errorhandler(BatchError)
+def batch_failed(error):
+    response = jsonify(
+        {"error": "batch_failed", "message": str(error), "index": error.index}
+    )
+    response.status_code = 422
+    return response
@@ -0,0 +1,859 @@
+# SPDX-License-Identifier: MIT
+#
+# MIT License
+#
+# Copyright (c) 2026 Ericsson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Block structure of an activity diagram's puml, built in one pass.
+
+The edit routes need the same facts about the puml over and over: where
+an if, repeat, switch, while, fork, group or note ends, where its else
+label sits, which n-th while or fork a click refers to. Each helper used
+to rescan the lines from the top with its own nesting counter.
+``activity_structure()`` scans the lines once, matching every opening
+line with its branch and closing lines, and keeps the most recently used
+structures keyed by the puml's hash, so every lookup is a dict access.
+
+Matching is per kind, as the old helpers did: an ``endif`` closes the
+innermost open if, whatever else is open around it. The same build also
+lists the lines of the shapes that do not nest (activities, merges,
+start/stop/end ellipses and connectors) in the order they are drawn, so
+the n-th shape of any kind maps to its line by index. Structures are
+shared between requests and are immutable.
+
+An edit changes a few lines of a puml whose structure is usually cached.
+``edited_structure()`` re-scans just those lines, or the innermost block
+around them, and moves the rest by the number of lines added or removed.
+"""
+
+import hashlib
+import threading
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from itertools import islice
+from types import MappingProxyType
+from typing import Mapping
+
+from ..shared.metrics import count_cache
+from ..shared.timing import stage
+
+STRUCTURE_CACHE_SIZE = 32
+
+NOT_FOUND = (-1, -1)
+
+
+@dataclass(frozen=True, slots=True)
+class Block:
+    """One opening puml line and the lines that belong to it.
+
+    ``kind`` is "if", "repeat", "switch", "while", "fork", "group",
+    "partition" or "note". ``end`` is the closing line (-1 when missing),
+    ``branches`` the else/elseif, case or fork again lines directly inside
+    it and ``parent`` the opening line of the innermost enclosing block
+    (-1 at the top level). ``header_end`` is the last line of an if's
+    condition (through ``then (...)``), ``else_bounds`` the first else
+    line of an if and the last line of its label.
+    """
+
+    kind: str
+    start: int
+    end: int = -1
+    branches: tuple[int, ...] = ()
+    parent: int = -1
+    header_end: int = -1
+    else_bounds: tuple[int, int] = NOT_FOUND
+
+
+@dataclass(frozen=True)
+class Structure:
+    """Every block of one puml text, with the per-kind orders clicks use.
+
+    ``statements`` holds the if, repeat and switch lines in the order their
+    diamonds appear in the SVG, ``whiles`` the while lines in theirs
+    (innermost first within each outermost loop), ``fork_bars`` the lines of every
+    ``fork`` and ``end fork`` (each drawn as a bar), ``groups`` and
+    ``notes`` the group/partition and ``note left/right`` lines.
+    ``activities`` holds the first line of every activity box (a repeat's
+    ``backward`` activity is drawn when its loop closes, -1 when it has
+    none), ``merges`` the lines drawing a merge diamond, ``ellipses`` the
+    start/stop/end lines and ``connectors`` the ``(A)`` lines.
+    """
+
+    blocks: Mapping[int, Block]
+    statements: tuple[int, ...] = ()
+    whiles: tuple[int, ...] = ()
+    fork_bars: tuple[int, ...] = ()
+    groups: tuple[int, ...] = ()
+    notes: tuple[int, ...] = ()
+    activities: tuple[int, ...] = ()
+    merges: tuple[int, ...] = ()
+    ellipses: tuple[int, ...] = ()
+    connectors: tuple[int, ...] = ()
+
+    def statement_start(self, ordinal: int) -> int:
+        """Return the line of the ``ordinal``-th if/repeat/switch diamond."""
+        return _nth(self.statements, ordinal)
+
+    def end(self, start: int) -> int:
+        """Return the closing line of the block opened at ``start``."""
+        block = self.blocks.get(start)
+        return block.end if block is not None else -1
+
+    def if_header(self, start: int) -> tuple[int, int]:
+        """Return the first and last line of the if condition at ``start``."""
+        block = self.blocks.get(start)
+        if block is None or block.kind != "if":
+            return start, -1
+        return start, block.header_end
+
+    def else_bounds(self, start: int) -> tuple[int, int]:
+        """Return the else line of the if at ``start`` and its label's end."""
+        block = self.blocks.get(start)
+        return block.else_bounds if block is not None else NOT_FOUND
+
+    def while_start(self, ordinal: int) -> int:
+        """Return the line of the ``ordinal``-th while diamond (1-based)."""
+        return _nth(self.whiles, ordinal)
+
+    def fork_bounds(self, ordinal: int) -> tuple[int, int]:
+        """Return the fork whose top bar is the ``ordinal``-th fork bar."""
+        return self._bounds(_nth(self.fork_bars, ordinal), "fork")
+
+    def group_bounds(self, ordinal: int) -> tuple[int, int]:
+        """Return the ``ordinal``-th group or partition and its end."""
+        return self._bounds(_nth(self.groups, ordinal), "group", "partition")
+
+    def note_bounds(self, ordinal: int) -> tuple[int, int]:
+        """Return the ``ordinal``-th left/right note and its ``end note``."""
+        return self._bounds(_nth(self.notes, ordinal), "note")
+
+    def activity_start(self, ordinal: int) -> int:
+        """Return the first line of the ``ordinal``-th activity box."""
+        return _nth(self.activities, ordinal)
+
+    def merge_line(self, ordinal: int) -> int:
+        """Return the line drawing the ``ordinal``-th merge diamond."""
+        return _nth(self.merges, ordinal)
+
+    def ellipse_line(self, ordinal: int) -> int:
+        """Return the line of the ``ordinal``-th start/stop/end ellipse."""
+        return _nth(self.ellipses, ordinal)
+
+    def connector_line(self, ordinal: int) -> int:
+        """Return the line of the ``ordinal``-th connector."""
+        return _nth(self.connectors, ordinal)
+
+    def _bounds(self, start: int, *kinds: str) -> tuple[int, int]:
+        block = self.blocks.get(start)
+        if block is None or block.kind not in kinds:
+            return NOT_FOUND
+        return start, block.end
+
+
+def _nth(lines: tuple[int, ...], ordinal: int) -> int:
+    return lines[ordinal - 1] if 0 < ordinal <= len(lines) else -1
+
+
+_cache: OrderedDict[bytes, "_Scan"] = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def activity_structure(lines: list[str]) -> Structure:
+    """Return the structure of ``lines``, scanning them only if not cached."""
+    key = _key(lines)
+    scan = _cached(key)
+    count_cache("structure", hit=scan is not None)
+    if scan is None:
+        with stage("puml"):
+            scan = _scan(lines)
+        _store(key, scan)
+    return scan.structure
+
+
+def edited_structure(old_lines: list[str], lines: list[str]) -> Structure:
+    """Return the structure of ``lines``, an edit of ``old_lines``.
+
+    When the structure of ``old_lines`` is cached, only the lines the edit
+    changed are re-scanned, or the innermost block around them when they
+    do not stand alone (an edit that opens a block, say), and the rest is
+    moved by the number of lines added or removed. Documents with
+    unmatched lines are scanned in full.
+    """
+    key = _key(lines)
+    scan = _cached(key)
+    count_cache("structure", hit=scan is not None)
+    if scan is not None:
+        return scan.structure
+    old = _cached(_key(old_lines))
+    with stage("puml"):
+        if old is not None and old.clean:
+            scan = _patch(old, old_lines, lines, *changed_lines(old_lines, lines))
+        if scan is None:
+            scan = _scan(lines)
+    _store(key, scan)
+    return scan.structure
+
+
+def build_structure(lines: list[str]) -> Structure:
+    """Scan ``lines`` once and match every block's lines."""
+    with stage("puml"):
+        return _scan(lines).structure
+
+
+def changed_lines(old_lines: list[str], lines: list[str]) -> tuple[int, int, int]:
+    """Return where two versions of a puml differ.
+
+    The result is ``(first, old_stop, stop)``: ``old_lines[first:old_stop]``
+    was replaced by ``lines[first:stop]``.
+    """
+    limit = min(len(old_lines), len(lines))
+    first = _common_length(old_lines, lines, limit)
+    same_end = _common_length(old_lines[::-1], lines[::-1], limit - first)
+    return first, len(old_lines) - same_end, len(lines) - same_end
+
+
+def _common_length(a: list[str], b: list[str], limit: int, step: int = 256) -> int:
+    """Return how many leading lines ``a`` and ``b`` share, at most ``limit``."""
+    length = 0
+    while (
+        length + step <= limit
+        and a[length : length + step] == b[length : length + step]
+    ):
+        length += step
+    while length < limit and a[length] == b[length]:
+        length += 1
+    return length
+
+
+def _key(lines: list[str]) -> bytes:
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(len(lines)).encode())
+    digest.update("\n".join(lines).encode("utf-8"))
+    return digest.digest()
+
+
+def _cached(key: bytes) -> "_Scan | None":
+    with _cache_lock:
+        scan = _cache.get(key)
+        if scan is not None:
+            _cache.move_to_end(key)
+        return scan
+
+
+def _store(key: bytes, scan: "_Scan") -> None:
+    with _cache_lock:
+        _cache[key] = scan
+        while len(_cache) > STRUCTURE_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+@dataclass(frozen=True)
+class _Scan:
+    """A structure with the sorted line lists an edit patches it through.
+
+    ``clean`` is set when every block is closed, with its labels inside it,
+    and every closing or branch line matched one, so any stretch of lines
+    that is clean on its own can be re-scanned without the rest.
+    """
+
+    structure: Structure
+    clean: bool
+    block_starts: tuple[int, ...]
+    statement_lines: tuple[int, ...]  # sorted, unlike the statement order
+    while_lines: tuple[int, ...]
+    activity_emitted: tuple[int, ...]  # where each activity entry is listed
+
+
+@dataclass(eq=False)
+class _Open:
+    """A block while the scan is inside it."""
+
+    kind: str
+    start: int
+    depth: int = 0  # enclosing whiles, for the while order
+    parent: int = -1
+    end: int = -1
+    branches: list[int] = field(default_factory=list)
+    statements: list["_Open"] = field(default_factory=list)  # nested if/repeat/switch
+    header_end: int = -1
+    else_bounds: tuple[int, int] = NOT_FOUND
+
+
+@dataclass(eq=False)
+class _Label:
+    """An if condition or else label the scan has not seen the end of."""
+
+    block: _Open
+    start: int
+    is_if: bool
+    parens: int = 0
+    then_seen: bool = False
+
+
+_STATEMENTS = ("if", "repeat", "switch")
+
+# Kinds that nest, each matched on its own stack. Partitions share the
+# group stack: either is closed by "end group" or "}".
+_NESTING = (*_STATEMENTS, "while", "fork", "group")
+
+# Line prefixes that close a block, with the stack each one pops.
+_CLOSERS = (
+    (("endif",), "if"),
+    (("repeat while", "repeatwhile"), "repeat"),
+    (("endswitch",), "switch"),
+    (("endwhile",), "while"),
+)
+
+
+def _scan(lines: list[str]) -> _Scan:
+    blocks: list[_Open] = []
+    open_blocks: dict[str, list[_Open]] = {kind: [] for kind in _NESTING}
+    notes: list[_Open] = []  # notes still waiting for their "end note"
+    labels: list[_Label] = []  # if/else labels not yet closed
+    fork_bars = []
+    top_statements: list[_Open] = []  # outermost if/repeat/switch blocks
+    unmatched = 0  # closing and branch lines with no block to go to
+
+    def innermost(*kinds: str) -> _Open | None:
+        tops = [open_blocks[kind][-1] for kind in kinds if open_blocks[kind]]
+        return max(tops, key=lambda block: block.start) if tops else None
+
+    def close(index: int, kind: str) -> None:
+        nonlocal unmatched
+        if open_blocks[kind]:
+            open_blocks[kind].pop().end = index
+        else:
+            unmatched += 1
+
+    for index, line in enumerate(lines):
+        clean_line = line.strip()
+        opened = None
+        block = None
+        if clean_line.startswith("if"):
+            opened = _Open("if", index)
+            labels.append(_Label(opened, index, is_if=True))
+        elif clean_line == "repeat":
+            opened = _Open("repeat", index)
+        elif clean_line.startswith("switch"):
+            opened = _Open("switch", index)
+        elif clean_line.startswith("while"):
+            opened = _Open("while", index, len(open_blocks["while"]))
+        elif clean_line == "fork":
+            opened = _Open("fork", index)
+            fork_bars.append(index)
+        elif clean_line.startswith(("group", "partition")):
+            kind = "group" if clean_line.startswith("group") else "partition"
+            opened = _Open(kind, index)
+        elif clean_line.startswith(("note left", "note right")):
+            note = _Open("note", index)
+            note.parent = _start(innermost(*_NESTING))
+            blocks.append(note)
+            notes.append(note)
+        elif clean_line.startswith("else"):
+            block = innermost("if")
+            if block is not None:
+                block.branches.append(index)
+                if block.else_bounds == NOT_FOUND:
+                    block.else_bounds = (index, -1)
+                    labels.append(_Label(block, index, is_if=False))
+            unmatched += block is None
+        elif clean_line.startswith("case"):
+            block = innermost("switch")
+            if block is not None:
+                block.branches.append(index)
+            unmatched += block is None
+        elif clean_line == "fork again":
+            block = innermost("fork")
+            if block is not None:
+                block.branches.append(index)
+            unmatched += block is None
+        elif clean_line in ("end fork", "end merge"):
+            if clean_line == "end fork":
+                fork_bars.append(index)
+            close(index, "fork")
+        elif clean_line in ("end group", "}"):
+            close(index, "group")
+        elif clean_line.startswith("end note"):
+            for note in notes:
+                note.end = index
+            unmatched += not notes
+            notes.clear()
+        else:
+            for prefixes, kind in _CLOSERS:
+                if clean_line.startswith(prefixes):
+                    close(index, kind)
+                    break
+        if opened is not None:
+            opened.parent = _start(innermost(*_NESTING))
+            if opened.kind in _STATEMENTS:
+                enclosing = innermost(*_STATEMENTS)
+                (enclosing.statements if enclosing else top_statements).append(opened)
+            blocks.append(opened)
+            open_blocks["group" if opened.kind == "partition" else opened.kind].append(
+                opened
+            )
+        if labels:
+            _close_labels(labels, index, clean_line)
+
+    activities = _activities(lines, 0, len(lines))
+    marks = _marks(lines, 0, len(lines))
+    structure = Structure(
+        blocks=MappingProxyType(
+            {
+                block.start: Block(
+                    kind=block.kind,
+                    start=block.start,
+                    end=block.end,
+                    branches=tuple(block.branches),
+                    parent=block.parent,
+                    header_end=block.header_end,
+                    else_bounds=block.else_bounds,
+                )
+                for block in blocks
+            }
+        ),
+        statements=_statement_order(top_statements, lines),
+        whiles=_while_order(blocks),
+        fork_bars=tuple(fork_bars),
+        groups=tuple(b.start for b in blocks if b.kind in ("group", "partition")),
+        notes=tuple(b.start for b in blocks if b.kind == "note"),
+        activities=tuple(activities.lines),
+        merges=tuple(marks.merges),
+        ellipses=tuple(marks.ellipses),
+        connectors=tuple(marks.connectors),
+    )
+    return _Scan(
+        structure=structure,
+        clean=not unmatched
+        and not labels
+        and all(
+            block.end != -1 and max(block.header_end, block.else_bounds[1]) <= block.end
+            for block in blocks
+        )
+        and activities.clean
+        and marks.clean,
+        block_starts=tuple(block.start for block in blocks),
+        statement_lines=tuple(b.start for b in blocks if b.kind in _STATEMENTS),
+        while_lines=tuple(b.start for b in blocks if b.kind == "while"),
+        activity_emitted=tuple(activities.emitted),
+    )
+
+
+def _start(block: _Open | None) -> int:
+    return block.start if block is not None else -1
+
+
+def _close_labels(labels: list[_Label], index: int, clean_line: str) -> None:
+    """Advance the open if/else labels past one line.
+
+    A label ends on the first line where its parentheses balance (and, for
+    an if, once ``then`` has been seen), so multi-line conditions and
+    branch labels span several lines.
+    """
+    for label in list(labels):
+        label.parens += clean_line.count("(") - clean_line.count(")")
+        label.then_seen = label.then_seen or "then" in clean_line
+        if label.parens == 0 and (label.then_seen or not label.is_if):
+            if label.is_if:
+                label.block.header_end = index
+            else:
+                label.block.else_bounds = (label.start, index)
+            labels.remove(label)
+
+
+@dataclass
+class _Activities:
+    """Activity box lines in drawing order, with the line listing each."""
+
+    lines: list[int] = field(default_factory=list)
+    emitted: list[int] = field(default_factory=list)
+    clean: bool = True  # no backward or repeat while outside a repeat
+
+
+def _activities(lines: list[str], start: int, stop: int) -> _Activities:
+    found = _Activities()
+    backwards = [-1]  # the backward activity of the top level and each open repeat
+    for index in range(start, stop):
+        clean_line = lines[index].strip()
+        if clean_line.startswith(":") or (
+            clean_line.startswith("#") and not clean_line.endswith(")")
+        ):
+            found.lines.append(index)
+            found.emitted.append(index)
+        if clean_line.startswith("backward"):
+            backwards[-1] = index
+            found.clean = found.clean and len(backwards) > 1
+        if clean_line == "repeat":
+            backwards.append(-1)
+        elif clean_line.startswith(("repeat while", "repeatwhile")):
+            # Drawn when the loop closes; a stray one ends the list.
+            found.lines.append(backwards.pop())
+            found.emitted.append(index)
+            if not backwards:
+                found.clean = False
+                break
+    return found
+
+
+@dataclass
+class _Marks:
+    """Merge, start/stop/end and connector lines."""
+
+    merges: list[int] = field(default_factory=list)
+    ellipses: list[int] = field(default_factory=list)
+    connectors: list[int] = field(default_factory=list)
+    clean: bool = True  # no else right after a detach
+
+
+_MERGE_LINES = {"endif", "end merge", "repeat", "endswitch"}
+
+
+def _marks(lines: list[str], start: int, stop: int) -> _Marks:
+    marks = _Marks()
+    detached_else = False  # an else right after a detach: later endifs draw no merge
+    for index in range(start, stop):
+        clean_line = lines[index].strip()
+        previous = lines[index - 1] if index else ""
+        if clean_line.startswith("else") and previous.strip() == "detach":
+            detached_else = True
+            marks.clean = False
+        if clean_line in _MERGE_LINES and (
+            clean_line != "endif" or not _endif_hidden(lines, index, detached_else)
+        ):
+            marks.merges.append(index)
+        if clean_line in ("stop", "start", "end") and not previous.startswith("note"):
+            marks.ellipses.append(index)
+        if clean_line.startswith("(") or (
+            clean_line.startswith("#") and clean_line.endswith(")")
+        ):
+            marks.connectors.append(index)
+    return marks
+
+
+def _endif_hidden(lines: list[str], index: int, detached_else: bool) -> bool:
+    """Whether a detach (or stop/end) next to an endif removes its merge."""
+    after = lines[index + 1].strip() if index + 1 < len(lines) else ""
+    before = lines[index - 1].strip() if index else ""
+    return (
+        detached_else
+        or after == "detach"
+        or before in ("detach", "stop", "end")
+        or before.startswith("else")
+    )
+
+
+def _patch(
+    old: _Scan,
+    old_lines: list[str],
+    lines: list[str],
+    first: int,
+    old_stop: int,
+    stop: int,
+) -> _Scan | None:
+    """Re-scan only what an edit changed; None when that is not enough."""
+    for start, old_end in _regions(old, first, old_stop):
+        scan = _patch_region(old, old_lines, lines, start, old_end, stop - old_stop)
+        if scan is not None:
+            return scan
+    return None
+
+
+def _regions(old: _Scan, first: int, stop: int) -> Iterator[tuple[int, int]]:
+    """Yield the changed lines, then each block around them, innermost first."""
+    yield first, stop
+    blocks = old.structure.blocks
+    index = bisect_right(old.block_starts, first) - 1
+    block = blocks.get(old.block_starts[index]) if index >= 0 else None
+    while block is not None:
+        if block.start <= first and block.end + 1 >= stop:
+            yield block.start, block.end + 1
+        block = blocks.get(block.parent)
+
+
+def _patch_region(
+    old: _Scan,
+    old_lines: list[str],
+    lines: list[str],
+    start: int,
+    stop: int,
+    delta: int,
+) -> _Scan | None:
+    """Re-scan ``old_lines[start:stop]`` as edited, if it stands on its own.
+
+    It does when neither its old nor its new lines leave anything open or
+    unmatched, no block around it has lines inside it, and the blocks
+    around it are drawn as before.
+    """
+    new_stop = stop + delta
+    around = _around(old, start, stop)
+    if around is None:
+        return None
+    old_part = _scan(old_lines[start:stop])
+    part = _scan(lines[start:new_stop])
+    if not (old_part.clean and part.clean):
+        return None
+    activities = _activities(lines, start, new_stop)
+    window = (max(start - 1, 0), min(stop + 1, len(old_lines)))
+    marks = _marks(lines, window[0], min(new_stop + 1, len(lines)))
+    if not (activities.clean and marks.clean):
+        return None
+    old_structure, structure = old_part.structure, part.structure
+    in_while = any(block.kind == "while" for block in around)
+    if in_while and (old_structure.whiles or structure.whiles):
+        return None  # the loop's whiles are ordered by depth, across the edit
+
+    def at(line: int) -> int:
+        return line + delta if line >= stop else line
+
+    drawn_after = set()  # statements around the lines drawn after them
+    for block in around:
+        if block.kind in _STATEMENTS:
+            after = _drawn_after_branches(block, old_lines)
+            if after != _drawn_after_branches(_moved(block, stop, delta), lines):
+                return None
+            if after:
+                drawn_after.add(block.start)
+    parent = around[0].start if around else -1
+    blocks = old.structure.blocks
+    first_inside = bisect_left(old.block_starts, start)
+    first_after = bisect_left(old.block_starts, stop)
+    moved = dict(islice(blocks.items(), first_inside))
+    for block in around:
+        moved[block.start] = _moved(block, stop, delta)
+    for block in structure.blocks.values():
+        moved[block.start + start] = _offset(block, start, parent)
+    for block in islice(blocks.values(), first_after, None):
+        moved[block.start + delta] = _moved(block, stop, delta)
+
+    statements = old.structure.statements
+    position = bisect_left(old.statement_lines, start) - len(drawn_after)
+    replaced = statements[position : position + len(old_structure.statements)]
+    following = statements[position + len(replaced) :]
+    if (
+        not all(start <= line < stop for line in replaced)
+        or any(line >= start for line in statements[:position])
+        or {line for line in following if line < start} != drawn_after
+    ):
+        return None  # blocks that cross each other order statements otherwise
+    whiles = old.structure.whiles
+    while_position = 0 if in_while else bisect_left(old.while_lines, start)
+    old_activities = old.structure.activities
+    emitted_from = bisect_left(old.activity_emitted, start)
+    emitted_to = bisect_left(old.activity_emitted, stop)
+    return _Scan(
+        structure=Structure(
+            blocks=MappingProxyType(moved),
+            statements=(
+                *statements[:position],
+                *(line + start for line in structure.statements),
+                *map(at, following),
+            ),
+            whiles=(
+                *whiles[:while_position],
+                *(line + start for line in structure.whiles),
+                *map(at, whiles[while_position + len(old_structure.whiles) :]),
+            ),
+            fork_bars=_splice(
+                old.structure.fork_bars, start, stop, structure.fork_bars, delta
+            ),
+            groups=_splice(old.structure.groups, start, stop, structure.groups, delta),
+            notes=_splice(old.structure.notes, start, stop, structure.notes, delta),
+            activities=(
+                *old_activities[:emitted_from],
+                *activities.lines,
+                *map(at, old_activities[emitted_to:]),
+            ),
+            merges=_replace(old.structure.merges, window, marks.merges, delta),
+            ellipses=_replace(old.structure.ellipses, window, marks.ellipses, delta),
+            connectors=_replace(
+                old.structure.connectors, window, marks.connectors, delta
+            ),
+        ),
+        clean=True,
+        block_starts=_splice(old.block_starts, start, stop, part.block_starts, delta),
+        statement_lines=_splice(
+            old.statement_lines, start, stop, part.statement_lines, delta
+        ),
+        while_lines=_splice(old.while_lines, start, stop, part.while_lines, delta),
+        activity_emitted=(
+            *old.activity_emitted[:emitted_from],
+            *activities.emitted,
+            *(line + delta for line in old.activity_emitted[emitted_to:]),
+        ),
+    )
+
+
+def _around(old: _Scan, start: int, stop: int) -> list[Block] | None:
+    """Return the blocks open across ``start``, innermost first.
+
+    None when one of them has a line in ``[start, stop)`` or a label that
+    runs into it, when one is inside a block that closed before ``start``
+    (blocks of different kinds can cross), or the lines are inside a note.
+    """
+    blocks = old.structure.blocks
+    notes = old.structure.notes
+    index = bisect_left(notes, start) - 1
+    if index >= 0 and blocks[notes[index]].end >= start:
+        return None
+    around = []
+    index = bisect_left(old.block_starts, start) - 1
+    block = blocks.get(old.block_starts[index]) if index >= 0 else None
+    while block is not None:
+        if block.kind == "note":
+            pass
+        elif block.end >= start:
+            else_start, else_end = block.else_bounds
+            if (
+                block.end < stop
+                or block.header_end >= start
+                or else_start < start <= else_end
+            ):
+                return None
+            around.append(block)
+        elif around:
+            return None
+        block = blocks.get(block.parent)
+    return around
+
+
+def _moved(block: Block, stop: int, delta: int) -> Block:
+    """Return ``block`` with its lines from ``stop`` on moved by ``delta``."""
+    if not delta:
+        return (
+            block  # blocks are immutable, so an edit that keeps the count shares them
+        )
+    else_start, else_end = block.else_bounds
+    return Block(
+        block.kind,
+        block.start + delta if block.start >= stop else block.start,
+        block.end + delta if block.end >= stop else block.end,
+        tuple(line + delta if line >= stop else line for line in block.branches),
+        block.parent + delta if block.parent >= stop else block.parent,
+        block.header_end + delta if block.header_end >= stop else block.header_end,
+        (
+            else_start + delta if else_start >= stop else else_start,
+            else_end + delta if else_end >= stop else else_end,
+        ),
+    )
+
+
+def _offset(block: Block, offset: int, parent: int) -> Block:
+    """Return a block of a re-scanned stretch at its place in the document."""
+
+    def at(line: int) -> int:
+        return line + offset if line != -1 else -1
+
+    return Block(
+        kind=block.kind,
+        start=block.start + offset,
+        end=at(block.end),
+        branches=tuple(line + offset for line in block.branches),
+        parent=at(block.parent) if block.parent != -1 else parent,
+        header_end=at(block.header_end),
+        else_bounds=(at(block.else_bounds[0]), at(block.else_bounds[1])),
+    )
+
+
+def _splice(
+    lines: tuple[int, ...], start: int, stop: int, part: tuple[int, ...], delta: int
+) -> tuple[int, ...]:
+    """Replace the sorted ``lines`` in ``[start, stop)`` by a re-scanned part's."""
+    return _replace(lines, (start, stop), [line + start for line in part], delta)
+
+
+def _replace(
+    lines: tuple[int, ...], window: tuple[int, int], new: list[int], delta: int
+) -> tuple[int, ...]:
+    """Replace the sorted ``lines`` in ``window`` by ``new`` and move the rest."""
+    first = bisect_left(lines, window[0])
+    after = bisect_left(lines, window[1])
+    return (*lines[:first], *new, *(line + delta for line in lines[after:]))
+
+
+def _statement_order(roots: list[_Open], lines: list[str]) -> tuple[int, ...]:
+    """Order if/repeat/switch lines as PlantUML draws their diamonds.
+
+    Walks the nesting depth-first without recursion, so arbitrarily deep
+    nesting is fine. A block's own line comes before or after its nested
+    statements depending on where its diamond is drawn.
+    """
+    order: list[int] = []
+    pending: list[tuple[_Open, bool]] = [(block, False) for block in reversed(roots)]
+    while pending:
+        block, visited = pending.pop()
+        if visited:
+            order.append(block.start)
+            continue
+        if _drawn_after_branches(block, lines):
+            pending.append((block, True))
+        else:
+            order.append(block.start)
+        pending.extend((nested, False) for nested in reversed(block.statements))
+    return tuple(order)
+
+
+def _drawn_after_branches(block: _Open | Block, lines: list[str]) -> bool:
+    """Whether a statement's diamond comes after its branches in the SVG.
+
+    A repeat's diamond closes the loop and a switch's opens it. An if's
+    comes last when there is no else branch, when either branch is empty,
+    or when either holds only a connector (...) or stop.
+    """
+    if block.kind != "if":
+        return block.kind == "repeat"
+    index, end = block.start, block.end
+    else_start, else_end = block.else_bounds
+    if (
+        else_end == -1  # no else branch
+        or end == else_end + 1  # empty else branch
+        or index == else_start - 1  # empty if branch
+    ):
+        return True
+    if else_start - index == 2 and lines[index + 1].strip().startswith(("(", "stop")):
+        return True
+    if end - else_end == 2 and lines[else_end + 1].strip().startswith(("(", "stop")):
+        return True
+    return False
+
+
+def _while_order(blocks: list[_Open]) -> tuple[int, ...]:
+    """Order whiles as PlantUML draws them: innermost first per outer loop.
+
+    Loops whose outermost while is never closed are left out.
+    """
+    order: list[int] = []
+    group: list[_Open] = []
+    whiles = [block for block in blocks if block.kind == "while"]
+    for block in whiles:
+        if block.depth == 0:
+            order.extend(_deepest_first(group))
+            group = []
+        group.append(block)
+    order.extend(_deepest_first(group))
+    return tuple(order)
+
+
+def _deepest_first(group: list[_Open]) -> list[int]:
+    if not group or group[0].end == -1:
+        return []
+    return [block.start for block in sorted(group, key=lambda b: -b.depth)]
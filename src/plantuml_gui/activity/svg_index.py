@@ -0,0 +1,225 @@
+# SPDX-License-Identifier: MIT
+#
+# MIT License
+#
+# Copyright (c) 2026 Ericsson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Parsed index of an activity diagram's SVG, shared by the element modules.
+
+Every route receives the same SVG and most of them hand it to several
+element modules, each of which used to parse it and reserialize every
+shape to compare it with the clicked one. ``svg_index()`` parses an SVG
+once into typed lists of rects, polygons, ellipses, paths and text runs
+with their identifying shape already built, and keeps the most recently
+used indexes keyed by the SVG's hash.
+
+Whatever the modules derive from an index (the shapes of one kind, the
+ordinal a click on each of them counts to) is memoized on it with
+``memoized()``, so it is built once per SVG, usually when the render that
+produced the SVG is stored, and a click is a dict lookup.
+
+Indexes are shared between requests and must be treated as read-only.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Generic, TypeVar
+
+from ..shared.metrics import count_cache
+from ..shared.svg_scan import SvgElement, scan_svg
+from ..shared.timing import stage
+from .classes import Ellipse, PathElement, PolyElement, RectElement, TextElement
+
+SVG_INDEX_CACHE_SIZE = 32
+
+NUMERIC_ATTRIBUTES = ("x", "y", "width", "height", "cx", "cy", "rx", "ry")
+
+E = TypeVar("E")
+T = TypeVar("T")
+
+
+@dataclass(eq=False)
+class SvgNode(Generic[E]):
+    """One SVG element with its shape, attributes and following sibling.
+
+    ``element`` is the shape the modules compare clicked elements with
+    (None for tags without one), ``numbers`` the numeric attributes parsed
+    to floats, and ``next`` the next sibling element.
+    """
+
+    tag: str
+    attrs: dict[str, str]
+    element: E
+    numbers: dict[str, float] = field(default_factory=dict)
+    next: "SvgNode[Any] | None" = None
+
+
+@dataclass
+class SvgIndex:
+    """The shapes of one SVG, each list in document order."""
+
+    rects: list[SvgNode[RectElement]] = field(default_factory=list)
+    polygons: list[SvgNode[PolyElement]] = field(default_factory=list)
+    ellipses: list[SvgNode[Ellipse]] = field(default_factory=list)
+    paths: list[SvgNode[PathElement]] = field(default_factory=list)
+    # <text> elements and <a> links, the latter labelled "[[href text]]".
+    texts: list[SvgNode[TextElement]] = field(default_factory=list)
+    # Values built from the lists by memoized(), by name.
+    memo: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class Ordinals:
+    """The ordinal a click on each shape of one kind counts to.
+
+    ``positions`` maps a shape to its 1-based ordinal among the counted
+    shapes, ``size`` is how many were counted.
+    """
+
+    positions: Mapping[Any, int]
+    size: int
+
+    def of(self, shape: Any) -> int:
+        """Return the ordinal of ``shape``; ``size`` when it is not drawn."""
+        return self.positions.get(shape, self.size)
+
+
+def ordinals(shapes: Iterable[tuple[Any, bool]]) -> Ordinals:
+    """Number shapes in SVG order, counting those flagged True.
+
+    A shape drawn twice keeps its first ordinal, as a count that stops at
+    the first match would give it.
+    """
+    positions: dict[Any, int] = {}
+    count = 0
+    for shape, counted in shapes:
+        count += counted
+        positions.setdefault(shape, count)
+    return Ordinals(MappingProxyType(positions), count)
+
+
+_cache: OrderedDict[bytes, SvgIndex] = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def svg_index(svg: str) -> SvgIndex:
+    """Return the index of ``svg``, parsing it only if it is not cached."""
+    key = hashlib.blake2b(svg.encode("utf-8"), digest_size=16).digest()
+    with _cache_lock:
+        index = _cache.get(key)
+        if index is not None:
+            _cache.move_to_end(key)
+    if index is not None:
+        count_cache("svg_index", hit=True)
+        return index
+    count_cache("svg_index", hit=False)
+    with stage("svg"):
+        index = build_svg_index(svg)
+    with _cache_lock:
+        _cache[key] = index
+        while len(_cache) > SVG_INDEX_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return index
+
+
+def memoized(svg: str, name: str, build: Callable[[SvgIndex], T]) -> T:
+    """Return ``build(index)`` for the index of ``svg``, built once per SVG."""
+    index = svg_index(svg)
+    memo = index.memo
+    if name not in memo:
+        memo.setdefault(name, build(index))
+    return memo[name]
+
+
+def build_svg_index(svg: str) -> SvgIndex:
+    """Scan ``svg`` once and index every element."""
+    index = SvgIndex()
+    nodes: dict[SvgElement, SvgNode[Any]] = {}
+    elements = list(scan_svg(svg))
+    for element in elements:
+        nodes[element] = _node(element, index)
+    for element in elements:
+        if element.next is not None:
+            nodes[element].next = nodes[element.next]
+    return index
+
+
+def _node(element: SvgElement, index: SvgIndex) -> SvgNode[Any]:
+    tag, attrs = element.tag, element.attrs
+    numbers = {}
+    for name in NUMERIC_ATTRIBUTES:
+        if name in attrs:
+            try:
+                numbers[name] = float(attrs[name])
+            except ValueError:
+                pass
+    if tag == "rect" and "x" in numbers and "y" in numbers:
+        node: SvgNode[Any] = SvgNode(
+            tag, attrs, RectElement(numbers["x"], numbers["y"]), numbers
+        )
+        index.rects.append(node)
+    elif tag == "polygon":
+        node = SvgNode(tag, attrs, PolyElement(str(attrs.get("points"))), numbers)
+        index.polygons.append(node)
+    elif tag == "ellipse" and "cx" in numbers and "cy" in numbers:
+        node = SvgNode(tag, attrs, Ellipse(numbers["cx"], numbers["cy"]), numbers)
+        index.ellipses.append(node)
+    elif tag == "path":
+        node = SvgNode(tag, attrs, PathElement(str(attrs.get("d"))), numbers)
+        index.paths.append(node)
+    elif tag == "text" and "x" in numbers and "y" in numbers:
+        text = TextElement(element.text, numbers["x"], numbers["y"])
+        node = SvgNode(tag, attrs, text, numbers)
+        index.texts.append(node)
+    elif tag == "a" and (link := _link_text(element)) is not None:
+        # The link's label is kept in puml form, not as the visible text.
+        text = TextElement(
+            f"[[{attrs.get('href')} {link.text}]]",
+            link.number("x"),
+            link.number("y"),
+        )
+        node = SvgNode(tag, attrs, text, numbers)
+        index.texts.append(node)
+    else:
+        node = SvgNode(tag, attrs, None, numbers)
+    return node
+
+
+def _link_text(link: SvgElement) -> SvgElement | None:
+    child = link.first_child
+    while child is not None and child.tag != "text":
+        child = child.next
+    return child
+
+
+def text_run(node: SvgNode[Any] | None) -> list[TextElement]:
+    """Return the text elements and links that directly follow a shape."""
+    texts = []
+    node = node.next if node is not None else None
+    while node is not None and node.tag in {"text", "a"}:
+        if node.element is not None:
+            texts.append(node.element)
+        node = node.next
+    return texts
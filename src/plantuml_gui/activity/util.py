@@ -22,16 +22,62 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+from collections.abc import Callable, Iterable
+
 from .classes import PolyElement, SvgChunk
+from .svg_index import Ordinals, ordinals
+
+ChunkFilter = Callable[[SvgChunk], bool]
+
+
+class SvgChunkList(list[SvgChunk]):
+    """The chunks of one SVG, with the ordinals counted over them.
+
+    The chunk builders return one memoized list per SVG, so each count is
+    made once and every later click on that SVG reuses it.
+    """
+
+    def __init__(self, chunks: Iterable[SvgChunk] = ()):
+        super().__init__(chunks)
+        self.ordinals: dict[ChunkFilter | None, Ordinals] = {}
+
+
+def chunk_ordinals(
+    svgchunklist: list[SvgChunk], counted: ChunkFilter | None = None
+) -> Ordinals:
+    """Return the ordinal of every chunk among those ``counted`` lets through.
+
+    Every chunk counts when ``counted`` is None.
+    """
+    memo = svgchunklist.ordinals if isinstance(svgchunklist, SvgChunkList) else {}
+    table = memo.get(counted)
+    if table is None:
+        table = ordinals(
+            (chunk.object, counted is None or counted(chunk)) for chunk in svgchunklist
+        )
+        memo[counted] = table
+    return table
+
+
+def chunk_ordinal(
+    svgchunklist: list[SvgChunk], clickedelement, counted: ChunkFilter | None = None
+) -> int:
+    """Return how many ``counted`` chunks precede the clicked one, inclusive."""
+    return chunk_ordinals(svgchunklist, counted).of(clickedelement)
 
 
 def index_of_clicked_element(svgchunklist: list[SvgChunk], clickedelement) -> int:
-    count = 0
-    for svgchunk in svgchunklist:
-        count += 1
-        if svgchunk.object == clickedelement:
-            break
-    return count
+    return chunk_ordinal(svgchunklist, clickedelement)
+
+
+def is_statement_chunk(svgchunk: SvgChunk) -> bool:
+    """Whether a polygon chunk is an if/repeat/switch diamond."""
+    return bool(svgchunk.text_elements) and not checkifwhile(svgchunk)
+
+
+def is_while_chunk(svgchunk: SvgChunk) -> bool:
+    """Whether a polygon chunk is a while diamond."""
+    return bool(svgchunk.text_elements) and checkifwhile(svgchunk)
 
 
 def checkifwhile(svgchunk: SvgChunk):
@@ -25,7 +25,8 @@
 import re
 
 from .classes import PolyElement, SvgChunk
-from .util import checkifwhile
+from .structure import activity_structure
+from .util import chunk_ordinal, is_while_chunk
 
 
 def whiletotext(svgchunklist: list[SvgChunk], clickedelement: PolyElement) -> list[str]:
@@ -106,64 +107,15 @@ def editwhile(
 
 
 def findendwhilebounds(lines, start_while):
-    start_endwhile = -1
-    index = start_while
-
-    level = 0
-    while index < len(lines):
-        line = lines[index]
-        clean_line = line.strip()
-
-        if level == 1:
-            if clean_line.startswith("endwhile"):
-                start_endwhile = index
-                break
-
-        if clean_line.startswith("while"):
-            level += 1
-
-        if level != 1 and clean_line.startswith("endwhile"):
-            level -= 1  # pragma: no cover
-
-        index += 1
-
-    return start_endwhile
+    return activity_structure(lines).end(start_while)
 
 
 def findwhilebounds(lines, count):
-    start_while = -1
-    index = 0
-    nesting_level = 0
-    nested_stacks = []
-    current_stack = []
-
-    # Traverse the lines to find all while statements and their nesting levels
-    while index < len(lines):
-        line = lines[index]
-        clean_line = line.strip()
-        if clean_line.startswith("while"):
-            current_stack.append((index, nesting_level))
-            nesting_level += 1
-        elif clean_line.startswith("endwhile"):
-            nesting_level -= 1
-            if nesting_level == 0:
-                # Sort the current stack and add to nested_stacks
-                current_stack.sort(key=lambda x: x[1], reverse=True)
-                nested_stacks.append(current_stack)
-                current_stack = []
-        index += 1
-
-    # Combine all nested stacks
-    combined_stack = [item for sublist in nested_stacks for item in sublist]
-
-    # Traverse the combined stack to find the correct while based on count
-    for index, level in combined_stack:
-        if count == 1:
-            start_while = index
-            break
-        count -= 1
+    """Find the line of the count-th while diamond in SVG order.
 
-    return start_while
+    PlantUML draws nested whiles innermost first within each outermost loop.
+    """
+    return activity_structure(lines).while_start(count)
 
 
 def get_while_line(puml, svgchunklist, clickedelement):
@@ -175,10 +127,4 @@ def get_while_line(puml, svgchunklist, clickedelement):
 
 
 def whilecount(svgchunklist: list[SvgChunk], clickedelement: PolyElement):
-    count = 0
-    for svgchunk in svgchunklist:  # counts occurances of while polys
-        if svgchunk.text_elements and checkifwhile(svgchunk):
-            count += 1
-        if svgchunk.object == clickedelement:
-            break
-    return count
+    return chunk_ordinal(svgchunklist, clickedelement, is_while_chunk)
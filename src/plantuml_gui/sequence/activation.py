@@ -31,11 +31,11 @@ Because the gesture always starts by activating and inserts a matched pair, a
 participant can never be deactivated without first being activated.
 """
 
-from typing import List, Optional, Tuple
+from typing import Optional, Tuple
 
-from pyquery import PyQuery as Pq
-
-from .classes import Diagram, Message, Participant
+from ..shared.svg_scan import first_element
+from .classes import Diagram
+from .lexer import sequence_lines
 
 
 def add_activation(
@@ -70,46 +70,6 @@ def add_activation(
     return "\n".join(lines)
 
 
-def _activation_pairs(
-    lines: List[str], participant_name: str
-) -> List[Tuple[int, int, int]]:
-    """Pair each ``activate`` with its closing ``deactivate``/``destroy`` line.
-
-    Returns ``(activate_line, close_line, level)`` tuples for the participant,
-    resolved with a stack so nested bars pair correctly. ``level`` is the
-    nesting depth (0 = outermost), which mirrors how PlantUML offsets nested
-    bars horizontally.
-    """
-    activate_text = f"activate {participant_name}"
-    close_texts = (f"deactivate {participant_name}", f"destroy {participant_name}")
-    stack: List[int] = []
-    pairs: List[Tuple[int, int, int]] = []
-    for index, line in enumerate(lines):
-        stripped = line.strip()
-        if stripped == activate_text:
-            stack.append(index)
-        elif stripped in close_texts and stack:
-            start = stack.pop()
-            pairs.append((start, index, len(stack)))
-    return pairs
-
-
-def _message_cy_above(messages: List[Message], line_index: int) -> Optional[float]:
-    """Return the cy of the message on the closest line above ``line_index``."""
-    above = [m for m in messages if m.index < line_index]
-    if not above:
-        return None
-    return max(above, key=lambda m: m.index).cy
-
-
-def _nearest_participant(
-    participants: List[Participant], cx: float
-) -> Optional[Participant]:
-    if not participants:
-        return None
-    return min(participants, key=lambda p: abs(p.cx - cx))
-
-
 def delete_activation(puml: str, svg: str, svgelement: str) -> str:
     """Remove the activation bar matching the clicked rect and its closing line.
 
@@ -119,23 +79,23 @@ def delete_activation(puml: str, svg: str, svgelement: str) -> str:
     is offset right by the nesting level — so the clicked rect is matched to the
     nearest pair, and only that pair's two lines are removed.
     """
-    clicked = Pq(svgelement)
-    x = float(clicked.attr("x"))
-    width = float(clicked.attr("width"))
-    clicked_top = float(clicked.attr("y"))
+    clicked = first_element(svgelement)
+    x = clicked.number("x")
+    width = clicked.number("width")
+    clicked_top = clicked.number("y")
     clicked_cx = x + width / 2
     level_offset = width / 2
 
     diagram = Diagram.from_svg(svg, puml)
-    participant = _nearest_participant(diagram.participants, clicked_cx)
+    participant = diagram.participant_lookup.nearest(clicked_cx)
     if participant is None:
         return puml
 
-    lines = puml.splitlines()
+    bars = sequence_lines(puml).activations.get(participant.name, ())
     best: Optional[Tuple[int, int]] = None
     best_distance = float("inf")
-    for activate_line, close_line, level in _activation_pairs(lines, participant.name):
-        expected_top = _message_cy_above(diagram.messages, activate_line)
+    for activate_line, close_line, level in bars:
+        expected_top = diagram.message_lookup.cy_above(activate_line)
         if expected_top is None:
             continue
         expected_cx = participant.cx + level * level_offset
@@ -148,6 +108,7 @@ def delete_activation(puml: str, svg: str, svgelement: str) -> str:
         return puml
 
     activate_line, close_line = best
+    lines = puml.splitlines()
     # Delete the (higher-index) close line first so activate_line stays valid.
     del lines[close_line]
     del lines[activate_line]
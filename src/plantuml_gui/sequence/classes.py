@@ -22,10 +22,14 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+from bisect import bisect_left, bisect_right
 from dataclasses import dataclass, field
+from functools import cached_property
+from itertools import accumulate
 from typing import Dict, List
 
-from pyquery import PyQuery as Pq  # pragma: no cover
+from ..shared.svg_scan import SvgElement, scan_svg
+from .lexer import sequence_lines
 
 # Style PlantUML gives participant header rects. Used to distinguish them from
 # other rects in the SVG (e.g. activation bars, which use stroke-width:1.0).
@@ -33,24 +37,9 @@ from pyquery import PyQuery as Pq  # pragma: no cover
 PARTICIPANT_RECT_STYLE = "stroke:#181818;stroke-width:0.5;"
 
 
-def is_participant_rect(rect: Pq) -> bool:
+def is_participant_rect(rect: SvgElement) -> bool:
     """Return True if an SVG rect is a participant header (not an activation bar)."""
-    return (rect.attr("style") or "") == PARTICIPANT_RECT_STYLE
-
-
-def _participant_at(participants: List["Participant"], x: float) -> "Participant":
-    """Return the participant whose header spans ``x``, else the closest by cx.
-
-    Falling back to the nearest participant keeps message parsing robust when an
-    arrow endpoint lands slightly outside a header box (for example when an
-    activation bar shifts where the arrow meets the lifeline), instead of
-    raising and turning the whole request into a 500. Callers only parse
-    messages after participants are parsed, so the list is non-empty here.
-    """
-    for participant in participants:
-        if participant.contains_x(x):
-            return participant
-    return min(participants, key=lambda p: abs(p.cx - x))
+    return rect.attrs.get("style", "") == PARTICIPANT_RECT_STYLE
 
 
 @dataclass
@@ -69,16 +58,16 @@ class Participant:
         return isinstance(other, Participant) and self.cx == other.cx
 
     @classmethod
-    def from_svg(cls, rect: Pq, text: Pq):
-        x = float(rect.attr("x"))
-        y = float(rect.attr("y"))
-        width = float(rect.attr("width"))
-        height = float(rect.attr("height"))
+    def from_svg(cls, rect: SvgElement, text: SvgElement | None):
+        x = rect.number("x")
+        y = rect.number("y")
+        width = rect.number("width")
+        height = rect.number("height")
 
         cx = x + width / 2
         cy = y + height / 2
 
-        name = text.text()
+        name = text.text if text is not None else ""
 
         return cls(name, cx, cy, x, width)
 
@@ -93,46 +82,55 @@ class Message:
 
     @classmethod
     def from_normal_svg(
-        cls, polygon: Pq, line: Pq, text: Pq, participants: List[Participant]
+        cls,
+        polygon: SvgElement,
+        line: SvgElement,
+        text: SvgElement,
+        participants: "ParticipantIndex",
     ):
         """for normal messages <-, <--, -->, ->"""
 
         # arrow_x is the average x-value of the message arrow/polygon (used to find 'to')
-        points = polygon.attr("points")
+        points = polygon.attrs["points"]
         coords = [tuple(map(float, p.split(","))) for p in points.strip().split()]
         arrow_x = sum(p[0] for p in coords) / len(coords)
 
         # x1 and x2 are the two points of the line, the one furthest away from the arrow point is the start of it.
-        x1 = float(line.attr("x1"))
-        x2 = float(line.attr("x2"))
+        x1 = line.number("x1")
+        x2 = line.number("x2")
 
         # Determine which x is furthest from arrow_x
         start_x = x1 if abs(x1 - arrow_x) > abs(x2 - arrow_x) else x2
-        cy = float(line.attr("y1"))
+        cy = line.number("y1")
 
-        message = text.text()
+        message = text.text
 
-        from_participant = _participant_at(participants, start_x)
-        to_participant = _participant_at(participants, arrow_x)
+        from_participant = participants.at(start_x)
+        to_participant = participants.at(arrow_x)
 
         return cls(from_participant, to_participant, message, cy)
 
     @classmethod
     def from_bidirectional_svg(
-        cls, poly1: Pq, poly2: Pq, line: Pq, text: Pq, participants: List["Participant"]
+        cls,
+        poly1: SvgElement,
+        poly2: SvgElement,
+        line: SvgElement,
+        text: SvgElement,
+        participants: "ParticipantIndex",
     ):
         """for bidirectional messages <-> or <-->"""
 
-        x1 = float(line.attr("x1"))
-        x2 = float(line.attr("x2"))
-        cy = float(line.attr("y1"))
+        x1 = line.number("x1")
+        x2 = line.number("x2")
+        cy = line.number("y1")
 
-        message = text.text()
+        message = text.text
         start_x = x1
         to_x = x2
 
-        from_participant = _participant_at(participants, start_x)
-        to_participant = _participant_at(participants, to_x)
+        from_participant = participants.at(start_x)
+        to_participant = participants.at(to_x)
 
         return cls(
             from_participant=from_participant,
@@ -144,22 +142,22 @@ class Message:
     @classmethod
     def from_self_svg(
         cls,
-        line1: Pq,
-        line2: Pq,
-        line3: Pq,
-        polygon: Pq,
-        text: Pq,
-        participants: List["Participant"],
+        line1: SvgElement,
+        line2: SvgElement,
+        line3: SvgElement,
+        polygon: SvgElement,
+        text: SvgElement,
+        participants: "ParticipantIndex",
     ):
         """for self messages"""
 
         # First line is the horizontal start of the loop
-        start_x = float(line1.attr("x1"))
-        cy = float(line1.attr("y1"))
+        start_x = line1.number("x1")
+        cy = line1.number("y1")
 
-        message = text.text()
+        message = text.text
 
-        from_participant = _participant_at(participants, start_x)
+        from_participant = participants.at(start_x)
 
         return cls(
             from_participant=from_participant,
@@ -169,6 +167,92 @@ class Message:
         )
 
 
+class ParticipantIndex:
+    """Participants sorted by x, for hit tests in logarithmic time.
+
+    Ties go to the participant parsed first, as a scan of the list would.
+    """
+
+    def __init__(self, participants: List[Participant]):
+        self._participants = participants
+        by_origin = sorted(
+            range(len(participants)), key=lambda i: participants[i].x_origin
+        )
+        self._by_origin = by_origin
+        self._origins = [participants[i].x_origin for i in by_origin]
+        # Furthest right edge of the headers starting at or left of each.
+        self._reach = list(
+            accumulate(
+                (participants[i].x_origin + participants[i].width for i in by_origin),
+                max,
+            )
+        )
+        by_cx = sorted(range(len(participants)), key=lambda i: participants[i].cx)
+        self._by_cx = by_cx
+        self._cxs = [participants[i].cx for i in by_cx]
+
+    def at(self, x: float) -> Participant:
+        """Return the participant whose header spans ``x``, else the closest by cx.
+
+        Falling back to the nearest participant keeps message parsing robust
+        when an arrow endpoint lands slightly outside a header box (for
+        example when an activation bar shifts where the arrow meets the
+        lifeline), instead of raising and turning the whole request into a
+        500. Messages are only parsed after participants, so there is one.
+        """
+        position = bisect_right(self._origins, x) - 1
+        spanning = []
+        while position >= 0 and self._reach[position] >= x:
+            index = self._by_origin[position]
+            if self._participants[index].contains_x(x):
+                spanning.append(index)
+            position -= 1
+        if spanning:
+            return self._participants[min(spanning)]
+        nearest = self.nearest(x)
+        assert nearest is not None
+        return nearest
+
+    def nearest(self, x: float) -> Participant | None:
+        """Return the participant whose cx is closest to ``x``."""
+        position = bisect_left(self._cxs, x)
+        candidates = [
+            self._by_cx[i] for i in (position - 1, position) if 0 <= i < len(self._cxs)
+        ]
+        if not candidates:
+            return None
+        index = min(candidates, key=lambda i: (abs(self._participants[i].cx - x), i))
+        return self._participants[index]
+
+
+class MessageIndex:
+    """Messages sorted by puml line and by cy, for logarithmic lookups."""
+
+    def __init__(self, messages: List[Message]):
+        self._messages = messages
+        by_line = sorted(range(len(messages)), key=lambda i: messages[i].index)
+        self._lines = [messages[i].index for i in by_line]
+        self._line_cys = [messages[i].cy for i in by_line]
+        by_cy = sorted(range(len(messages)), key=lambda i: messages[i].cy)
+        self._by_cy = by_cy
+        self._cys = [messages[i].cy for i in by_cy]
+
+    def cy_above(self, line_index: int) -> float | None:
+        """Return the cy of the message on the closest line above ``line_index``."""
+        position = bisect_left(self._lines, line_index)
+        if position == 0:
+            return None
+        # The first message parsed on that line, as max() over the list gives.
+        first = bisect_left(self._lines, self._lines[position - 1])
+        return self._line_cys[first]
+
+    def near(self, y: float, tolerance: float) -> List[Message]:
+        """Return the messages less than ``tolerance`` from ``y``, in parse order."""
+        low = bisect_right(self._cys, y - tolerance)
+        high = bisect_left(self._cys, y + tolerance)
+        return [self._messages[i] for i in sorted(self._by_cy[low:high])]
+
+
 @dataclass
 class Diagram:
     participants: List[Participant] = field(default_factory=list)
@@ -176,23 +260,33 @@ class Diagram:
 
     @classmethod
     def from_svg(cls, svgtext: str, puml: str):
-        svg = Pq(svgtext)
+        # Comments are only needed for sibling walks, which stop at them.
+        elements = [element for element in scan_svg(svgtext) if element.tag]
         diagram = cls()
 
-        diagram._parse_participants(svg, puml)
-        diagram._parse_messages(svg, puml)
+        diagram._parse_participants(elements, puml)
+        diagram._parse_messages(elements, puml)
 
         return diagram
 
-    def _parse_participants(self, svg, puml):
+    @cached_property
+    def participant_lookup(self) -> ParticipantIndex:
+        """The participants by x; built once they are all parsed."""
+        return ParticipantIndex(self.participants)
+
+    @cached_property
+    def message_lookup(self) -> MessageIndex:
+        """The messages by line and cy; built once their lines are assigned."""
+        return MessageIndex(self.messages)
+
+    def _parse_participants(self, elements: List[SvgElement], puml):
         """Extract unique participants based on `cx` value."""
-        unique_participants: Dict[int, Participant] = {}
+        unique_participants: Dict[float, Participant] = {}
 
-        for rect in svg("rect").items():
-            if not is_participant_rect(rect):
+        for rect in elements:
+            if rect.tag != "rect" or not is_participant_rect(rect):
                 continue  # skip activation bars and other non-participant rects
-            text = rect.next()
-            participant = Participant.from_svg(rect, text)
+            participant = Participant.from_svg(rect, rect.next)
 
             if participant.cx not in unique_participants:
                 unique_participants[participant.cx] = participant
@@ -202,31 +296,26 @@ class Diagram:
 
     def _assign_participant_indexes(self, puml: str):
         """Assign indexes in the puml code to corresponding participant"""
-        lines = puml.splitlines()
-
-        participant_lines = [
-            i for i, line in enumerate(lines) if line.startswith("participant")
-        ]
+        participant_lines = sequence_lines(puml).participants
 
         for i, line_index in enumerate(participant_lines):
             if i < len(self.participants):
                 self.participants[i].index = line_index
 
-    def _parse_messages(self, svg, puml):
+    def _parse_messages(self, elements: List[SvgElement], puml):
         """Parse messages from svg"""
-        elements = list(svg("*").items())
         i = 0
         parsed_messages = []
 
         while i < len(elements):
             group = elements[i : i + 5]
-            tags = [el[0].tag for el in group]
+            tags = [el.tag for el in group]
 
             if tags[:4] == ["polygon", "polygon", "line", "text"]:
                 polygon1, polygon2, line, text = group[:4]
                 parsed_messages.append(
                     Message.from_bidirectional_svg(
-                        polygon1, polygon2, line, text, self.participants
+                        polygon1, polygon2, line, text, self.participant_lookup
                     )
                 )
                 i += 4
@@ -234,14 +323,16 @@ class Diagram:
                 line1, line2, line3, polygon, text = group[:5]
                 parsed_messages.append(
                     Message.from_self_svg(
-                        line1, line2, line3, polygon, text, self.participants
+                        line1, line2, line3, polygon, text, self.participant_lookup
                     )
                 )
                 i += 5
             elif tags[:3] == ["polygon", "line", "text"]:
                 polygon, line, text = group[:3]
                 parsed_messages.append(
-                    Message.from_normal_svg(polygon, line, text, self.participants)
+                    Message.from_normal_svg(
+                        polygon, line, text, self.participant_lookup
+                    )
                 )
                 i += 3
             else:
@@ -252,12 +343,9 @@ class Diagram:
 
     def _assign_message_indexes(self, puml: str):
         """Assign indexes in the puml code to corresponding message"""
-        lines = puml.splitlines()
-
-        # Find all lines that represent messages (lines with '->')
-        message_lines = [i for i, line in enumerate(lines) if "->" in line]
+        message_lines = sequence_lines(puml).messages
 
         # Messages are already in occuring order
-        for i, line_index in enumerate(message_lines):
+        for i, message_line in enumerate(message_lines):
             if i < len(self.messages):
-                self.messages[i].index = line_index
+                self.messages[i].index = message_line.index
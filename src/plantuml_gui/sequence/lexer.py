@@ -0,0 +1,169 @@
+# SPDX-License-Identifier: MIT
+#
+# MIT License
+#
+# Copyright (c) 2026 Ericsson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""One classifying pass over the lines of a sequence diagram's puml.
+
+The sequence modules pair what they find in the SVG with puml lines by
+order: the n-th participant header with the n-th ``participant`` line, the
+n-th message arrow with the n-th line holding ``->``, the n-th note with
+the n-th ``note`` line, and an activation bar with its ``activate`` line
+and the ``deactivate``/``destroy`` closing it. ``sequence_lines()`` reads
+the puml once into those tables and keeps the last 32 by content hash, so
+the lookups of one request and those of the requests that follow on the
+same puml share a single scan.
+"""
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Mapping
+
+from ..shared.metrics import count_cache
+from ..shared.timing import stage
+
+SEQUENCE_LINES_CACHE_SIZE = 32
+
+# ``alice -> bob: text``. An arrow is a shaft of dashes, optionally styled
+# inside (``-[#red]>``, ``-[dashed]->``), with a head at either end or both:
+# ``>``, ``>>``, ``\``, ``\\``, ``/``, ``//`` pointing right and ``<``, ``<<``
+# and the slashes pointing left, each optionally capped by ``o`` or ``x``
+# (``->x``, ``o<->o``).
+_LEFT_HEAD = r"<<?|//?|\\\\?"
+_RIGHT_HEAD = r">>?|//?|\\\\?"
+_SHAFT = r"-+(?:\[[^\]]*\]-*)?"
+_MESSAGE = re.compile(
+    r"\s*(?P<left>[^:]*?)\s*"
+    r"(?:(?<!\S)[ox])?"
+    rf"(?:(?P<back>{_LEFT_HEAD}){_SHAFT}(?P<both>{_RIGHT_HEAD})?|{_SHAFT}(?:{_RIGHT_HEAD}))"
+    r"(?:[ox](?=[\s:]|$))?"
+    r"\s*(?P<right>[^:]*?)\s*(?::|$)"
+)
+
+# The ends of ``[->``, ``->]``, ``?->`` and ``->?`` messages.
+_BOUNDARIES = ("[", "]", "?")
+
+
+@dataclass(frozen=True)
+class MessageLine:
+    """A message line and the participants its arrow runs from and to.
+
+    An end is "" when unnamed or a diagram boundary (``[``, ``]``, ``?``).
+    """
+
+    index: int
+    source: str
+    target: str
+
+
+@dataclass(frozen=True)
+class SequenceLines:
+    """The lines of one sequence puml by what they declare.
+
+    ``participants`` holds the lines starting with ``participant``,
+    ``messages`` those holding ``->`` and ``notes`` those starting with
+    ``note`` (after indentation), each in puml order. ``activations`` maps a
+    participant name to its bars as ``(activate_line, close_line, level)``,
+    paired with a stack so nested bars match; ``level`` is the nesting depth
+    (0 = outermost), in the order the bars close.
+    """
+
+    participants: tuple[int, ...] = ()
+    messages: tuple[MessageLine, ...] = ()
+    notes: tuple[int, ...] = ()
+    activations: Mapping[str, tuple[tuple[int, int, int], ...]] = field(
+        default_factory=lambda: MappingProxyType({})
+    )
+
+    def note_line(self, ordinal: int) -> int:
+        """Return the line of the ``ordinal``-th note (1-based), else -1."""
+        return self.notes[ordinal - 1] if 0 < ordinal <= len(self.notes) else -1
+
+
+_cache: OrderedDict[bytes, SequenceLines] = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def sequence_lines(puml: str) -> SequenceLines:
+    """Return the tables of ``puml``, scanning it only if not cached."""
+    key = hashlib.blake2b(puml.encode("utf-8"), digest_size=16).digest()
+    with _cache_lock:
+        tables = _cache.get(key)
+        if tables is not None:
+            _cache.move_to_end(key)
+    if tables is not None:
+        count_cache("sequence_lines", hit=True)
+        return tables
+    count_cache("sequence_lines", hit=False)
+    with stage("puml"):
+        tables = _scan(puml.splitlines())
+    with _cache_lock:
+        _cache[key] = tables
+        while len(_cache) > SEQUENCE_LINES_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return tables
+
+
+def _message(index: int, line: str) -> MessageLine:
+    match = _MESSAGE.match(line)
+    if match is None:
+        return MessageLine(index, "", "")
+    left, right = (
+        "" if name in _BOUNDARIES else name for name in (match["left"], match["right"])
+    )
+    if match["back"] and not match["both"]:
+        return MessageLine(index, right, left)
+    return MessageLine(index, left, right)
+
+
+def _scan(lines: list[str]) -> SequenceLines:
+    participants: list[int] = []
+    messages: list[MessageLine] = []
+    notes: list[int] = []
+    open_bars: dict[str, list[int]] = {}
+    bars: dict[str, list[tuple[int, int, int]]] = {}
+    for index, line in enumerate(lines):
+        if line.startswith("participant"):
+            participants.append(index)
+        if "->" in line:
+            messages.append(_message(index, line))
+        stripped = line.strip()
+        keyword, _, name = stripped.partition(" ")
+        if keyword == "note" and name:
+            notes.append(index)
+        elif keyword == "activate" and name:
+            open_bars.setdefault(name, []).append(index)
+        elif keyword in ("deactivate", "destroy") and open_bars.get(name):
+            stack = open_bars[name]
+            start = stack.pop()
+            bars.setdefault(name, []).append((start, index, len(stack)))
+    return SequenceLines(
+        tuple(participants),
+        tuple(messages),
+        tuple(notes),
+        MappingProxyType({name: tuple(pairs) for name, pairs in bars.items()}),
+    )
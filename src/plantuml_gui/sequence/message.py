@@ -24,28 +24,11 @@
 
 from typing import Dict, List
 
-from pyquery import PyQuery as Pq
-
-from .classes import Diagram, Participant
+from ..shared.svg_scan import SvgElement, first_element, scan_svg
+from .classes import Diagram
 from .util import find_insertion_index
 
 
-def _find_closest_participant(
-    participants: List[Participant], target_cx: int
-) -> Participant:
-    """Find the participant with the closest cx value to the target_cx."""
-    min_distance = float("inf")
-    closest = participants[0]
-
-    for participant in participants:
-        distance = abs(participant.cx - target_cx)
-        if distance < min_distance:
-            min_distance = distance
-            closest = participant
-
-    return closest
-
-
 def add_message(
     puml: str,
     svg: str,
@@ -59,8 +42,10 @@ def add_message(
     second_x, _second_y = secondcoordinates
 
     diagram = Diagram.from_svg(svg, puml)
-    sender = _find_closest_participant(diagram.participants, first_x)
-    reciever = _find_closest_participant(diagram.participants, second_x)
+    sender = diagram.participant_lookup.nearest(first_x)
+    reciever = diagram.participant_lookup.nearest(second_x)
+    if sender is None or reciever is None:
+        raise IndexError("the diagram has no participants")
 
     lines = puml.splitlines()
     insert_at = find_insertion_index(diagram.messages, svg, puml, first_y, lines)
@@ -68,26 +53,19 @@ def add_message(
     return "\n".join(lines)
 
 
-def _svg_element_matches(element: Pq, clicked: Pq) -> bool:
+def _svg_element_matches(element: SvgElement, clicked: SvgElement) -> bool:
     """Check if two SVG elements match by comparing tag and key attributes."""
-    tag = element[0].tag
-    clicked_tag = clicked[0].tag
-    if tag != clicked_tag:
+    if element.tag != clicked.tag:
+        return False
+    if element.tag == "polygon":
+        keys: tuple[str, ...] = ("points",)
+    elif element.tag == "line":
+        keys = ("x1", "x2", "y1", "y2")
+    elif element.tag == "text":
+        keys = ("x", "y")
+    else:
         return False
-    if tag == "polygon":
-        return element.attr("points") == clicked.attr("points")
-    if tag == "line":
-        return (
-            element.attr("x1") == clicked.attr("x1")
-            and element.attr("x2") == clicked.attr("x2")
-            and element.attr("y1") == clicked.attr("y1")
-            and element.attr("y2") == clicked.attr("y2")
-        )
-    if tag == "text":
-        return element.attr("x") == clicked.attr("x") and element.attr(
-            "y"
-        ) == clicked.attr("y")
-    return False
+    return all(element.attrs.get(key) == clicked.attrs.get(key) for key in keys)
 
 
 def index_of_clicked_message(svg: str, svgelement: str) -> int:
@@ -96,15 +74,14 @@ def index_of_clicked_message(svg: str, svgelement: str) -> int:
     Iterates SVG elements using the same grouping logic as Diagram._parse_messages,
     checking if the clicked element matches any element in each message group.
     """
-    d = Pq(svg)
-    clicked = Pq(svgelement)
-    elements = list(d("*").items())
+    clicked = first_element(svgelement)
+    elements = [element for element in scan_svg(svg) if element.tag]
     i = 0
     message_index = 0
 
     while i < len(elements):
         group = elements[i : i + 5]
-        tags = [el[0].tag for el in group]
+        tags = [el.tag for el in group]
 
         if tags[:4] == ["polygon", "polygon", "line", "text"]:
             message_index += 1
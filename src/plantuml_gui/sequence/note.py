@@ -24,8 +24,7 @@
 
 from typing import List
 
-from pyquery import PyQuery as Pq
-
+from ..shared.svg_scan import first_element, scan_svg
 from .classes import Diagram, Message
 from .util import _find_note_line_index, find_insertion_index
 
@@ -97,7 +96,11 @@ def add_note(
 
     # Check if we should attach to a nearby message
     if placement in ("left", "right"):
-        nearest = _find_nearest_message(diagram.messages, y_position, x_position)
+        nearest = _find_nearest_message(
+            diagram.message_lookup.near(y_position, MESSAGE_NOTE_TOLERANCE),
+            y_position,
+            x_position,
+        )
         if nearest:
             note_line = f"note {placement} : {text}"
             lines.insert(nearest.index + 1, note_line)
@@ -116,20 +119,18 @@ def index_of_clicked_note(svg: str, svgelement: str) -> int:
     has two paths (body + fold corner). We count the body paths (those
     followed by another #FEFFDD path) and match by the d attribute.
     """
-    clicked = Pq(svgelement)
-    clicked_d = clicked.attr("d")
+    clicked_d = first_element(svgelement).attrs.get("d")
 
-    d = Pq(svg)
-    paths = list(d("path").items())
+    paths = [element for element in scan_svg(svg) if element.tag == "path"]
     count = 0
 
     for i, path in enumerate(paths):
-        if path.attr("fill") != "#FEFFDD":
+        if path.attrs.get("fill") != "#FEFFDD":
             continue
         # A note body path is followed by the fold corner path
-        if i + 1 < len(paths) and paths[i + 1].attr("fill") == "#FEFFDD":
+        if i + 1 < len(paths) and paths[i + 1].attrs.get("fill") == "#FEFFDD":
             count += 1
-            if path.attr("d") == clicked_d:
+            if path.attrs.get("d") == clicked_d:
                 return count
 
     return -1
@@ -23,12 +23,12 @@
 # SOFTWARE.
 
 import html
-import re
 from typing import Dict, List
 
-from pyquery import PyQuery as Pq
-
+from ..shared.label_counters import next_label
+from ..shared.svg_scan import first_element, scan_svg
 from .classes import Diagram, is_participant_rect
+from .lexer import sequence_lines
 
 
 def index_of_clicked_participant(svg: str, svgelement: str) -> int:
@@ -43,16 +43,15 @@ def index_of_clicked_participant(svg: str, svgelement: str) -> int:
     Participants are deduplicated by center-x because PlantUML renders two
     rects per participant (top and bottom header boxes) with the same cx.
     """
-    clicked_rect = Pq(svgelement)
-    clicked_cx = float(clicked_rect.attr("x")) + float(clicked_rect.attr("width")) / 2
+    clicked_rect = first_element(svgelement)
+    clicked_cx = clicked_rect.number("x") + clicked_rect.number("width") / 2
 
-    d = Pq(svg)
     seen_cx: set[float] = set()
     count = 0
-    for rect in d("rect").items():
-        if not is_participant_rect(rect):
+    for rect in scan_svg(svg):
+        if rect.tag != "rect" or not is_participant_rect(rect):
             continue  # skip activation bars and other non-participant rects
-        cx = float(rect.attr("x")) + float(rect.attr("width")) / 2
+        cx = rect.number("x") + rect.number("width") / 2
         if cx not in seen_cx:
             seen_cx.add(cx)
             count += 1
@@ -62,12 +61,8 @@ def index_of_clicked_participant(svg: str, svgelement: str) -> int:
 
 
 def _next_participant_number(puml: str) -> int:
-    """Find the next available participant number by checking existing names."""
-    numbers = [
-        int(m.group(1))
-        for m in re.finditer(r"^participant participant(\d+)", puml, re.MULTILINE)
-    ]
-    return max(numbers, default=0) + 1
+    """Return the number of the next ``participantN`` added to ``puml``."""
+    return next_label(puml, "participant")
 
 
 def add_participant(puml: str, svg: str, svgelement: str, direction: str) -> str:
@@ -110,9 +105,8 @@ def delete_participant(puml: str, svg: str, svgelement: str) -> str:
     for msg in diagram.messages:
         if msg.from_participant == participant or msg.to_participant == participant:
             lines_to_remove.add(msg.index)
-    for i, line in enumerate(lines):
-        stripped = line.strip()
-        if stripped.startswith("note ") and participant.name in stripped:
+    for i in sequence_lines(puml).notes:
+        if participant.name in lines[i]:
             lines_to_remove.add(i)
 
     lines = [line for i, line in enumerate(lines) if i not in lines_to_remove]
@@ -122,17 +116,18 @@ def delete_participant(puml: str, svg: str, svgelement: str) -> str:
 def get_participant_positions(puml: str, svg: str) -> List[Dict[str, object]]:
     """Return participant lifeline positions for frontend hover detection."""
     diagram = Diagram.from_svg(svg, puml)
-    d = Pq(svg)
 
     # Extract lifeline vertical bounds from dashed lines
     lifeline_bounds: Dict[float, Dict[str, float]] = {}
-    for line in d("line").items():
-        style = line.attr("style") or ""
+    for line in scan_svg(svg):
+        if line.tag != "line":
+            continue
+        style = line.attrs.get("style", "")
         if "stroke-dasharray:5.0,5.0" in style:
-            x = float(line.attr("x1"))
+            x = line.number("x1")
             lifeline_bounds[x] = {
-                "yTop": float(line.attr("y1")),
-                "yBottom": float(line.attr("y2")),
+                "yTop": line.number("y1"),
+                "yBottom": line.number("y2"),
             }
 
     positions = []
@@ -22,8 +22,10 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify
 
+from ..shared.documents import request_data
+from ..shared.line_delta import puml_edit
 from .activation import add_activation, delete_activation
 from .message import (
     add_message,
@@ -45,8 +47,9 @@ sequence_bp = Blueprint("sequence", __name__)
 
 
 @sequence_bp.route("/addParticipant", methods=["POST"])
+@puml_edit("plantuml")
 def addparticipant():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     svgelement = data["svgelement"]
@@ -55,8 +58,9 @@ def addparticipant():
 
 
 @sequence_bp.route("/addMessage", methods=["POST"])
+@puml_edit("plantuml")
 def addmessage():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     message = data["message"]
@@ -73,8 +77,9 @@ def addmessage():
 
 
 @sequence_bp.route("/addActivation", methods=["POST"])
+@puml_edit("plantuml")
 def addactivation():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     participant = data["participant"]
     start_index = data["startMessageIndex"]
@@ -90,8 +95,9 @@ def addactivation():
 
 
 @sequence_bp.route("/deleteActivation", methods=["POST"])
+@puml_edit("plantuml")
 def deleteactivation():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     svgelement = data["svgelement"]
@@ -100,7 +106,7 @@ def deleteactivation():
 
 @sequence_bp.route("/getParticipantName", methods=["POST"])
 def getparticipantname():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     svgelement = data["svgelement"]
@@ -108,8 +114,9 @@ def getparticipantname():
 
 
 @sequence_bp.route("/editParticipantName", methods=["POST"])
+@puml_edit("plantuml")
 def editparticipantname():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     name = data["name"]
@@ -118,8 +125,9 @@ def editparticipantname():
 
 
 @sequence_bp.route("/deleteParticipant", methods=["POST"])
+@puml_edit("plantuml")
 def deleteparticipant():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     svgelement = data["svgelement"]
@@ -128,7 +136,7 @@ def deleteparticipant():
 
 @sequence_bp.route("/getParticipantPositions", methods=["POST"])
 def getparticipantpositions():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     return jsonify({"positions": get_participant_positions(puml, svg)})
@@ -136,7 +144,7 @@ def getparticipantpositions():
 
 @sequence_bp.route("/getMessageText", methods=["POST"])
 def getmessagetext():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     svgelement = data["svgelement"]
@@ -144,8 +152,9 @@ def getmessagetext():
 
 
 @sequence_bp.route("/editMessageText", methods=["POST"])
+@puml_edit("plantuml")
 def editmessagetext():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     svgelement = data["svgelement"]
@@ -154,8 +163,9 @@ def editmessagetext():
 
 
 @sequence_bp.route("/deleteMessage", methods=["POST"])
+@puml_edit("plantuml")
 def deletemessage():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     svgelement = data["svgelement"]
@@ -164,15 +174,16 @@ def deletemessage():
 
 @sequence_bp.route("/getMessagePositions", methods=["POST"])
 def getmessagepositions():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     return jsonify({"positions": get_message_positions(puml, svg)})
 
 
 @sequence_bp.route("/addNote", methods=["POST"])
+@puml_edit("plantuml")
 def addnote():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     participant = data["participant"]
@@ -199,7 +210,7 @@ def addnote():
 
 @sequence_bp.route("/getSeqNoteText", methods=["POST"])
 def getseqnotetext():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     svgelement = data["svgelement"]
@@ -207,8 +218,9 @@ def getseqnotetext():
 
 
 @sequence_bp.route("/editSeqNote", methods=["POST"])
+@puml_edit("plantuml")
 def editseqnote():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     svgelement = data["svgelement"]
@@ -217,8 +229,9 @@ def editseqnote():
 
 
 @sequence_bp.route("/deleteSeqNote", methods=["POST"])
+@puml_edit("plantuml")
 def deleteseqnote():
-    data = request.get_json()
+    data = request_data()
     puml = data["plantuml"]
     svg = data["svg"]
     svgelement = data["svgelement"]
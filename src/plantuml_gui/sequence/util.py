@@ -22,41 +22,37 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+from bisect import bisect_right
 from typing import List
 
-from pyquery import PyQuery as Pq
-
+from ..shared.svg_scan import scan_svg
 from .classes import Message
+from .lexer import sequence_lines
 
 
 def _find_note_line_index(puml: str, note_index: int) -> int:
     """Find the puml line index of the nth note (1-based)."""
-    lines = puml.splitlines()
-    count = 0
-    for i, line in enumerate(lines):
-        stripped = line.strip()
-        if stripped.startswith("note "):
-            count += 1
-            if count == note_index:
-                return i
-    return -1
+    return sequence_lines(puml).note_line(note_index)
 
 
 def extract_note_positions(svg: str, puml: str) -> List[tuple[float, int]]:
-    """Extract (cy, line_index) for each note from SVG path data."""
-    d = Pq(svg)
-    paths = list(d("path").items())
+    """Extract (cy, line_index) for each note from SVG path data.
+
+    The n-th note drawn is the n-th note line of the puml, so both are
+    walked together in one pass; a note with no line left gets -1.
+    """
+    note_lines = iter(sequence_lines(puml).notes)
+    paths = [element for element in scan_svg(svg) if element.tag == "path"]
     positions = []
-    note_count = 0
     i = 0
 
     while i < len(paths):
         path = paths[i]
-        if path.attr("fill") != "#FEFFDD":
+        if path.attrs.get("fill") != "#FEFFDD":
             i += 1
             continue
-        if i + 1 < len(paths) and paths[i + 1].attr("fill") == "#FEFFDD":
-            d_attr = path.attr("d") or ""
+        if i + 1 < len(paths) and paths[i + 1].attrs.get("fill") == "#FEFFDD":
+            d_attr = path.attrs.get("d", "")
             parts = d_attr.split(",")
             if len(parts) >= 2:
                 y_str = parts[1].split(" ")[0]
@@ -66,9 +62,7 @@ def extract_note_positions(svg: str, puml: str) -> List[tuple[float, int]]:
                     cy = 0.0
             else:
                 cy = 0.0
-            note_count += 1
-            line_index = _find_note_line_index(puml, note_count)
-            positions.append((cy, line_index))
+            positions.append((cy, next(note_lines, -1)))
             i += 2  # skip the fold corner path
         else:
             i += 1
@@ -89,9 +83,9 @@ def find_insertion_index(
     elements.extend(extract_note_positions(svg, puml))
     elements.sort(key=lambda x: x[0])
 
-    for cy, line_index in elements:
-        if cy > y:
-            return line_index
+    position = bisect_right([cy for cy, _ in elements], y)
+    if position < len(elements):
+        return elements[position][1]
 
     # After all elements: insert before @enduml
     for i in range(len(lines) - 1, -1, -1):
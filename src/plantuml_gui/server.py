@@ -0,0 +1,294 @@
+# SPDX-License-Identifier: MIT
+#
+# MIT License
+#
+# Copyright (c) 2026 Ericsson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Pre-fork production server, started with ``python -m plantuml_gui serve``.
+
+The master process binds the listening socket, imports the app and does
+the rest of the start-up work that does not depend on a worker (hashing
+the static files, compiling the page template), then freezes the garbage
+collector so the forked workers keep sharing those pages copy-on-write.
+It forks the workers and only supervises them afterwards: a worker that
+dies is replaced, and signals are handled as follows.
+
+- ``SIGTERM`` / ``SIGINT``: stop. Workers stop accepting connections,
+  finish the requests they hold and exit; after ``graceful_timeout``
+  seconds the rest are killed.
+- ``SIGHUP``: reload. ``.env`` is read again, a new set of workers is
+  forked and the old ones stop gracefully, so no request is dropped.
+
+With ``PLANTUML_METRICS_DIR`` set, the master empties that directory at
+start and folds the metrics file of every worker it reaps into the
+retired totals.
+
+Consecutive requests of one editor tab may reach different workers, so
+more than one worker needs ``PLANTUML_DOCUMENT_DIR``: a document stored by
+one worker's ``/render`` must be found by the worker serving the next
+edit. ``/render`` coalescing only drops renders superseded within the
+same worker; the browser ignores stale answers from the others.
+
+Each worker answers requests on a fixed number of threads and warms its
+own PlantUML pool right after the fork (a running JVM and its pipes cannot
+be shared between processes); ``/readyz`` answers 503 until that is done.
+"""
+
+import gc
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from dotenv import load_dotenv
+from loguru import logger
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+from .app import app
+from .shared.metrics import clear_shared_metrics, retire_shared_metrics
+from .shared.render import ENV_FILE, warm_renderer
+from .shared.routes import generate_static_js_hash
+
+DEFAULT_WORKERS = 1
+DEFAULT_THREADS = 8
+DEFAULT_GRACEFUL_TIMEOUT = 30.0
+
+
+class _RequestHandler(WSGIRequestHandler):
+    # One request per connection: an idle keep-alive connection would hold
+    # one of the worker's few threads until the client closes it.
+    protocol_version = "HTTP/1.0"
+
+
+class PooledWSGIServer(BaseWSGIServer):
+    """Werkzeug's server answering each connection on a bounded thread pool.
+
+    While every thread is busy the accept loop waits, leaving new
+    connections in the shared listen queue for the other workers.
+    """
+
+    multithread = True
+    multiprocess = True
+
+    def __init__(self, host: str, port: int, threads: int, fd: int | None = None):
+        super().__init__(host, port, app, handler=_RequestHandler, fd=fd)
+        self._free = threading.BoundedSemaphore(threads)
+        self._executor = ThreadPoolExecutor(threads, thread_name_prefix="request")
+
+    def process_request(self, request, client_address):
+        self._free.acquire()
+        self._executor.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self._free.release()
+
+    def finish_requests(self):
+        """Wait for the requests in progress to be answered."""
+        self._executor.shutdown(wait=True)
+
+
+def preload() -> None:
+    """Do the start-up work every worker would repeat, before forking."""
+    generate_static_js_hash()
+    app.jinja_env.get_template("index.html")
+    # Objects allocated so far are never collected; the collector then
+    # does not write to their pages and break copy-on-write sharing.
+    gc.freeze()
+
+
+def _run_worker(listener: socket.socket, threads: int, master: int) -> None:
+    host, port = listener.getsockname()[:2]
+    server = PooledWSGIServer(host, port, threads, fd=listener.fileno())
+
+    def stop(*_args):
+        # shutdown() waits for serve_forever() to return, so it cannot run
+        # on the main thread that is serving.
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    def watch_master():
+        while os.getppid() == master:
+            time.sleep(1.0)
+        stop()
+
+    signal.signal(signal.SIGTERM, stop)
+    # Ctrl-C reaches the whole process group; the master decides.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    threading.Thread(target=warm_renderer, daemon=True).start()
+    threading.Thread(target=watch_master, daemon=True).start()
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        server.finish_requests()
+
+
+class Master:
+    """Forks the workers, replaces those that die and handles the signals."""
+
+    def __init__(
+        self,
+        listener: socket.socket,
+        workers: int,
+        threads: int,
+        graceful_timeout: float,
+    ):
+        self.listener = listener
+        self.size = workers
+        self.threads = threads
+        self.graceful_timeout = graceful_timeout
+        self.workers: set[int] = set()  # the current generation
+        self.stopping: dict[int, float] = {}  # pid: when to kill it
+        self._signals: list[int] = []
+        self._respawn_at = 0.0
+
+    def run(self) -> None:
+        for handled in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+            signal.signal(handled, lambda signum, _frame: self._signals.append(signum))
+        self._spawn_missing()
+        while True:
+            self._reap()
+            while self._signals:
+                if self._signals.pop(0) == signal.SIGHUP:
+                    self.reload()
+                else:
+                    self.stop()
+                    return
+            self._spawn_missing()
+            time.sleep(0.1)
+
+    def reload(self) -> None:
+        load_dotenv(ENV_FILE, override=True)
+        old = self.workers
+        self.workers = set()
+        self._spawn_missing()
+        self._terminate(old)
+        logger.info("Reloaded: {} new workers", self.size)
+
+    def stop(self) -> None:
+        self._terminate(self.workers)
+        self.workers = set()
+        while self.stopping:
+            self._reap()
+            time.sleep(0.1)
+        logger.info("Stopped")
+
+    def _spawn_missing(self) -> None:
+        if time.monotonic() < self._respawn_at:
+            return
+        while len(self.workers) < self.size:
+            pid = os.fork()
+            if pid == 0:
+                self._signals.clear()
+                try:
+                    _run_worker(self.listener, self.threads, os.getppid())
+                except Exception:
+                    logger.exception("Worker {} failed", os.getpid())
+                    sys.exit(1)
+                sys.exit(0)
+            self.workers.add(pid)
+            logger.info("Started worker {}", pid)
+
+    def _terminate(self, pids) -> None:
+        deadline = time.monotonic() + self.graceful_timeout
+        for pid in pids:
+            self.stopping[pid] = deadline
+            _signal(pid, signal.SIGTERM)
+
+    def _reap(self) -> None:
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                pid = 0
+            if pid == 0:
+                break
+            retire_shared_metrics(pid)
+            if pid in self.workers:
+                self.workers.discard(pid)
+                # A worker that fails at start would otherwise be forked
+                # again and again as fast as it dies.
+                self._respawn_at = time.monotonic() + 1.0
+                logger.warning(
+                    "Worker {} exited with {}; replacing it",
+                    pid,
+                    os.waitstatus_to_exitcode(status),
+                )
+            self.stopping.pop(pid, None)
+        now = time.monotonic()
+        for pid, deadline in list(self.stopping.items()):
+            if now >= deadline:
+                logger.warning("Worker {} did not stop in time; killing it", pid)
+                _signal(pid, signal.SIGKILL)
+                self.stopping[pid] = float("inf")
+
+
+def _signal(pid: int, signum: int) -> None:
+    try:
+        os.kill(pid, signum)
+    except ProcessLookupError:
+        pass
+
+
+def serve(
+    host: str = "127.0.0.1",
+    port: int = 5000,
+    workers: int = DEFAULT_WORKERS,
+    threads: int = DEFAULT_THREADS,
+    graceful_timeout: float = DEFAULT_GRACEFUL_TIMEOUT,
+) -> None:
+    """Serve the app on ``host:port`` until SIGTERM or SIGINT."""
+    if not hasattr(os, "fork"):
+        raise SystemExit("serve needs os.fork(); use python -m plantuml_gui here")
+    if workers > 1 and not os.environ.get("PLANTUML_DOCUMENT_DIR"):
+        raise SystemExit(
+            "serve with more than one worker needs PLANTUML_DOCUMENT_DIR, so "
+            "every worker finds the documents the others stored"
+        )
+    listener = socket.create_server(
+        (host, port),
+        family=socket.AF_INET6 if ":" in host else socket.AF_INET,
+        backlog=1024,
+    )
+    listener.set_inheritable(True)
+    clear_shared_metrics()
+    try:
+        preload()
+        host, port = listener.getsockname()[:2]
+        logger.info(
+            "Listening on http://{}:{} with {} workers of {} threads",
+            host,
+            port,
+            workers,
+            threads,
+        )
+        Master(listener, workers, threads, graceful_timeout).run()
+    finally:
+        listener.close()
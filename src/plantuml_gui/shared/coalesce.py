@@ -0,0 +1,95 @@
+# SPDX-License-Identifier: MIT
+#
+# MIT License
+#
+# Copyright (c) 2026 Ericsson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Per-session coalescing of renders.
+
+The editor re-renders on every pause in typing, so a fast typist can have
+several /render requests for the same session in flight, each holding a
+Flask worker and a JVM. Only the newest one matters. Each render carries the
+editor's session id and an increasing revision number; a session renders one
+revision at a time, and any render still waiting when a newer revision
+arrives is dropped without ever reaching PlantUML.
+"""
+
+import threading
+from collections.abc import Callable
+from typing import TypeVar
+
+T = TypeVar("T")
+
+
+class _Session:
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.latest = -1
+        self.busy = False
+        self.waiting = 0
+
+
+class RenderCoalescer:
+    """Runs at most one render per session and drops superseded revisions."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sessions: dict[str, _Session] = {}
+
+    def run(self, session_id: str, revision: int, render: Callable[[], T]) -> T | None:
+        """Call render unless a newer revision of the session shows up first.
+
+        Returns None when the revision was superseded, either on arrival or
+        while it waited for the session's previous render to finish. A render
+        that has already started runs to completion, since stopping a pooled
+        PlantUML process mid-diagram costs a JVM restart; its result still
+        lands in the render cache.
+        """
+        with self._lock:
+            session = self._sessions.setdefault(session_id, _Session())
+            session.waiting += 1
+        try:
+            with session.condition:
+                if revision < session.latest:
+                    return None
+                session.latest = revision
+                session.condition.notify_all()
+                while session.busy:
+                    session.condition.wait()
+                    if revision < session.latest:
+                        return None
+                session.busy = True
+            try:
+                return render()
+            finally:
+                with session.condition:
+                    session.busy = False
+                    session.condition.notify_all()
+        finally:
+            with self._lock:
+                session.waiting -= 1
+                if session.waiting == 0:
+                    del self._sessions[session_id]
+
+    def sessions(self) -> int:
+        """Number of sessions with a render running or waiting."""
+        with self._lock:
+            return len(self._sessions)
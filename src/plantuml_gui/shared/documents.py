@@ -0,0 +1,242 @@
+# SPDX-License-Identifier: MIT
+#
+# MIT License
+#
+# Copyright (c) 2026 Ericsson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Server-side copies of the diagrams being edited.
+
+Every edit route needs the puml text and the rendered SVG, and without a
+store the browser uploads both with every click, hundreds of kilobytes for
+a large diagram. When /render is told which document it renders, it keeps
+the puml and SVG here under that id; edit requests can then send
+``document`` and ``revision`` instead, and ``request_data()`` fills in
+``plantuml`` and ``svg`` from the store.
+Documents expire after ``PLANTUML_DOCUMENT_TTL`` seconds without a render.
+
+A revision is a hash of the puml and SVG, not a counter. A reference can
+therefore only resolve to the text it was issued for: when another
+render replaced the document (in another worker, say), the hash no
+longer matches and the request is refused instead of editing other text.
+
+A document also carries the counters of the labels generated in it
+(``label_counters``), so numbers stay taken across its revisions without
+leaking into other documents that hold the same text.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from flask import request
+
+from .label_counters import LabelCounters, use_document_labels
+from .timing import stage
+
+DEFAULT_DOCUMENT_TTL = 3600.0
+
+_document_store: "DocumentStore | None" = None
+_document_store_lock = threading.Lock()
+
+
+class StaleDocumentError(Exception):
+    """The referenced document is unknown, expired or at another revision."""
+
+
+def revision_of(puml: str, svg: str) -> str:
+    """Return the revision of a document with this puml and SVG."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(len(puml)).encode())
+    digest.update(b"\0")
+    digest.update(puml.encode("utf-8"))
+    digest.update(svg.encode("utf-8"))
+    return digest.hexdigest()
+
+
+@dataclass
+class Document:
+    id: str
+    revision: str  # revision_of(puml, svg)
+    puml: str
+    svg: str  # inner markup of the diagram's <g>, as the browser sends it
+    updated: float  # time.time() of the render that stored it
+    labels: LabelCounters | None = None  # numbers taken by generated labels
+
+
+class DocumentStore:
+    """Documents by id, in memory or, given a directory, on disk.
+
+    With a directory every read goes to disk, so worker processes sharing
+    it see each other's renders and documents survive a restart; since
+    revisions are content hashes, a reference never resolves to another
+    render's text. Expired documents are dropped when read and, at most
+    once per TTL, swept.
+    """
+
+    def __init__(self, ttl: float, directory: str | Path | None = None):
+        self.ttl = ttl
+        self.directory = Path(directory) if directory else None
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        self._documents: dict[str, Document] = {}
+        self._lock = threading.Lock()
+        self._last_sweep = time.time()
+
+    def put(
+        self,
+        document_id: str,
+        puml: str,
+        svg: str,
+        labels: LabelCounters | None = None,
+    ) -> Document:
+        """Store a new revision of a document and return it."""
+        now = time.time()
+        document = Document(document_id, revision_of(puml, svg), puml, svg, now, labels)
+        with self._lock:
+            if self.directory is None:
+                self._documents[document_id] = document
+            else:
+                self._write_disk(document)
+            if now - self._last_sweep >= self.ttl:
+                self._sweep(now)
+        return document
+
+    def get(self, document_id: str) -> Document | None:
+        with self._lock:
+            return self._load(document_id, time.time())
+
+    def _load(self, document_id: str, now: float) -> Document | None:
+        if self.directory is None:
+            document = self._documents.get(document_id)
+        else:
+            document = self._read_disk(document_id)
+        if document is None:
+            return None
+        if now - document.updated > self.ttl:
+            self._documents.pop(document_id, None)
+            self._remove_disk(document_id)
+            return None
+        return document
+
+    def _sweep(self, now: float) -> None:
+        for document_id in list(self._documents):
+            if now - self._documents[document_id].updated > self.ttl:
+                del self._documents[document_id]
+        if self.directory is not None:
+            for path in self.directory.iterdir():
+                try:
+                    if now - path.stat().st_mtime > self.ttl:
+                        path.unlink()
+                except OSError:
+                    pass
+        self._last_sweep = now
+
+    def _path(self, document_id: str) -> Path:
+        # Ids come from the browser, so they are hashed rather than used as names.
+        assert self.directory is not None
+        name = hashlib.sha256(document_id.encode("utf-8")).hexdigest()
+        return self.directory / name
+
+    def _read_disk(self, document_id: str) -> Document | None:
+        if self.directory is None:
+            return None
+        try:
+            stored = json.loads(self._path(document_id).read_text())
+            labels = stored.pop("labels", None)
+            document = Document(
+                **stored, labels=LabelCounters(**labels) if labels else None
+            )
+        except (OSError, ValueError, TypeError):
+            return None
+        return document if document.id == document_id else None
+
+    def _write_disk(self, document: Document) -> None:
+        if self.directory is None:
+            return
+        try:
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                json.dump(asdict(document), file)
+            os.replace(temp_path, self._path(document.id))
+        except OSError:
+            pass
+
+    def _remove_disk(self, document_id: str) -> None:
+        if self.directory is None:
+            return
+        try:
+            self._path(document_id).unlink()
+        except OSError:
+            pass
+
+
+def document_store() -> DocumentStore:
+    """Return the document store, creating it from the environment on first use."""
+    global _document_store
+    with _document_store_lock:
+        if _document_store is None:
+            _document_store = DocumentStore(
+                float(os.environ.get("PLANTUML_DOCUMENT_TTL", DEFAULT_DOCUMENT_TTL)),
+                os.environ.get("PLANTUML_DOCUMENT_DIR") or None,
+            )
+        return _document_store
+
+
+def editor_text(puml: str) -> str:
+    """Strip every line, as ``trimlines()`` in script.js does."""
+    return "\n".join(line.strip() for line in puml.split("\n"))
+
+
+def request_data() -> dict:
+    """Return an edit request's JSON body with a document reference resolved.
+
+    A body with ``document`` and ``revision`` gets ``plantuml`` and ``svg``
+    from the stored document, if it still has that content hash, unless it
+    sends them itself; ``trimlines``
+    asks for the puml with every line stripped, which is what most edit
+    calls send. Labels generated for a puml taken from the document are
+    numbered from the document's counters. Raises
+    StaleDocumentError when the store does not hold that revision, so the
+    client can retry with the full body.
+    """
+    with stage("json"):
+        data = request.get_json()
+    if "document" not in data:
+        use_document_labels(None)
+        return data
+    document = document_store().get(str(data["document"]))
+    if document is None or document.revision != data.get("revision"):
+        raise StaleDocumentError(
+            f"document {data['document']!r} is not at revision {data.get('revision')}"
+        )
+    puml = editor_text(document.puml) if data.get("trimlines") else document.puml
+    # Compared rather than tested for presence: a route and its puml_edit
+    # wrapper both resolve the same body.
+    from_document = data.get("plantuml", puml) == puml
+    use_document_labels(document.labels if from_document else None)
+    data.setdefault("plantuml", puml)
+    data.setdefault("svg", document.svg)
+    return data
@@ -0,0 +1,142 @@
+# SPDX-License-Identifier: MIT
+#
+# MIT License
+#
+# Copyright (c) 2026 Ericsson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""Numbers of the labels the edit routes generate.
+
+A new activity is labelled ``:Activity n;``, a new arrow label ``-> Arrow
+label n;``, a new switch case ``case ( condition n)`` and a new participant
+``participantn``, with ``n`` one past the highest number of its kind.
+
+Counters belong to a document, not to a text: ``/render`` carries a
+document's counters from its previous revision to the new one with
+``edited_label_counters()``, which scans only the lines the edit changed
+and keeps the higher of each number, so a number stays taken after the
+label holding it is deleted. An edit request that references a document
+allocates from that document's counters (``use_document_labels()``); any
+other request scans the puml it sent. Two documents holding the same text
+therefore number independently.
+"""
+
+import re
+from contextvars import ContextVar
+from dataclasses import dataclass, fields
+from typing import Literal
+
+from .timing import stage
+
+Label = Literal["activity", "arrow_label", "case", "participant"]
+
+_LABELS = re.compile(
+    r":Activity (?P<activity>\d+)"
+    r"|-> Arrow label (?P<arrow_label>\d+);"
+    r"|case \( condition (?P<case>\d+)\)"
+    r"|^participant participant(?P<participant>\d+)",
+    re.MULTILINE,
+)
+
+
+@dataclass(frozen=True)
+class LabelCounters:
+    """The highest number taken by each kind of generated label."""
+
+    activity: int = 0
+    arrow_label: int = 0
+    case: int = 0
+    participant: int = 0
+
+    def merged(self, other: "LabelCounters") -> "LabelCounters":
+        """Return the higher of each number of ``self`` and ``other``."""
+        return LabelCounters(
+            *(max(getattr(self, name), getattr(other, name)) for name in _FIELD_NAMES)
+        )
+
+
+_FIELD_NAMES = tuple(field.name for field in fields(LabelCounters))
+
+_document_labels: ContextVar[LabelCounters | None] = ContextVar(
+    "document_labels", default=None
+)
+
+
+def next_label(puml: str, label: Label) -> int:
+    """Return the number a new ``label`` in ``puml`` gets.
+
+    Within a request that references a document this is one past that
+    document's counter, otherwise one past the highest number in ``puml``.
+    """
+    counters = _document_labels.get()
+    if counters is None:
+        counters = label_counters(puml)
+    return getattr(counters, label) + 1
+
+
+def use_document_labels(counters: LabelCounters | None) -> None:
+    """Allocate the current request's labels from ``counters``.
+
+    ``None`` makes ``next_label()`` scan the puml it is given.
+    """
+    _document_labels.set(counters)
+
+
+def label_counters(puml: str) -> LabelCounters:
+    """Return the label counters of ``puml`` from a scan of all of it."""
+    with stage("puml"):
+        return _scan(puml)
+
+
+def edited_label_counters(
+    counters: LabelCounters, old_puml: str, puml: str
+) -> LabelCounters:
+    """Return the counters of ``puml``, an edit of ``old_puml`` with ``counters``.
+
+    Only the lines the edit changed are scanned, and every number taken in
+    ``counters`` stays taken.
+    """
+    old_lines = old_puml.split("\n")
+    lines = puml.split("\n")
+    with stage("puml"):
+        first, stop = _changed(old_lines, lines)
+        return counters.merged(_scan("\n".join(lines[first:stop])))
+
+
+def _changed(old_lines: list[str], lines: list[str]) -> tuple[int, int]:
+    """Return the slice of ``lines`` that differs from ``old_lines``."""
+    limit = min(len(old_lines), len(lines))
+    first = 0
+    while first < limit and old_lines[first] == lines[first]:
+        first += 1
+    same_end = 0
+    while same_end < limit - first and old_lines[-1 - same_end] == lines[-1 - same_end]:
+        same_end += 1
+    return first, len(lines) - same_end
+
+
+def _scan(puml: str) -> LabelCounters:
+    highest = dict.fromkeys(_FIELD_NAMES, 0)
+    for match in _LABELS.finditer(puml):
+        name = match.lastgroup
+        if name is not None:
+            highest[name] = max(highest[name], int(match[name]))
+    return LabelCounters(**highest)
@@ -0,0 +1,155 @@
+# SPDX-License-Identifier: MIT
+#
+# MIT License
+#
+# Copyright (c) 2026 Ericsson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""Line-level differences between the puml an edit route got and returned.
+
+Edit routes answer with the whole rewritten puml, although a click changes
+a few lines of it. A request that sends ``"delta": true`` gets the change
+as operations on the lines of the puml it edited instead:
+
+``{"base": <sha256 of that puml>, "ops": [...], "field": ...}``
+
+Each operation is ``{"op": "insert" | "delete" | "replace", "index": i,
+"count": n, "lines": [...]}``: ``count`` lines of the base from line ``i``
+on (0-based, none for an insert) are replaced by ``lines`` (none for a
+delete). Operations are in line order and refer to the base as it was, so
+a client applies them from the last one back. ``field`` names the JSON
+field the full response would have held the puml in (sequence routes),
+and is left out for routes that answer with the puml as text. Delta
+responses carry the ``X-Line-Delta`` header.
+"""
+
+import hashlib
+from collections.abc import Callable
+from difflib import SequenceMatcher
+from functools import wraps
+from typing import Any
+
+from flask import Response, jsonify, request
+
+from .documents import request_data
+from .timing import stage
+
+LINE_DELTA_HEADER = "X-Line-Delta"
+
+# The views ``puml_edit`` wrapped, with the JSON field each answers in.
+edit_routes: dict[Callable, str | None] = {}
+
+
+def line_delta(base: str, puml: str) -> list[dict]:
+    """Return the operations that turn the lines of ``base`` into ``puml``'s."""
+    old = base.split("\n")
+    new = puml.split("\n")
+    first = 0
+    limit = min(len(old), len(new))
+    while first < limit and old[first] == new[first]:
+        first += 1
+    same_end = 0
+    while same_end < limit - first and old[-1 - same_end] == new[-1 - same_end]:
+        same_end += 1
+    # Only the lines between the common start and end are matched up.
+    matcher = SequenceMatcher(
+        None, old[first : len(old) - same_end], new[first : len(new) - same_end], False
+    )
+    ops = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            continue
+        op: dict[str, Any] = {"op": tag, "index": first + i1, "count": i2 - i1}
+        if j2 > j1:
+            op["lines"] = new[first + j1 : first + j2]
+        ops.append(op)
+    return ops
+
+
+def apply_line_delta(base: str, ops: list[dict]) -> str:
+    """Return ``base`` with ``ops`` from ``line_delta()`` applied."""
+    lines = base.split("\n")
+    for op in reversed(ops):
+        lines[op["index"] : op["index"] + op["count"]] = op.get("lines", [])
+    return "\n".join(lines)
+
+
+def moved_line(index: int, ops: list[dict]) -> int | None:
+    """Return where line ``index`` of the base is once ``ops`` are applied.
+
+    A line inside a replaced range keeps its offset into the replacement;
+    None when that offset falls past it, or the line was deleted.
+    """
+    shift = 0
+    for op in ops:
+        if op["index"] > index:
+            break
+        added = len(op.get("lines", ()))
+        if index >= op["index"] + op["count"]:
+            shift += added - op["count"]
+        elif index - op["index"] < added:
+            return index + shift
+        else:
+            return None
+    return index + shift
+
+
+def base_hash(puml: str) -> str:
+    """Return the digest a client checks its copy of the edited puml against."""
+    return hashlib.sha256(puml.encode("utf-8")).hexdigest()
+
+
+def puml_edit(field: str | None = None) -> Callable[[Callable], Callable]:
+    """Mark a route that answers with rewritten puml, so it can send a delta.
+
+    ``field`` is the JSON field the route puts the puml in; without one the
+    route returns the puml as text. Requests without ``"delta": true`` get
+    the route's response unchanged.
+    """
+
+    def decorate(route: Callable) -> Callable:
+        @wraps(route)
+        def respond(*args, **kwargs):
+            with stage("json"):
+                body = request.get_json(silent=True)
+            if not isinstance(body, dict) or not body.get("delta"):
+                return route(*args, **kwargs)
+            base = request_data()["plantuml"]
+            response = route(*args, **kwargs)
+            if field is None and isinstance(response, str):
+                puml = response
+            elif field is not None and isinstance(response, Response):
+                puml = response.get_json()[field]
+            else:  # an error response
+                return response
+            with stage("delta"):
+                delta: dict[str, Any] = {
+                    "base": base_hash(base),
+                    "ops": line_delta(base, puml),
+                }
+            if field is not None:
+                delta["field"] = field
+            return jsonify(delta), {LINE_DELTA_HEADER: "1"}
+
+        edit_routes[respond] = field
+        return respond
+
+    return decorate
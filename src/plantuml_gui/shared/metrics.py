@@ -0,0 +1,424 @@
+# SPDX-License-Identifier: MIT
+#
+# MIT License
+#
+# Copyright (c) 2026 Ericsson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Prometheus metrics of the editor backend, served by ``GET /metrics``.
+
+Every process keeps its own counters and histograms in memory:
+
+- requests by blueprint, route, method and status, with their latency and
+  the byte sizes of their bodies (the puml and SVG payloads)
+- PlantUML renders by format and outcome (``ok``, ``syntax_error``,
+  ``failed``, ``timeout``, ``busy``) with their durations
+- hits and misses of the render cache and the content caches (SVG index,
+  activity structure, sequence lines)
+
+Under several worker processes each one sees only its own requests, so
+with ``PLANTUML_METRICS_DIR`` set every process also writes its totals to
+``metrics-<pid>-<uuid>.json`` there (at most once a second, and at exit)
+and ``/metrics`` adds up every file. Changes held back by that limit are
+written by a timer when the second is up, so a worker that goes idle
+does not keep its last requests from the others' scrapes. The random part keeps a reused pid
+from writing over another process's file. ``serve`` empties the directory
+when it starts, and folds the file of each worker it reaps into
+``metrics-retired.json`` so the totals never go down.
+"""
+
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from collections.abc import Iterable
+from contextvars import ContextVar
+from pathlib import Path
+
+FLUSH_INTERVAL = 1.0  # seconds between writes of a process's totals
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_SECONDS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_RENDER_SECONDS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+_BYTES = tuple(float(1024 * 4**i) for i in range(8))  # 1 KiB to 16 MiB
+
+# name: (type, help, histogram buckets)
+METRICS: dict[str, tuple[str, str, tuple[float, ...]]] = {
+    "plantuml_http_requests_total": ("counter", "HTTP requests by route.", ()),
+    "plantuml_http_request_duration_seconds": (
+        "histogram",
+        "Time from receiving a request to its response.",
+        _SECONDS,
+    ),
+    "plantuml_http_request_size_bytes": (
+        "histogram",
+        "Size of request bodies.",
+        _BYTES,
+    ),
+    "plantuml_http_response_size_bytes": (
+        "histogram",
+        "Size of response bodies.",
+        _BYTES,
+    ),
+    "plantuml_renders_total": ("counter", "PlantUML renders by outcome.", ()),
+    "plantuml_render_duration_seconds": (
+        "histogram",
+        "Time PlantUML spent rendering, once given a slot.",
+        _RENDER_SECONDS,
+    ),
+    "plantuml_cache_hits_total": ("counter", "Cache lookups that found an entry.", ()),
+    "plantuml_cache_misses_total": (
+        "counter",
+        "Cache lookups that had to compute the entry.",
+        (),
+    ),
+}
+
+Labels = tuple[tuple[str, str], ...]
+
+
+class MetricsRegistry:
+    """Counters and histograms of this process, optionally shared on disk."""
+
+    def __init__(self, directory: str | Path | None = None):
+        self.directory = Path(directory) if directory else None
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        self._counters: dict[tuple[str, Labels], float] = {}
+        # Per histogram: the count of each bucket, then the sum and the count.
+        self._histograms: dict[tuple[str, Labels], list[float]] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._last_flush = 0.0
+        self._flush_timer: threading.Timer | None = None
+        self.file_name = f"metrics-{os.getpid()}-{uuid.uuid4().hex}.json"
+
+    def inc(self, name: str, value: float = 1.0, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        buckets = METRICS[name][2]
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            series = self._histograms.get(key)
+            if series is None:
+                series = self._histograms[key] = [0.0] * (len(buckets) + 2)
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def snapshot(self) -> dict:
+        """This process's totals, in the form written to the directory."""
+        with self._lock:
+            return {
+                "counters": [
+                    [name, dict(labels), value]
+                    for (name, labels), value in self._counters.items()
+                ],
+                "histograms": [
+                    [name, dict(labels), list(series)]
+                    for (name, labels), series in self._histograms.items()
+                ],
+            }
+
+    def flush(self, force: bool = False) -> None:
+        """Write this process's totals, at most once per FLUSH_INTERVAL.
+
+        A flush held back by the interval is done by a timer once the
+        interval is over.
+        """
+        if self.directory is None:
+            return
+        with self._flush_lock:
+            now = time.monotonic()
+            wait = self._last_flush + FLUSH_INTERVAL - now
+            if not force and wait > 0:
+                if self._flush_timer is None:
+                    self._flush_timer = threading.Timer(wait, self._flush_later)
+                    self._flush_timer.daemon = True
+                    self._flush_timer.start()
+                return
+            self._last_flush = now
+            _write(self.directory / self.file_name, self.snapshot())
+
+    def _flush_later(self) -> None:
+        with self._flush_lock:
+            self._flush_timer = None
+        self.flush()
+
+    def snapshots(self) -> list[dict]:
+        """The totals of every process: this one's and the others' files."""
+        own = self.snapshot()
+        if self.directory is None:
+            return [own]
+        self.flush(force=True)
+        files = {
+            path.name: own if path.name == self.file_name else _read(path)
+            for path in self.directory.glob("metrics-*.json")
+        }
+        # A reaped worker's file may still be here after its totals were
+        # folded into the retired file; count them once.
+        retired = set(files.get("metrics-retired.json", {}).get("files", ()))
+        return [snapshot for name, snapshot in files.items() if name not in retired]
+
+
+def _write(path: Path, snapshot: dict) -> None:
+    try:
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            json.dump(snapshot, file)
+        os.replace(temp_path, path)
+    except OSError:
+        pass
+
+
+def _read(path: Path) -> dict:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}  # removed, or a process is replacing it right now
+
+
+def _add_up(
+    snapshots: Iterable[dict],
+) -> tuple[dict[tuple[str, Labels], float], dict[tuple[str, Labels], list[float]]]:
+    counters: dict[tuple[str, Labels], float] = {}
+    histograms: dict[tuple[str, Labels], list[float]] = {}
+    for snapshot in snapshots:
+        for name, labels, value in snapshot.get("counters", ()):
+            key = (name, tuple(sorted(labels.items())))
+            counters[key] = counters.get(key, 0.0) + value
+        for name, labels, series in snapshot.get("histograms", ()):
+            key = (name, tuple(sorted(labels.items())))
+            total = histograms.setdefault(key, [0.0] * len(series))
+            for i, value in enumerate(series):
+                total[i] += value
+    return counters, histograms
+
+
+def exposition(snapshots: Iterable[dict]) -> str:
+    """Add up ``snapshots`` and format them in the Prometheus text format."""
+    counters, histograms = _add_up(snapshots)
+    lines = []
+    for name, (kind, help_text, buckets) in METRICS.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for (series_name, labels), value in sorted(counters.items()):
+            if series_name == name:
+                lines.append(f"{name}{_labels(labels)} {_number(value)}")
+        for (series_name, labels), series in sorted(histograms.items()):
+            if series_name != name:
+                continue
+            cumulative = 0.0
+            for bound, count in zip(buckets, series):
+                cumulative += count
+                le = (("le", _number(bound)),)
+                lines.append(
+                    f"{name}_bucket{_labels(labels + le)} {_number(cumulative)}"
+                )
+            count = series[-1]
+            lines.append(
+                f'{name}_bucket{_labels(labels + (("le", "+Inf"),))} {_number(count)}'
+            )
+            lines.append(f"{name}_sum{_labels(labels)} {_number(series[-2])}")
+            lines.append(f"{name}_count{_labels(labels)} {_number(count)}")
+
+    # The hit ratio over the server's life, from the two cache counters.
+    lines.append("# HELP plantuml_cache_hit_ratio Share of cache lookups that hit.")
+    lines.append("# TYPE plantuml_cache_hit_ratio gauge")
+    caches = sorted(
+        {labels for name, labels in counters if name.startswith("plantuml_cache_")}
+    )
+    for labels in caches:
+        hits = counters.get(("plantuml_cache_hits_total", labels), 0.0)
+        misses = counters.get(("plantuml_cache_misses_total", labels), 0.0)
+        ratio = hits / (hits + misses) if hits + misses else 0.0
+        lines.append(f"plantuml_cache_hit_ratio{_labels(labels)} {_number(ratio)}")
+    return "\n".join(lines) + "\n"
+
+
+def _labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (name, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in labels
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if value == int(value) else repr(value)
+
+
+_metrics: MetricsRegistry | None = None
+_metrics_lock = threading.Lock()
+_request_start: ContextVar[float | None] = ContextVar("request_start", default=None)
+
+
+def metrics() -> MetricsRegistry:
+    """Return this process's registry, creating it from the environment on first use."""
+    global _metrics
+    if _metrics is not None:
+        return _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = MetricsRegistry(os.environ.get("PLANTUML_METRICS_DIR") or None)
+        return _metrics
+
+
+def _directory() -> Path | None:
+    directory = os.environ.get("PLANTUML_METRICS_DIR")
+    return Path(directory) if directory else None
+
+
+def clear_shared_metrics() -> None:
+    """Remove the totals a previous server left in ``PLANTUML_METRICS_DIR``."""
+    directory = _directory()
+    if directory is None or not directory.is_dir():
+        return
+    for path in [*directory.glob("metrics-*.json"), *directory.glob(".tmp-*")]:
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+
+def retire_shared_metrics(pid: int) -> None:
+    """Fold the files of exited process ``pid`` into ``metrics-retired.json``.
+
+    Only the process that reaped ``pid`` may call this; it is then the one
+    writer of the retired file, and no new process has that pid yet.
+    """
+    directory = _directory()
+    if directory is None:
+        return
+    paths = list(directory.glob(f"metrics-{pid}-*.json"))
+    if not paths:
+        return
+    retired = directory / "metrics-retired.json"
+    previous = _read(retired)
+    counters, histograms = _add_up([previous, *(_read(path) for path in paths)])
+    _write(
+        retired,
+        {
+            "files": [*previous.get("files", ()), *(path.name for path in paths)],
+            "counters": [
+                [name, dict(labels), value]
+                for (name, labels), value in counters.items()
+            ],
+            "histograms": [
+                [name, dict(labels), series]
+                for (name, labels), series in histograms.items()
+            ],
+        },
+    )
+    for path in paths:
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+
+def _forget_after_fork():
+    # A forked worker starts its own registry, with its own file.
+    global _metrics
+    _metrics = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_after_fork)
+
+
+@atexit.register
+def _flush_at_exit():
+    if _metrics is not None:
+        _metrics.flush(force=True)
+
+
+def count_cache(cache: str, hit: bool) -> None:
+    """Count a lookup in ``cache``."""
+    name = "plantuml_cache_hits_total" if hit else "plantuml_cache_misses_total"
+    metrics().inc(name, cache=cache)
+
+
+def record_render(output_format: str, outcome: str, seconds: float | None) -> None:
+    """Count a render and, unless it never ran, its duration."""
+    registry = metrics()
+    registry.inc("plantuml_renders_total", format=output_format, outcome=outcome)
+    if seconds is not None:
+        registry.observe(
+            "plantuml_render_duration_seconds", seconds, format=output_format
+        )
+
+
+def start_request_metrics() -> None:
+    _request_start.set(time.perf_counter())
+
+
+def finish_request_metrics(
+    blueprint: str,
+    route: str,
+    method: str,
+    status: int,
+    request_bytes: int | None,
+    response_bytes: int | None,
+) -> None:
+    """Count a request with its latency and body sizes."""
+    start = _request_start.get()
+    _request_start.set(None)
+    registry = metrics()
+    registry.inc(
+        "plantuml_http_requests_total",
+        blueprint=blueprint,
+        route=route,
+        method=method,
+        status=str(status),
+    )
+    if start is not None:
+        registry.observe(
+            "plantuml_http_request_duration_seconds",
+            time.perf_counter() - start,
+            blueprint=blueprint,
+            route=route,
+        )
+    if request_bytes is not None:
+        registry.observe(
+            "plantuml_http_request_size_bytes",
+            request_bytes,
+            blueprint=blueprint,
+            route=route,
+        )
+    if response_bytes is not None:
+        registry.observe(
+            "plantuml_http_response_size_bytes",
+            response_bytes,
+            blueprint=blueprint,
+            route=route,
+        )
+    registry.flush()
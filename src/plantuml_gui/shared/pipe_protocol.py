@@ -0,0 +1,134 @@
+# SPDX-License-Identifier: MIT
+#
+# MIT License
+#
+# Copyright (c) 2026 Ericsson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Framing for many diagrams over one PlantUML ``-pipe`` stream.
+
+PlantUML in ``-pipe`` mode reads ``@start…@end`` blocks from stdin one after
+another and writes one image per block to stdout. Started with
+``-pipedelimitor <token>`` it prints the token on its own line after each
+image, and with ``-pipeNoStderr`` it writes the syntax-error report for a
+failed diagram to stdout, between the image and the token, instead of to
+stderr. One stdout frame therefore holds exactly one diagram's answer::
+
+    <svg or png bytes>[ERROR\\n<line>\\n<message>\\n…]<token>\\n
+
+The helpers here split the stream into frames and each frame into the image
+and its error report, so an error is attributed to the diagram that caused it
+rather than read from a stderr shared by every request.
+"""
+
+from dataclasses import dataclass, field
+from typing import IO
+
+PIPE_OPTIONS = ["-pipeNoStderr"]
+
+SVG_END = b"</svg>"
+PNG_END = b"IEND\xaeB`\x82"  # IEND chunk type followed by its CRC
+
+
+@dataclass
+class RenderResult:
+    """The image PlantUML produced for one diagram, plus its error report if any.
+
+    For a diagram with a syntax error PlantUML still draws an image (the error
+    as a picture), so ``data`` is always what the frontend shows;
+    ``error_line`` and ``error_messages`` tell whether it is such an image.
+    """
+
+    data: bytes
+    error_line: int | None = None
+    error_messages: list[str] = field(default_factory=list)
+
+    @property
+    def failed(self) -> bool:
+        return self.error_line is not None
+
+
+def encode_diagrams(diagrams: list[str]) -> bytes:
+    """Join diagrams into one stdin payload, each ending with a newline."""
+    return b"".join(diagram.encode("utf-8") + b"\n" for diagram in diagrams)
+
+
+class FrameReader:
+    """Splits a PlantUML stdout stream into per-diagram frames."""
+
+    def __init__(self, stream: IO[bytes], delimiter: bytes):
+        self.stream = stream
+        self.delimiter = delimiter
+        self._buffer = bytearray()
+
+    def read_frame(self) -> bytes:
+        """Return the bytes before the next delimiter line, reading as needed.
+
+        Reads use ``read1`` so the call returns as soon as a frame is complete.
+        Bytes after the delimiter line are kept for the next call, which
+        matters when several diagrams were written in one go. Raises EOFError
+        if the stream ends first, i.e. the process died.
+        """
+        search_from = 0
+        while True:
+            position = self._buffer.find(self.delimiter, search_from)
+            if position != -1:
+                newline = self._buffer.find(b"\n", position + len(self.delimiter))
+                if newline != -1:
+                    frame = bytes(self._buffer[:position])
+                    del self._buffer[: newline + 1]
+                    return frame
+            else:
+                # The delimiter may be split across two reads.
+                search_from = max(0, len(self._buffer) - len(self.delimiter))
+            chunk = self.stream.read1(65536)  # type: ignore[attr-defined]
+            if not chunk:
+                raise EOFError("PlantUML closed its output")
+            self._buffer += chunk
+
+
+def parse_frame(frame: bytes) -> RenderResult:
+    """Split one frame into the image and the error report that may follow it."""
+    image_end = SVG_END if frame.lstrip().startswith(b"<") else PNG_END
+    end = frame.rfind(image_end)
+    if end == -1:
+        return RenderResult(frame)
+    end += len(image_end)
+    report = frame[end:]
+    if not report.strip().startswith(b"ERROR"):
+        return RenderResult(frame)
+    error_line, error_messages = parse_error_report(report)
+    return RenderResult(frame[:end], error_line, error_messages)
+
+
+def parse_error_report(report: bytes) -> tuple[int | None, list[str]]:
+    """Parse PlantUML's ``ERROR`` / line number / messages report.
+
+    Returns ``(None, [])`` when the text is not such a report, so it can be
+    applied to a one-off process's stderr as well.
+    """
+    lines = report.decode("utf-8", errors="replace").strip().splitlines()
+    if not lines or lines[0].strip() != "ERROR":
+        return None, []
+    try:
+        error_line = int(lines[1])
+    except (IndexError, ValueError):
+        return -1, lines[1:]
+    return error_line, [line for line in lines[2:] if line.strip()]
@@ -23,38 +23,278 @@
 # SOFTWARE.
 
 #!/usr/bin/env python3
-"""Contains the class that converts inline PlantUML code to image links to new image files."""
+"""Contains the class that converts inline PlantUML code to image links to new image files.
 
+Renders go through a pool of warm PlantUML processes (see render_pool.py) when
+``PLANTUML_POOL_SIZE`` is above zero, which is the default. Input that is not
+exactly one ``@start…@end`` diagram is rendered by a one-off process instead,
+so PlantUML sees it exactly as before.
+
+Results are kept in a content-addressed cache (see render_cache.py), so
+re-rendering text that was rendered before, as undo/redo does, skips java.
+Renders that do reach PlantUML first take a slot from the render scheduler
+(see scheduler.py), which caps how many run at once.
+"""
+
+import atexit
 import os
+import shlex
+import threading
+import time
 from pathlib import Path
-from subprocess import PIPE, run
+from subprocess import PIPE, TimeoutExpired, run
 
 from dotenv import load_dotenv
 
-load_dotenv(Path(__file__).parent.parent.parent.parent / ".env", override=True)
+from .metrics import count_cache, record_render
+from .pipe_protocol import RenderResult, parse_error_report
+from .render_cache import RenderCache, cache_key
+from .render_pool import RenderPool, RenderTimeoutError, WorkerDiedError
+from .scheduler import RenderScheduler
+from .timing import stage
 
+ENV_FILE = Path(__file__).parent.parent.parent.parent / ".env"
+load_dotenv(ENV_FILE, override=True)
 
-def _create_svg_from_uml(uml):
-    """Create a scalable vector graphic(SVG) from a UML string
-    :param uml: The input UML text used for creating the image
-    :return: The content of generated svg
-    """
-    base_command = [
+DEFAULT_POOL_SIZE = 2
+DEFAULT_RENDER_TIMEOUT = 30.0
+DEFAULT_RENDER_CACHE_BYTES = 64 * 1024 * 1024
+# Serial GC keeps each JVM to one GC thread; the heap cap bounds the memory a
+# pathological diagram can take. Override with PLANTUML_JVM_OPTIONS.
+DEFAULT_JVM_OPTIONS = "-Xmx1g -XX:+UseSerialGC"
+DEFAULT_MAX_CONCURRENT_RENDERS = 4
+DEFAULT_RENDER_QUEUE = 32
+LIMIT_SIZE_FLAG = "-DPLANTUML_LIMIT_SIZE=16384"
+WARM_UP_DIAGRAM = "@startuml\nstart\n:warm up;\nstop\n@enduml"
+
+_pools: dict[str, RenderPool] = {}
+_pools_lock = threading.Lock()
+_render_cache: RenderCache | None = None
+_render_cache_lock = threading.Lock()
+_render_scheduler: RenderScheduler | None = None
+_render_scheduler_lock = threading.Lock()
+# Set once PlantUML has rendered something in this process.
+_renderer_warm = threading.Event()
+_renderer_error: str | None = None
+
+
+def _plantuml_command(output_format):
+    return [
         "java",
-        "-DPLANTUML_LIMIT_SIZE=16384",
+        *shlex.split(os.environ.get("PLANTUML_JVM_OPTIONS", DEFAULT_JVM_OPTIONS)),
+        LIMIT_SIZE_FLAG,
         "-jar",
         os.environ["PLANTUML_JAR"],
         "-pipe",
-        "-tsvg",  # output in svg format
+        f"-t{output_format}",  # output in svg or png format
     ]
-    process = run(
-        base_command,
-        stdout=PIPE,
-        stderr=PIPE,
-        input=bytes(uml, "utf-8"),
-        check=False,
+
+
+def _single_diagram(uml):
+    """Return the ``@start…@end`` block if uml holds exactly one diagram, else None.
+
+    Only such input can be framed on a pooled worker's stdin: anything else
+    (no @enduml yet while typing, several diagrams, stray text around the
+    block) could leave the worker waiting for more input or answering twice.
+    """
+    lines = uml.splitlines()
+    starts = [i for i, line in enumerate(lines) if line.strip().startswith("@start")]
+    ends = [i for i, line in enumerate(lines) if line.strip().startswith("@end")]
+    if len(starts) != 1 or len(ends) != 1 or ends[0] < starts[0]:
+        return None
+    outside = lines[: starts[0]] + lines[ends[0] + 1 :]
+    if any(line.strip() for line in outside):
+        return None
+    return "\n".join(lines[starts[0] : ends[0] + 1])
+
+
+def _pool(output_format):
+    """Return the worker pool for a format, starting it on first use."""
+    size = int(os.environ.get("PLANTUML_POOL_SIZE", DEFAULT_POOL_SIZE))
+    if size <= 0:
+        return None
+    with _pools_lock:
+        if output_format not in _pools:
+            timeout = float(
+                os.environ.get("PLANTUML_RENDER_TIMEOUT", DEFAULT_RENDER_TIMEOUT)
+            )
+            _pools[output_format] = RenderPool(
+                _plantuml_command(output_format), size, timeout
+            )
+        return _pools[output_format]
+
+
+@atexit.register
+def _close_pools():
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
+
+
+def _jar_version(jar_path):
+    """Identify the jar by name, size and mtime, so replacing it changes cache keys."""
+    try:
+        stat = os.stat(jar_path)
+    except OSError:
+        return jar_path
+    return f"{Path(jar_path).name}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def render_cache():
+    """Return the render cache, creating it on first use; None when disabled."""
+    global _render_cache
+    max_bytes = int(
+        os.environ.get("PLANTUML_RENDER_CACHE_BYTES", DEFAULT_RENDER_CACHE_BYTES)
+    )
+    if max_bytes <= 0:
+        return None
+    with _render_cache_lock:
+        if _render_cache is None:
+            _render_cache = RenderCache(
+                max_bytes, os.environ.get("PLANTUML_RENDER_CACHE_DIR") or None
+            )
+        return _render_cache
+
+
+def _max_concurrent_renders() -> int:
+    """Return how many renders the scheduler lets reach PlantUML at once.
+
+    With the pool on this is at most its size, by default exactly that: a
+    render admitted beyond it would wait inside the pool for a worker,
+    past the scheduler's 503, and that wait would count against its
+    render timeout.
+    """
+    size = int(os.environ.get("PLANTUML_POOL_SIZE", DEFAULT_POOL_SIZE))
+    configured = os.environ.get("PLANTUML_MAX_CONCURRENT_RENDERS")
+    if size <= 0:
+        return int(configured or DEFAULT_MAX_CONCURRENT_RENDERS)
+    return min(int(configured), size) if configured else size
+
+
+def render_scheduler() -> RenderScheduler:
+    """Return the scheduler that bounds concurrent renders, creating it on first use."""
+    global _render_scheduler
+    with _render_scheduler_lock:
+        if _render_scheduler is None:
+            _render_scheduler = RenderScheduler(
+                _max_concurrent_renders(),
+                int(os.environ.get("PLANTUML_RENDER_QUEUE", DEFAULT_RENDER_QUEUE)),
+                float(
+                    os.environ.get("PLANTUML_RENDER_TIMEOUT", DEFAULT_RENDER_TIMEOUT)
+                ),
+            )
+        return _render_scheduler
+
+
+def render_diagram(uml, output_format) -> RenderResult:
+    """Render uml and report whether PlantUML flagged a syntax error in it.
+
+    Raises RenderBusyError when no render slot is free, RenderTimeoutError
+    when PlantUML runs longer than ``PLANTUML_RENDER_TIMEOUT`` and
+    WorkerDiedError when a pooled process dies mid-render.
+    """
+    cache = render_cache()
+    if cache is None:
+        return _render_scheduled(uml, output_format)
+    key = cache_key(
+        uml,
+        output_format,
+        _jar_version(os.environ["PLANTUML_JAR"]),
+        LIMIT_SIZE_FLAG,
     )
-    return process.stdout.decode("utf-8")
+    result = cache.get(key)
+    count_cache("render", hit=result is not None)
+    if result is None:
+        result = _render_scheduled(uml, output_format)
+        # An empty answer means java itself failed; retry it next time.
+        if result.data:
+            cache.put(key, result)
+    return result
+
+
+def _render_scheduled(uml, output_format) -> RenderResult:
+    start = None
+    outcome = "busy"
+    try:
+        with render_scheduler().slot():
+            start = time.perf_counter()
+            outcome = "failed"
+            result = _render_uncached(uml, output_format)
+            if result.data:
+                outcome = "syntax_error" if result.failed else "ok"
+                _renderer_warm.set()
+            return result
+    except RenderTimeoutError:
+        outcome = "timeout"
+        raise
+    finally:
+        seconds = None if start is None else time.perf_counter() - start
+        record_render(output_format, outcome, seconds)
+
+
+def warm_renderer() -> bool:
+    """Start the SVG worker pool and render a small diagram on it.
+
+    A server calls this before taking traffic, so the first edit does not
+    wait for JVM startup, and to find a missing java or jar at once. The
+    outcome is what ``renderer_status()`` reports; any later render that
+    succeeds also marks the renderer warm.
+    """
+    global _renderer_error
+    try:
+        result = _render_uncached(WARM_UP_DIAGRAM, "svg")
+    except (OSError, KeyError, RenderTimeoutError, WorkerDiedError) as error:
+        _renderer_error = f"{type(error).__name__}: {error}"
+        return False
+    if not result.data:
+        _renderer_error = "PlantUML produced no output"
+        return False
+    _renderer_error = None
+    _renderer_warm.set()
+    return True
+
+
+def renderer_status() -> dict:
+    """Whether PlantUML has rendered in this process, for the readiness probe."""
+    if _renderer_warm.is_set():
+        return {"ready": True, "renderer": "warm"}
+    if _renderer_error is not None:
+        return {"ready": False, "renderer": "failed", "error": _renderer_error}
+    return {"ready": False, "renderer": "cold"}
+
+
+def _render_uncached(uml, output_format) -> RenderResult:
+    diagram = _single_diagram(uml)
+    pool = _pool(output_format) if diagram is not None else None
+    if pool is not None:
+        return pool.render(diagram)
+    timeout = float(os.environ.get("PLANTUML_RENDER_TIMEOUT", DEFAULT_RENDER_TIMEOUT))
+    try:
+        process = run(
+            _plantuml_command(output_format),
+            stdout=PIPE,
+            stderr=PIPE,
+            input=bytes(uml, "utf-8"),
+            check=False,
+            timeout=timeout,
+        )
+    except TimeoutExpired:
+        # run() has already killed the process.
+        raise RenderTimeoutError(
+            f"PlantUML did not finish rendering within {timeout}s"
+        ) from None
+    error_line, error_messages = parse_error_report(process.stderr)
+    return RenderResult(process.stdout, error_line, error_messages)
+
+
+def _create_svg_from_uml(uml):
+    """Create a scalable vector graphic(SVG) from a UML string
+    :param uml: The input UML text used for creating the image
+    :return: The content of generated svg
+    """
+    with stage("render"):
+        return render_diagram(uml, "svg").data.decode("utf-8")
 
 
 def _create_png_from_uml(uml):
@@ -62,19 +302,5 @@ def _create_png_from_uml(uml):
     :param uml: The input UML text used for creating the image
     :return: The content of generated png
     """
-    base_command = [
-        "java",
-        "-DPLANTUML_LIMIT_SIZE=16384",
-        "-jar",
-        os.environ["PLANTUML_JAR"],
-        "-pipe",
-        "-tpng",  # output in png format
-    ]
-    process = run(
-        base_command,
-        stdout=PIPE,
-        stderr=PIPE,
-        input=bytes(uml, "utf-8"),
-        check=False,
-    )
-    return process.stdout
+    with stage("render"):
+        return render_diagram(uml, "png").data
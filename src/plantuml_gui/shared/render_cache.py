@@ -0,0 +1,151 @@
+# SPDX-License-Identifier: MIT
+#
+# MIT License
+#
+# Copyright (c) 2026 Ericsson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Content-addressed cache of rendered diagrams.
+
+Undo/redo and re-renders after a no-op edit send the exact same puml to
+/render again. The cache key is a hash of everything that decides the output
+(puml text, output format, PlantUML jar and the size-limit flag), so a hit can
+be served without touching java and can never be stale. Entries live in an
+in-memory LRU bounded by bytes and, when a directory is configured, also on
+disk so they survive a restart.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from .pipe_protocol import RenderResult
+
+
+def cache_key(uml: str, output_format: str, jar_version: str, limit_size: str) -> str:
+    """Hash the render inputs into a key; any change in them gives a new key."""
+    hasher = hashlib.sha256()
+    for part in (jar_version, output_format, limit_size, uml):
+        hasher.update(part.encode("utf-8"))
+        hasher.update(b"\0")
+    return hasher.hexdigest()
+
+
+class RenderCache:
+    """LRU of RenderResults bounded by total image bytes, with an optional disk tier.
+
+    Disk entries are written once and never evicted by the cache itself; the
+    directory can be emptied at any time.
+    """
+
+    def __init__(self, max_bytes: int, directory: str | Path | None = None):
+        self.max_bytes = max_bytes
+        self.directory = Path(directory) if directory else None
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        self._entries: OrderedDict[str, RenderResult] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> RenderResult | None:
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return result
+        result = self._read_disk(key)
+        with self._lock:
+            if result is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, result)
+        return result
+
+    def put(self, key: str, result: RenderResult) -> None:
+        with self._lock:
+            self._remember(key, result)
+        self._write_disk(key, result)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _remember(self, key: str, result: RenderResult) -> None:
+        """Insert under the lock, evicting least recently used entries to fit."""
+        size = len(result.data)
+        if size > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= len(previous.data)
+        while self._entries and self._bytes + size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted.data)
+        self._entries[key] = result
+        self._bytes += size
+
+    def _read_disk(self, key: str) -> RenderResult | None:
+        if self.directory is None:
+            return None
+        try:
+            raw = (self.directory / key).read_bytes()
+            header, data = raw.split(b"\n", 1)
+            meta = json.loads(header)
+        except (OSError, ValueError):
+            return None
+        return RenderResult(data, meta["error_line"], meta["error_messages"])
+
+    def _write_disk(self, key: str, result: RenderResult) -> None:
+        """Write header line + image to a temp file and rename it into place.
+
+        The rename is atomic, so a concurrent reader or a crash mid-write never
+        leaves a truncated entry behind.
+        """
+        if self.directory is None:
+            return
+        header = json.dumps(
+            {"error_line": result.error_line, "error_messages": result.error_messages}
+        )
+        try:
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+            with os.fdopen(fd, "wb") as file:
+                file.write(header.encode("utf-8") + b"\n" + result.data)
+            os.replace(temp_path, self.directory / key)
+        except OSError:
+            # A full or read-only disk only costs the persistent tier.
+            pass
@@ -0,0 +1,179 @@
+# SPDX-License-Identifier: MIT
+#
+# MIT License
+#
+# Copyright (c) 2026 Ericsson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Pool of long-lived PlantUML processes that render diagrams over ``-pipe``.
+
+Starting ``java -jar plantuml.jar`` for every render pays for JVM startup,
+class loading and JIT warmup each time. A worker here is started once and
+renders many diagrams over the same stdin/stdout, framed as described in
+pipe_protocol.py.
+
+A worker serves one caller at a time. The pool hands idle workers out to
+callers, and replaces a worker whose process died or that did not answer
+within the per-request timeout (the wedged process is killed).
+"""
+
+import queue
+import threading
+import uuid
+from subprocess import DEVNULL, PIPE, Popen
+
+from .pipe_protocol import (
+    PIPE_OPTIONS,
+    FrameReader,
+    RenderResult,
+    encode_diagrams,
+    parse_frame,
+)
+
+
+class RenderTimeoutError(Exception):
+    """Raised when a diagram was not rendered within the allowed time."""
+
+
+class WorkerDiedError(Exception):
+    """Raised when a worker process exits or closes its pipes mid-render."""
+
+
+class PlantUmlWorker:
+    """One PlantUML process in ``-pipe`` mode, rendering diagrams in turn."""
+
+    def __init__(self, command: list[str]):
+        delimiter = uuid.uuid4().hex
+        self.process = Popen(
+            [*command, *PIPE_OPTIONS, "-pipedelimitor", delimiter],
+            stdin=PIPE,
+            stdout=PIPE,
+            stderr=DEVNULL,
+        )
+        assert self.process.stdout is not None
+        self._frames = FrameReader(self.process.stdout, delimiter.encode("ascii"))
+        self._expired = False
+
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def render(self, diagram: str, timeout: float) -> RenderResult:
+        """Send one ``@start…@end`` block and return what PlantUML made of it."""
+        return self.render_many([diagram], timeout)[0]
+
+    def render_many(self, diagrams: list[str], timeout: float) -> list[RenderResult]:
+        """Send several blocks in one write and read one frame back per block.
+
+        The write happens on a helper thread so a large batch cannot deadlock
+        with PlantUML blocking on a full stdout pipe. A watchdog kills the
+        process if the answers are not complete within ``timeout`` seconds;
+        the blocked read then ends and RenderTimeoutError is raised. The
+        worker is unusable after any error and must be replaced.
+        """
+        watchdog = threading.Timer(timeout, self._expire)
+        watchdog.start()
+        writer = threading.Thread(target=self._write, args=(diagrams,), daemon=True)
+        writer.start()
+        try:
+            return [parse_frame(self._frames.read_frame()) for _ in diagrams]
+        except (OSError, ValueError, EOFError) as error:
+            if self._expired:
+                raise RenderTimeoutError(
+                    f"render took longer than {timeout}s"
+                ) from error
+            raise WorkerDiedError(str(error)) from error
+        finally:
+            watchdog.cancel()
+            writer.join()
+
+    def _write(self, diagrams: list[str]):
+        assert self.process.stdin is not None
+        try:
+            self.process.stdin.write(encode_diagrams(diagrams))
+            self.process.stdin.flush()
+        except (OSError, ValueError):
+            pass  # the process died; the reader reports it
+
+    def _expire(self):
+        self._expired = True
+        self.close()
+
+    def close(self):
+        if self.alive():
+            self.process.kill()
+        self.process.wait()
+        for stream in (self.process.stdin, self.process.stdout):
+            if stream is not None:
+                try:
+                    stream.close()
+                except OSError:
+                    pass
+
+
+class RenderPool:
+    """A fixed number of warm PlantUmlWorkers for one PlantUML command line."""
+
+    def __init__(self, command: list[str], size: int, timeout: float):
+        self.command = command
+        self.size = size
+        self.timeout = timeout
+        self._idle: queue.LifoQueue[PlantUmlWorker] = queue.LifoQueue()
+        for _ in range(size):
+            self._idle.put(PlantUmlWorker(command))
+
+    def render(self, diagram: str) -> RenderResult:
+        """Render one diagram on an idle worker, waiting up to the timeout for one."""
+        return self.render_many([diagram])[0]
+
+    def render_many(self, diagrams: list[str]) -> list[RenderResult]:
+        """Render several diagrams back to back on a single worker.
+
+        The timeout applies per diagram. A worker whose process died while idle
+        is replaced before use, so a JVM that crashed between requests does not
+        fail the next caller.
+        """
+        try:
+            worker = self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise RenderTimeoutError(
+                f"no PlantUML worker became free within {self.timeout}s"
+            ) from None
+        try:
+            if not worker.alive():
+                worker = self._replace(worker)
+            return worker.render_many(diagrams, self.timeout * len(diagrams))
+        except (RenderTimeoutError, WorkerDiedError):
+            worker = self._replace(worker)
+            raise
+        finally:
+            self._idle.put(worker)
+
+    def _replace(self, worker: PlantUmlWorker) -> PlantUmlWorker:
+        worker.close()
+        return PlantUmlWorker(self.command)
+
+    def close(self):
+        """Stop every idle worker; workers currently rendering are left alone."""
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            worker.close()
@@ -30,9 +30,34 @@ from functools import lru_cache
 from flask import Blueprint, jsonify, render_template, request, send_file
 
 from ..__about__ import __version__
+from ..activity.element_map import prepare_activity_lookups
+from .coalesce import RenderCoalescer
+from .documents import StaleDocumentError, document_store, editor_text
+from .label_counters import (
+    edited_label_counters,
+    label_counters,
+    use_document_labels,
+)
+from .metrics import (
+    CONTENT_TYPE,
+    exposition,
+    finish_request_metrics,
+    metrics,
+    start_request_metrics,
+)
 from .parse_changelog import parse_changelog
 from .puml_encoder import plantuml_decode, plantuml_encode
-from .render import _create_png_from_uml, _create_svg_from_uml
+from .render import (
+    _create_png_from_uml,
+    _create_svg_from_uml,
+    render_cache,
+    render_scheduler,
+    renderer_status,
+)
+from .render_pool import RenderTimeoutError, WorkerDiedError
+from .scheduler import RenderBusyError
+from .svg_fragment import svg_fragment
+from .timing import finish_request_timing, stage, start_request_timing
 
 shared_bp = Blueprint(
     "shared",
@@ -41,6 +66,8 @@ shared_bp = Blueprint(
     static_folder="../static",
 )
 
+render_coalescer = RenderCoalescer()
+
 
 @lru_cache(maxsize=1)
 def generate_static_js_hash():
@@ -61,6 +88,42 @@ def generate_static_js_hash():
     return hasher.hexdigest()[:8]
 
 
+@shared_bp.before_app_request
+def start_timing():
+    start_request_timing()
+
+
+@shared_bp.after_app_request
+def finish_timing(response):
+    return finish_request_timing(response)
+
+
+@shared_bp.teardown_app_request
+def forget_document_labels(error):
+    # The worker thread serves other documents next.
+    use_document_labels(None)
+
+
+@shared_bp.before_app_request
+def start_metrics():
+    start_request_metrics()
+
+
+@shared_bp.after_app_request
+def finish_metrics(response):
+    rule = request.url_rule
+    finish_request_metrics(
+        blueprint=request.blueprint or "app",
+        route=rule.rule if rule is not None else "unmatched",
+        method=request.method,
+        status=response.status_code,
+        request_bytes=request.content_length,
+        # Streamed and passed-through bodies have no length to count.
+        response_bytes=response.calculate_content_length(),
+    )
+    return response
+
+
 @shared_bp.route("/")
 def home():
     # Cache-busting hash covering all static JS files.
@@ -73,14 +136,51 @@ def home():
 
 @shared_bp.route("/render", methods=["POST"])
 def render():
-    data = request.get_json()
+    with stage("json"):
+        data = request.get_json()
     puml = data["plantuml"]
-    return _create_svg_from_uml(puml)
+    if "session" in data and "revision" in data:
+        svg = render_coalescer.run(
+            str(data["session"]),
+            int(data["revision"]),
+            lambda: _create_svg_from_uml(puml),
+        )
+        if svg is None:
+            return "Superseded by a newer revision", 409
+    else:
+        svg = _create_svg_from_uml(puml)
+    revision = None
+    if "document" in data:
+        # Keep what edit requests would otherwise upload with every click.
+        store = document_store()
+        previous = store.get(str(data["document"]))
+        # Numbers given to generated labels stay taken across the document's
+        # revisions; stripped lines cover edits sent with trimlines too.
+        if previous is not None and previous.labels is not None:
+            labels = edited_label_counters(
+                previous.labels, editor_text(previous.puml), editor_text(puml)
+            )
+        else:
+            labels = label_counters(editor_text(puml))
+        document = store.put(str(data["document"]), puml, svg_fragment(svg), labels)
+        revision = document.revision
+        if data.get("diagram") == "activity":
+            # Clicks on this render then resolve through ready-made tables,
+            # the structure patched from the revision this one replaced.
+            prepare_activity_lookups(
+                document.puml,
+                document.svg,
+                previous.puml if previous is not None else None,
+            )
+    if revision is not None:
+        return svg, {"X-Document-Revision": str(revision)}
+    return svg
 
 
 @shared_bp.route("/renderPNG", methods=["POST"])
 def renderpng():
-    data = request.get_json()
+    with stage("json"):
+        data = request.get_json()
     puml = data["plantuml"]
 
     # Create the PNG image from the PlantUML code
@@ -98,16 +198,77 @@ def renderpng():
     )
 
 
+@shared_bp.route("/renderCacheStats")
+def render_cache_stats():
+    cache = render_cache()
+    if cache is None:
+        return jsonify({"enabled": False})
+    return jsonify({"enabled": True, **cache.stats()})
+
+
+@shared_bp.route("/healthz")
+def healthz():
+    return jsonify({"status": "ok", "pid": os.getpid()})
+
+
+@shared_bp.route("/readyz")
+def readyz():
+    status = renderer_status()
+    return jsonify(status), 200 if status["ready"] else 503
+
+
+@shared_bp.route("/metrics")
+def prometheus_metrics():
+    text = exposition(metrics().snapshots())
+    return text, 200, {"Content-Type": CONTENT_TYPE}
+
+
+@shared_bp.route("/renderQueueStats")
+def render_queue_stats():
+    return jsonify(render_scheduler().stats())
+
+
+def _json_error(code, error, status, **details):
+    """JSON body the frontend shows in its error popup: code, message, details."""
+    response = jsonify({"error": code, "message": str(error), **details})
+    response.status_code = status
+    return response
+
+
+@shared_bp.app_errorhandler(RenderBusyError)
+def render_busy(error):
+    response = _json_error("render_busy", error, 503, retry_after=error.retry_after)
+    response.headers["Retry-After"] = str(error.retry_after)
+    return response
+
+
+@shared_bp.app_errorhandler(RenderTimeoutError)
+def render_timeout(error):
+    return _json_error("render_timeout", error, 504)
+
+
+@shared_bp.app_errorhandler(WorkerDiedError)
+def render_failed(error):
+    return _json_error("render_failed", error, 500)
+
+
+@shared_bp.app_errorhandler(StaleDocumentError)
+def document_stale(error):
+    return _json_error("document_stale", error, 409)
+
+
 @shared_bp.route("/encode", methods=["POST"])
 def encode():
-    data = request.get_json()
+    with stage("json"):
+        data = request.get_json()
     puml = data["plantuml"]
     return plantuml_encode(puml)
 
 
 @shared_bp.route("/decode", methods=["POST"])
 def decode():
-    data = request.get_json()
+    with stage("json"):
+        data = request.get_json()
     hash = data["hash"]
     return plantuml_decode(hash)
 
@@ -0,0 +1,127 @@
+# SPDX-License-Identifier: MIT
+#
+# MIT License
+#
+# Copyright (c) 2026 Ericsson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Bounded render concurrency with a wait queue and back-pressure.
+
+Every render that misses the cache takes a slot here before it may run
+PlantUML, so at most ``max_concurrent`` renders (and JVMs for one-off
+renders) run at once, at most ``max_queue`` wait for a slot, and anything
+beyond that is refused at once with RenderBusyError, which the routes turn
+into ``503`` plus ``Retry-After``.
+"""
+
+import math
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+
+class RenderBusyError(Exception):
+    """No render slot is free and the wait queue is full or the wait timed out."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RenderScheduler:
+    """Counting semaphore with a bounded, observable wait queue."""
+
+    def __init__(self, max_concurrent: int, max_queue: int, wait_timeout: float):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.wait_timeout = wait_timeout
+        self._condition = threading.Condition()
+        self._active = 0
+        self._waiting = 0
+        self._max_waiting = 0
+        self._admitted = 0
+        self._rejected = 0
+        self._wait_seconds = 0.0
+        self._max_wait_seconds = 0.0
+        self._completed = 0
+        self._render_seconds = 0.0
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """Hold one of the render slots for the duration of the with block."""
+        queued_at = time.monotonic()
+        with self._condition:
+            if self._active >= self.max_concurrent:
+                if self._waiting >= self.max_queue:
+                    self._rejected += 1
+                    raise RenderBusyError("render queue is full", self._retry_after())
+                self._waiting += 1
+                self._max_waiting = max(self._max_waiting, self._waiting)
+                try:
+                    admitted = self._condition.wait_for(
+                        lambda: self._active < self.max_concurrent, self.wait_timeout
+                    )
+                finally:
+                    self._waiting -= 1
+                if not admitted:
+                    self._rejected += 1
+                    raise RenderBusyError(
+                        f"no render slot became free within {self.wait_timeout}s",
+                        self._retry_after(),
+                    )
+            waited = time.monotonic() - queued_at
+            self._active += 1
+            self._admitted += 1
+            self._wait_seconds += waited
+            self._max_wait_seconds = max(self._max_wait_seconds, waited)
+        started_at = time.monotonic()
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._active -= 1
+                self._completed += 1
+                self._render_seconds += time.monotonic() - started_at
+                self._condition.notify()
+
+    def _retry_after(self) -> int:
+        """Seconds until the queue ahead has likely drained, at least one."""
+        if not self._completed:
+            return 1
+        mean_render = self._render_seconds / self._completed
+        ahead = self._waiting + self._active
+        return max(1, math.ceil(mean_render * ahead / self.max_concurrent))
+
+    def stats(self) -> dict:
+        with self._condition:
+            return {
+                "active": self._active,
+                "queue_depth": self._waiting,
+                "max_queue_depth": self._max_waiting,
+                "max_concurrent": self.max_concurrent,
+                "max_queue": self.max_queue,
+                "admitted": self._admitted,
+                "rejected": self._rejected,
+                "mean_wait_seconds": (
+                    self._wait_seconds / self._admitted if self._admitted else 0.0
+                ),
+                "max_wait_seconds": self._max_wait_seconds,
+            }
@@ -0,0 +1,64 @@
+# SPDX-License-Identifier: MIT
+#
+# MIT License
+#
+# Copyright (c) 2026 Ericsson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Conversion of PlantUML's SVG output into the markup the browser posts back."""
+
+import re
+
+from lxml import etree
+
+from .timing import stage
+
+
+def svg_fragment(svg: str) -> str:
+    """Return the inner markup of the diagram's ``<g>`` as a browser would.
+
+    The routes receive ``element.querySelector('g').innerHTML`` from the
+    frontend: no namespaces and explicit closing tags. PlantUML writes
+    namespaced, self-closing XML, so it is normalised to that form first.
+    """
+    with stage("svg"):
+        return _fragment(svg)
+
+
+def _fragment(svg: str) -> str:
+    try:
+        root = etree.fromstring(re.sub(r"^<\?xml[^>]*\?>", "", svg.lstrip()).encode())
+    except etree.XMLSyntaxError:
+        return ""
+    for element in root.iter():
+        if isinstance(element.tag, str):
+            element.tag = etree.QName(element).localname
+            for name in list(element.attrib):
+                if name.startswith("{"):
+                    value = element.attrib.pop(name)
+                    element.attrib.setdefault(etree.QName(name).localname, value)
+    etree.cleanup_namespaces(root)
+    group = root.find("g")
+    if group is None:
+        return ""
+    return "".join(
+        etree.tostring(child, method="html", encoding="unicode", with_tail=False)
+        for child in group
+    )
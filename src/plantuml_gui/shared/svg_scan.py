@@ -0,0 +1,156 @@
+# SPDX-License-Identifier: MIT
+#
+# MIT License
+#
+# Copyright (c) 2026 Ericsson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Streaming scanner over the SVG markup the browser posts back.
+
+Every edit request used to build a PyQuery document from the whole SVG,
+then wrap and copy elements again for each ``.next()`` and ``str()``. The
+scanner feeds the markup to lxml's parser in chunks with a parser target,
+so libxml2's start/end/data events arrive as callbacks and no element tree
+is ever built. It yields one lightweight ``SvgElement`` per element in
+document order and links each to its next sibling as the events reach it;
+besides the elements it yields, it holds only the current ancestor chain.
+
+The markup is parsed as HTML, which is what PyQuery fell back to for the
+browser's ``innerHTML`` fragments: attribute names are lowercased and
+entities such as ``&nbsp;`` are accepted.
+"""
+
+import re
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+
+from lxml import etree
+
+from .timing import stage
+
+# Bytes handed to the parser at a time; elements are yielded after each chunk.
+CHUNK_SIZE = 64 * 1024
+
+# HTML whitespace, as PyQuery's text() squashes it (not the no-break space).
+_WHITESPACE = re.compile(r"[\x20\x09\x0c\u200b\x0a\x0d]+")
+
+# Wrappers the HTML parser puts around a fragment.
+_WRAPPERS = {"html", "body"}
+
+
+@dataclass(eq=False, slots=True)
+class SvgElement:
+    """One element from the scan.
+
+    ``tag`` is empty for comments, which are kept so that sibling walks stop
+    at them as they did with PyQuery. ``text`` is the whitespace-squashed
+    text of an element without children (set when the element ends),
+    ``next`` its next sibling and ``first_child`` its first child (set when
+    the scan reaches them).
+    """
+
+    tag: str
+    attrs: dict[str, str] = field(default_factory=dict)
+    text: str = ""
+    next: "SvgElement | None" = None
+    first_child: "SvgElement | None" = None
+
+    def number(self, name: str) -> float:
+        """Return a numeric attribute as a float."""
+        return float(self.attrs[name])
+
+
+class _ScanTarget:
+    """lxml parser target turning parse events into linked SvgElements."""
+
+    def __init__(self):
+        self.ready: list[SvgElement] = []
+        # One entry per open element: the element (None for the HTML
+        # wrappers), its text so far and the last child seen in it.
+        self._open: list[tuple[SvgElement | None, list[str]]] = []
+        self._last_child: list[SvgElement | None] = [None]
+
+    def start(self, tag, attrib):
+        if tag in _WRAPPERS and len(self._open) < 2:
+            self._open.append((None, []))
+            self._last_child.append(None)
+            return
+        element = SvgElement(tag, dict(attrib))
+        self._add(element)
+        self._open.append((element, []))
+        self._last_child.append(None)
+
+    def end(self, tag):
+        element, text = self._open.pop()
+        has_children = self._last_child.pop() is not None
+        if element is not None and not has_children:
+            element.text = _WHITESPACE.sub(" ", "".join(text)).strip()
+
+    def data(self, data):
+        if self._open:
+            self._open[-1][1].append(data)
+
+    def comment(self, text):
+        self._add(SvgElement(""))
+
+    def close(self):
+        return None
+
+    def _add(self, element: SvgElement) -> None:
+        sibling = self._last_child[-1]
+        if sibling is not None:
+            sibling.next = element
+        elif self._open and self._open[-1][0] is not None:
+            self._open[-1][0].first_child = element
+        self._last_child[-1] = element
+        self.ready.append(element)
+
+
+def scan_svg(svg: str) -> Iterator[SvgElement]:
+    """Yield the elements of ``svg`` in document order.
+
+    ``text``, ``next`` and ``first_child`` of a yielded element are filled
+    in as the scan proceeds, so read them once the scan has moved past it.
+    """
+    if not svg.strip():
+        return
+    target = _ScanTarget()
+    parser = etree.HTMLParser(target=target, encoding="utf-8")
+    data = svg.encode("utf-8")
+    for offset in range(0, len(data), CHUNK_SIZE):
+        # Only the parsing is timed, not the caller's work between chunks.
+        with stage("svg"):
+            parser.feed(data[offset : offset + CHUNK_SIZE])
+        yield from target.ready
+        target.ready.clear()
+    with stage("svg"):
+        parser.close()
+    yield from target.ready
+
+
+def first_element(svgtext: str, tag: str | None = None) -> SvgElement:
+    """Return the first (``tag``) element of a snippet, e.g. a clicked element."""
+    found = None
+    for element in scan_svg(svgtext):  # scan to the end so text is set
+        if found is None and element.tag and element.tag == (tag or element.tag):
+            found = element
+    if found is None:
+        raise ValueError(f"no <{tag or 'svg'}> element in {svgtext[:80]!r}")
+    return found
@@ -0,0 +1,129 @@
+# SPDX-License-Identifier: MIT
+#
+# MIT License
+#
+# Copyright (c) 2026 Ericsson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Per-request stage timing, reported in a ``Server-Timing`` header.
+
+With ``PLANTUML_SERVER_TIMING`` set, each request records how long its
+named stages take (``json`` decoding, ``svg`` parsing, ``puml`` scanning,
+the PlantUML ``render``, building a line ``delta``) and the response lists
+them, with the request's ``total``, in a ``Server-Timing`` header the
+browser's network panel shows.
+``PLANTUML_TIMING_LOG`` also logs one line per request with loguru, the
+stages bound as structured extras.
+
+Code marks a stage with ``with stage("puml"):``. While timing is off, or
+outside a request, that costs one context variable lookup. A stage that
+runs inside another of the same name is counted once, by the outer one.
+"""
+
+import os
+import time
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from contextvars import ContextVar
+
+from flask import Response, request
+from loguru import logger
+
+_OFF = ("", "0", "false", "no")
+_idle = nullcontext()
+
+
+class Timings:
+    """The stages of one request, in milliseconds, in the order first seen."""
+
+    def __init__(self, header: bool = True, log: bool = False):
+        self.send_header = header
+        self.log = log
+        self.start = time.perf_counter()
+        self.stages: dict[str, float] = {}
+        self.running: set[str] = set()
+
+    def total(self) -> float:
+        return (time.perf_counter() - self.start) * 1000
+
+    def header(self) -> str:
+        """The Server-Timing value: every stage, then the total."""
+        entries = [f"{name};dur={ms:.2f}" for name, ms in self.stages.items()]
+        entries.append(f"total;dur={self.total():.2f}")
+        return ", ".join(entries)
+
+
+_current: ContextVar[Timings | None] = ContextVar("timings", default=None)
+
+
+def stage(name: str) -> AbstractContextManager[None]:
+    """Time the ``with`` block as stage ``name`` of the current request."""
+    timings = _current.get()
+    if timings is None or name in timings.running:
+        return _idle
+    return _timed(timings, name)
+
+
+@contextmanager
+def _timed(timings: Timings, name: str) -> Iterator[None]:
+    timings.running.add(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = (time.perf_counter() - start) * 1000
+        timings.stages[name] = timings.stages.get(name, 0.0) + elapsed
+        timings.running.discard(name)
+
+
+def _enabled(variable: str) -> bool:
+    return os.environ.get(variable, "").strip().lower() not in _OFF
+
+
+def start_request_timing() -> None:
+    """Start timing the current request if the environment asks for it."""
+    header, log = _enabled("PLANTUML_SERVER_TIMING"), _enabled("PLANTUML_TIMING_LOG")
+    _current.set(Timings(header, log) if header or log else None)
+
+
+def finish_request_timing(response: Response) -> Response:
+    """Add the Server-Timing header and log line for the current request."""
+    timings = _current.get()
+    if timings is None:
+        return response
+    _current.set(None)
+    if timings.send_header:
+        response.headers["Server-Timing"] = timings.header()
+    if timings.log:
+        total = timings.total()
+        logger.bind(
+            method=request.method,
+            path=request.path,
+            status=response.status_code,
+            total_ms=round(total, 3),
+            stages={name: round(ms, 3) for name, ms in timings.stages.items()},
+        ).info(
+            "{} {} {} in {:.1f} ms",
+            request.method,
+            request.path,
+            response.status_code,
+            total,
+        )
+    return response
@@ -7,7 +7,7 @@ function activityEventListeners() {
         try {
 
             const plantuml = trimlines(editor.session.getValue());
-            const response = await fetch("editText", {
+            const response = await documentFetch("editText", {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json'
@@ -141,7 +141,7 @@ function activityEventListeners() {
                         toBeStringified[key] = value;
                     }
                 }
-                const response = await fetch(item.endpoint, {
+                const response = await documentFetch(item.endpoint, {
                     method: 'POST',
                     headers: {
                         'Content-Type': 'application/json'
@@ -161,7 +161,7 @@ function activityEventListeners() {
         const svg = element.querySelector('g');
         try {
 
-            const response = await fetch("getText", {
+            const response = await documentFetch("getText", {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json'
@@ -187,7 +187,7 @@ function activityEventListeners() {
         const svg = element.querySelector('g');
         try {
 
-            const response = await fetch("getText", {
+            const response = await documentFetch("getText", {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json'
@@ -221,7 +221,7 @@ function ifEventListeners() {
         try {
 
             const plantuml = trimlines(editor.session.getValue());
-            const response = await fetch("editTextIf", {
+            const response = await documentFetch("editTextIf", {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json'
@@ -249,7 +249,7 @@ function ifEventListeners() {
         const pumlcontent = trimlines(editor.session.getValue());
         try {
 
-            const response = await fetch("getTextPoly", {
+            const response = await documentFetch("getTextPoly", {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json'
@@ -283,7 +283,7 @@ function ifEventListeners() {
         const pumlcontent = trimlines(editor.session.getValue());
         try {
 
-            const response = await fetch("getTextPoly", {
+            const response = await documentFetch("getTextPoly", {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json'
@@ -472,7 +472,7 @@ function ifEventListeners() {
                         toBeStringified[key] = value;
                     }
                 }
-                const response = await fetch(item.endpoint, {
+                const response = await documentFetch(item.endpoint, {
                     method: 'POST',
                     headers: {
                         'Content-Type': 'application/json'
@@ -562,7 +562,7 @@ function ellipseEventListeners() {
                         toBeStringified[key] = value;
                     }
                 }
-                const response = await fetch(item.endpoint, {
+                const response = await documentFetch(item.endpoint, {
                     method: 'POST',
                     headers: {
                         'Content-Type': 'application/json'
@@ -610,7 +610,7 @@ function forkEventListeners() {
                         toBeStringified[key] = value;
                     }
                 }
-                const response = await fetch(item.endpoint, {
+                const response = await documentFetch(item.endpoint, {
                     method: 'POST',
                     headers: {
                         'Content-Type': 'application/json'
@@ -655,7 +655,7 @@ function switchEventListeners() {
                         toBeStringified[key] = value;
                     }
                 }
-                const response = await fetch(item.endpoint, {
+                const response = await documentFetch(item.endpoint, {
                     method: 'POST',
                     headers: {
                         'Content-Type': 'application/json'
@@ -676,7 +676,7 @@ function switchEventListeners() {
         const pumlcontent = trimlines(editor.session.getValue());
         try {
 
-            const response = await fetch("getTextPoly", {
+            const response = await documentFetch("getTextPoly", {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json'
@@ -710,7 +710,7 @@ function switchEventListeners() {
         try {
 
             const plantuml = trimlines(editor.session.getValue());
-            const response = await fetch("editTextIf", {
+            const response = await documentFetch("editTextIf", {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json'
@@ -836,7 +836,7 @@ function bottomForkEventListeners() {
                         toBeStringified[key] = value;
                     }
                 }
-                const response = await fetch(item.endpoint, {
+                const response = await documentFetch(item.endpoint, {
                     method: 'POST',
                     headers: {
                         'Content-Type': 'application/json'
@@ -857,7 +857,7 @@ function titleEventListeners() {
         var text = $('#title-text').val();
         try {
             const plantuml = trimlines(editor.session.getValue());
-            const response = await fetch("editTitle", {
+            const response = await documentFetch("editTitle", {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json'
@@ -877,7 +877,7 @@ function titleEventListeners() {
     document.getElementById('editTitle').addEventListener('click', async () => {
         try {
             const plantuml = trimlines(editor.session.getValue());
-            const response = await fetch("getTextTitle", {
+            const response = await documentFetch("getTextTitle", {
 
                 method: 'POST',
                 headers: {
@@ -904,7 +904,7 @@ function titleEventListeners() {
     document.getElementById('deleteTitle').addEventListener('click', async () => {
         try {
             const plantuml = trimlines(editor.session.getValue());
-            const response = await fetch("deleteTitle", {
+            const response = await documentFetch("deleteTitle", {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json'
@@ -929,7 +929,7 @@ function noteEventListeners() {
         var text = $('#note-text').val();
         try {
             const plantuml = trimlines(editor.session.getValue());
-            const response = await fetch("editNote", {
+            const response = await documentFetch("editNote", {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json'
@@ -974,7 +974,7 @@ function noteEventListeners() {
                         toBeStringified[key] = value;
                     }
                 }
-                const response = await fetch(item.endpoint, {
+                const response = await documentFetch(item.endpoint, {
                     method: 'POST',
                     headers: {
                         'Content-Type': 'application/json'
@@ -995,7 +995,7 @@ function noteEventListeners() {
         try {
             const plantuml = trimlines(editor.session.getValue());
 
-            const response = await fetch("getNoteText", {
+            const response = await documentFetch("getNoteText", {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json'
@@ -1028,7 +1028,7 @@ function groupEventListeners() {
         var text = $('#group-text').val();
         try {
             const plantuml = trimlines(editor.session.getValue());
-            const response = await fetch("editGroup", {
+            const response = await documentFetch("editGroup", {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json'
@@ -1055,7 +1055,7 @@ function groupEventListeners() {
         try {
 
             const plantuml = trimlines(editor.session.getValue());
-            const response = await fetch("deleteGroup", {
+            const response = await documentFetch("deleteGroup", {
                 method: "POST",
                 headers: {
                     'Content-Type': 'application/json'
@@ -1079,7 +1079,7 @@ function groupEventListeners() {
         pumlcontent = trimlines(editor.session.getValue());
         try {
 
-            const response = await fetch("getGroupText", {
+            const response = await documentFetch("getGroupText", {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json'
@@ -1176,7 +1176,7 @@ function mergeEventListeners() {
                         toBeStringified[key] = value;
                     }
                 }
-                const response = await fetch(item.endpoint, {
+                const response = await documentFetch(item.endpoint, {
                     method: 'POST',
                     headers: {
                         'Content-Type': 'application/json'
@@ -1206,7 +1206,7 @@ function whileEventListeners() {
         try {
 
             const plantuml = trimlines(editor.session.getValue());
-            const response = await fetch("editTextWhile", {
+            const response = await documentFetch("editTextWhile", {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json'
@@ -1378,7 +1378,7 @@ function whileEventListeners() {
                         toBeStringified[key] = value;
                     }
                 }
-                const response = await fetch(item.endpoint, {
+                const response = await documentFetch(item.endpoint, {
                     method: 'POST',
                     headers: {
                         'Content-Type': 'application/json'
@@ -1402,7 +1402,7 @@ function whileEventListeners() {
         const svg = element.querySelector('g');
         try {
 
-            const response = await fetch("getTextWhile", {
+            const response = await documentFetch("getTextWhile", {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json'
@@ -1440,7 +1440,7 @@ function connectorEventListeners() {
         try {
 
             const plantuml = trimlines(editor.session.getValue());
-            const response = await fetch("editCharConnector", {
+            const response = await documentFetch("editCharConnector", {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json'
@@ -1535,7 +1535,7 @@ function connectorEventListeners() {
                         toBeStringified[key] = value;
                     }
                 }
-                const response = await fetch(item.endpoint, {
+                const response = await documentFetch(item.endpoint, {
                     method: 'POST',
                     headers: {
                         'Content-Type': 'application/json'
@@ -1578,7 +1578,7 @@ function arrowLabelEventListeners() {
                         toBeStringified[key] = value;
                     }
                 }
-                const response = await fetch(item.endpoint, {
+                const response = await documentFetch(item.endpoint, {
                     method: 'POST',
                     headers: {
                         'Content-Type': 'application/json'
@@ -1600,7 +1600,7 @@ function arrowLabelEventListeners() {
         var text = $('#arrow-text').val();
         try {
             const plantuml = trimlines(editor.session.getValue());
-            const response = await fetch("editArrow", {
+            const response = await documentFetch("editArrow", {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json'
@@ -1624,7 +1624,7 @@ function arrowLabelEventListeners() {
         const svg = element.querySelector('g');
         try {
             // First fetch to check for duplicates
-            const checkDuplicateResponse = await fetch("checkDuplicateArrow", {
+            const checkDuplicateResponse = await documentFetch("checkDuplicateArrow", {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json'
@@ -1643,7 +1643,7 @@ function arrowLabelEventListeners() {
             // Only fetch ArrowText if the duplicate check returns false
             if (!isDuplicate) {
                 try {
-                    const arrowTextResponse = await fetch("getArrowText", {
+                    const arrowTextResponse = await documentFetch("getArrowText", {
                         method: 'POST',
                         headers: {
                             'Content-Type': 'application/json'
@@ -1679,7 +1679,11 @@ function arrowLabelEventListeners() {
 async function setHandlersForActivityDiagram(pumlcontent, element) {
     removeBackgroundMenuListener();
 
-    fetchSvgFromPlantUml().then((svgContent) => {
+    fetchSvgFromPlantUml('activity').then((svgContent) => {
+        if (svgContent === null) {
+            toggleLoadingOverlay()
+            return
+        }
         element.innerHTML = svgContent;
         const svg = element.querySelector('g');
         if (!svg) {
@@ -1704,7 +1708,7 @@ async function setHandlersForActivityDiagram(pumlcontent, element) {
                     lastclickedsvgelement = svgelement;
                     try {
 
-                        const response = await fetch("getText", {
+                        const response = await documentFetch("getText", {
                             method: 'POST',
                             headers: {
                                 'Content-Type': 'application/json'
@@ -1783,7 +1787,7 @@ async function setHandlersForActivityDiagram(pumlcontent, element) {
                     lastclickedsvgelement = svgelement;
                     try {
 
-                        const response = await fetch("getTextWhile", {
+                        const response = await documentFetch("getTextWhile", {
                             method: 'POST',
                             headers: {
                                 'Content-Type': 'application/json'
@@ -1838,7 +1842,7 @@ async function setHandlersForActivityDiagram(pumlcontent, element) {
                     lastclickedsvgelement = svgelement;
                     try {
 
-                        const response = await fetch("getTextPoly", {
+                        const response = await documentFetch("getTextPoly", {
                             method: 'POST',
                             headers: {
                                 'Content-Type': 'application/json'
@@ -1892,7 +1896,7 @@ async function setHandlersForActivityDiagram(pumlcontent, element) {
                     lastclickedsvgelement = svgelement;
                     try {
 
-                        const response = await fetch("getNoteText", {
+                        const response = await documentFetch("getNoteText", {
                             method: 'POST',
                             headers: {
                                 'Content-Type': 'application/json'
@@ -1967,7 +1971,7 @@ async function setHandlersForActivityDiagram(pumlcontent, element) {
                     try {
 
 
-                        const response = await fetch("getGroupText", {
+                        const response = await documentFetch("getGroupText", {
                             method: 'POST',
                             headers: {
                                 'Content-Type': 'application/json'
@@ -2043,7 +2047,7 @@ async function setHandlersForActivityDiagram(pumlcontent, element) {
                 svgelement.addEventListener('dblclick', async () => {
                     lastclickedsvgelement = svgelement;
                     try {
-                        const response = await fetch("getCharConnector", {
+                        const response = await documentFetch("getCharConnector", {
                             method: 'POST',
                             headers: {
                                 'Content-Type': 'application/json'
@@ -2099,7 +2103,7 @@ async function setHandlersForActivityDiagram(pumlcontent, element) {
 
                         try {
                             // First fetch to check for duplicates
-                            const checkDuplicateResponse = await fetch("checkDuplicateArrow", {
+                            const checkDuplicateResponse = await documentFetch("checkDuplicateArrow", {
                                 method: 'POST',
                                 headers: {
                                     'Content-Type': 'application/json'
@@ -2118,7 +2122,7 @@ async function setHandlersForActivityDiagram(pumlcontent, element) {
                             // Only fetch ArrowText if the duplicate check returns false
                             if (!isDuplicate) {
                                 try {
-                                    const arrowTextResponse = await fetch("getArrowText", {
+                                    const arrowTextResponse = await documentFetch("getArrowText", {
                                         method: 'POST',
                                         headers: {
                                             'Content-Type': 'application/json'
@@ -2201,7 +2205,7 @@ async function setHandlersForActivityDiagram(pumlcontent, element) {
                 svgelement.addEventListener('dblclick', async () => {
                     try {
 
-                        const response = await fetch("getTextTitle", {
+                        const response = await documentFetch("getTextTitle", {
                             method: 'POST',
                             headers: {
                                 'Content-Type': 'application/json'
@@ -2420,7 +2424,7 @@ async function checkRepeat(puml, svgfile, svgelem) {
     const svg = svgfile
     const svgelement = svgelem
     try {
-        const response = await fetch("checkWhatPoly", {
+        const response = await documentFetch("checkWhatPoly", {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
@@ -2446,7 +2450,7 @@ async function checkSwitch(puml, svgfile, svgelem) {
     const svg = svgfile
     const svgelement = svgelem
     try {
-        const response = await fetch("checkWhatPoly", {
+        const response = await documentFetch("checkWhatPoly", {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
@@ -2472,7 +2476,7 @@ async function checkIfRepeatHasBackward(puml, svg, svgelem) {
     const pumlcontent = puml
     const svgelement = svgelem
     try {
-        const response = await fetch("checkIfRepeatHasBackward", {
+        const response = await documentFetch("checkIfRepeatHasBackward", {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
@@ -2498,7 +2502,7 @@ async function checkBackward(puml, svgfile, svgelem) {
     const svg = svgfile
     const svgelement = svgelem
     try {
-        const response = await fetch("checkBackward", {
+        const response = await documentFetch("checkBackward", {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
@@ -2645,7 +2649,7 @@ function labelForks(puml) {
 
 async function processActivityLine(pumlcontent, svg, svgelement) {
     try {
-        const response = await fetch("getActivityLine", {
+        const response = await documentFetch("getActivityLine", {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
@@ -2669,7 +2673,7 @@ async function processActivityLine(pumlcontent, svg, svgelement) {
 
 async function processNoteLine(pumlcontent, svg, svgelement) {
     try {
-        const response = await fetch("getNoteLine", {
+        const response = await documentFetch("getNoteLine", {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
@@ -2693,7 +2697,7 @@ async function processNoteLine(pumlcontent, svg, svgelement) {
 
 async function processEllipseLine(pumlcontent, svg, svgelement) {
     try {
-        const response = await fetch("getEllipseLine", {
+        const response = await documentFetch("getEllipseLine", {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
@@ -2718,7 +2722,7 @@ async function processEllipseLine(pumlcontent, svg, svgelement) {
 
 async function processConnectorLine(pumlcontent, svg, svgelement) {
     try {
-        const response = await fetch("getConnectorLine", {
+        const response = await documentFetch("getConnectorLine", {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
@@ -2743,7 +2747,7 @@ async function processConnectorLine(pumlcontent, svg, svgelement) {
 
 async function processGroupLine(pumlcontent, svg, svgelement) {
     try {
-        const response = await fetch("getGroupLine", {
+        const response = await documentFetch("getGroupLine", {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
@@ -2768,7 +2772,7 @@ async function processGroupLine(pumlcontent, svg, svgelement) {
 
 async function processIfLine(pumlcontent, svg, svgelement) {
     try {
-        const response = await fetch("getIfLine", {
+        const response = await documentFetch("getIfLine", {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
@@ -2793,7 +2797,7 @@ async function processIfLine(pumlcontent, svg, svgelement) {
 
 async function processMergeLine(pumlcontent, svg, svgelement) {
     try {
-        const response = await fetch("getMergeLine", {
+        const response = await documentFetch("getMergeLine", {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
@@ -2818,7 +2822,7 @@ async function processMergeLine(pumlcontent, svg, svgelement) {
 
 async function processWhileLine(pumlcontent, svg, svgelement) {
     try {
-        const response = await fetch("getWhileLine", {
+        const response = await documentFetch("getWhileLine", {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
@@ -2843,7 +2847,7 @@ async function processWhileLine(pumlcontent, svg, svgelement) {
 
 async function processArrowLine(pumlcontent, svg, svgelement) {
     try {
-        const response = await fetch("getArrowLine", {
+        const response = await documentFetch("getArrowLine", {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
@@ -2867,7 +2871,7 @@ async function processArrowLine(pumlcontent, svg, svgelement) {
 
 async function processTitleLine(pumlcontent) {
     try {
-        const response = await fetch("getTitleLine", {
+        const response = await documentFetch("getTitleLine", {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
@@ -28,6 +28,14 @@ let history = [];
 let historyPointer = -1;
 let editor;
 let colorqueue = [];
+// Identifies this tab's renders so the server can drop superseded ones.
+const renderSession = Math.random().toString(36).slice(2) + Date.now().toString(36);
+let renderRevision = 0;
+let renderController = null;
+// The server keeps the last rendered puml and SVG under renderSession, so
+// edit calls can reference them instead of uploading both (see documentFetch).
+let documentPuml = null;
+let documentRevision = null;
 var Range = ace.require("ace/range").Range
 
 async function initeditor() {
@@ -343,6 +351,9 @@ function buttonEventListeners() {
                 body: JSON.stringify({ 'plantuml': plantuml })
             });
 
+            if (await displayRenderError(response)) {
+                return;
+            }
             const blob = await response.blob();
 
             // Convert blob → base64 Data URL to make image copiable
@@ -563,7 +574,28 @@ const debouncedRenderPlantUml = debounce(async () => {
 
 }, 200);
 
-async function fetchSvgFromPlantUml() {
+// Shows the structured error of a failed render ({error, message}) in the
+// error popup. Returns true if the response was such an error.
+async function displayRenderError(response) {
+    const contentType = response.headers.get('Content-Type') || '';
+    if (response.ok || !contentType.includes('application/json')) {
+        return false;
+    }
+    const body = await response.json();
+    displayErrorMessage(`Render failed (${body.error}): ${body.message}`, body);
+    return true;
+}
+
+// Resolves to null when a newer render replaced this one before it finished.
+// A busy server (503) is retried after its Retry-After delay a few times.
+// Naming the diagram type lets the server prepare its click lookups.
+async function fetchSvgFromPlantUml(diagram = null, attempt = 0) {
+    if (renderController) {
+        renderController.abort();
+    }
+    const controller = new AbortController();
+    renderController = controller;
+    const revision = ++renderRevision;
     try {
         const plantuml = editor.session.getValue();
         const response = await fetch("render", {
@@ -572,16 +604,117 @@ async function fetchSvgFromPlantUml() {
                 'Content-Type': 'application/json'
             },
             body: JSON.stringify({
-                'plantuml': plantuml
-            })
+                'plantuml': plantuml,
+                'session': renderSession,
+                'revision': revision,
+                'document': renderSession,
+                'diagram': diagram
+            }),
+            signal: controller.signal
         });
+        if (response.status === 409 || revision !== renderRevision) {
+            return null;
+        }
+        if (response.status === 503 && attempt < 3) {
+            const delay = Number(response.headers.get('Retry-After')) || 1;
+            await new Promise((resolve) => setTimeout(resolve, delay * 1000));
+            return revision === renderRevision ? fetchSvgFromPlantUml(diagram, attempt + 1) : null;
+        }
+        if (await displayRenderError(response)) {
+            return null;
+        }
         const svg = await response.text()
-        return svg
+        if (revision !== renderRevision) {
+            return null;
+        }
+        documentPuml = plantuml;
+        documentRevision = response.headers.get('X-Document-Revision');
+        return svg;
     } catch (error) {
+        if (error.name === 'AbortError') {
+            return null;
+        }
         console.error('Error with render fetch api?', error);
     }
 }
 
+// fetch() for the diagram routes. When the request carries the puml and SVG
+// of the last render, send a reference to the server's copy instead, and
+// fall back to the full request if the server no longer has that revision.
+async function documentFetch(url, options) {
+    const fields = options && options.body ? JSON.parse(options.body) : null;
+    if (!fields || !('plantuml' in fields)) {
+        return fetch(url, options);
+    }
+    // Edit routes then answer with the changed lines only (see lineDeltaFetch).
+    const base = fields.plantuml;
+    fields.delta = true;
+    const full = {...options, body: JSON.stringify(fields)};
+    if (documentRevision === null) {
+        return lineDeltaFetch(url, full, base);
+    }
+    let trim;
+    if (fields.plantuml === documentPuml) {
+        trim = false;
+    } else if (fields.plantuml === trimlines(documentPuml)) {
+        trim = true;
+    } else {
+        return lineDeltaFetch(url, full, base);
+    }
+    delete fields.plantuml;
+    delete fields.svg;
+    fields.document = renderSession;
+    fields.revision = documentRevision;
+    fields.trimlines = trim;
+    const response = await lineDeltaFetch(url, {...options, body: JSON.stringify(fields)}, base);
+    if (response.status !== 409) {
+        return response;
+    }
+    documentRevision = null;
+    return lineDeltaFetch(url, full, base);
+}
+
+// Edit routes asked for a delta answer with line operations on the puml
+// they edited (X-Line-Delta). They are applied to base, the puml that was
+// sent, and handed back as the full response the caller expects.
+async function lineDeltaFetch(url, options, base) {
+    const response = await fetch(url, options);
+    if (!response.ok || !response.headers.get('X-Line-Delta')) {
+        return response;
+    }
+    const delta = await response.json();
+    const hash = await sha256Hex(base);
+    if (hash !== null && hash !== delta.base) {
+        const fields = JSON.parse(options.body);
+        delete fields.delta;
+        return fetch(url, {...options, body: JSON.stringify(fields)});
+    }
+    const puml = applyLineDelta(base, delta.ops);
+    if (delta.field) {
+        return new Response(JSON.stringify({[delta.field]: puml}), {
+            headers: {'Content-Type': 'application/json'}
+        });
+    }
+    return new Response(puml, {headers: {'Content-Type': 'text/html; charset=utf-8'}});
+}
+
+function applyLineDelta(base, ops) {
+    const lines = base.split('\n');
+    for (let i = ops.length - 1; i >= 0; i--) {
+        lines.splice(ops[i].index, ops[i].count, ...(ops[i].lines || []));
+    }
+    return lines.join('\n');
+}
+
+// Null where the page has no Web Crypto (plain http off localhost).
+async function sha256Hex(text) {
+    if (!window.crypto || !window.crypto.subtle) {
+        return null;
+    }
+    const digest = await window.crypto.subtle.digest('SHA-256', new TextEncoder().encode(text));
+    return Array.from(new Uint8Array(digest), byte => byte.toString(16).padStart(2, '0')).join('');
+}
+
 function toggleLoadingOverlay() {
     const overlay = document.getElementById('loading-overlay');
     if (overlay.style.display === 'none' || overlay.style.display === '') {
@@ -633,7 +766,9 @@ async function renderPlantUml() {
             break;
         default:
             fetchSvgFromPlantUml().then((svgContent) => {
-                element.innerHTML = svgContent;
+                if (svgContent !== null) {
+                    element.innerHTML = svgContent;
+                }
             });
             toggleLoadingOverlay();
     }
@@ -22,7 +22,7 @@ async function fetchMessagePositions() {
     }
     try {
         const plantuml = trimlines(editor.session.getValue());
-        const response = await fetch("getMessagePositions", {
+        const response = await documentFetch("getMessagePositions", {
             method: 'POST',
             headers: {'Content-Type': 'application/json'},
             body: JSON.stringify({plantuml: plantuml, svg: svg.innerHTML})
@@ -175,7 +175,7 @@ function activationEventListeners() {
         const svg = element.querySelector('g');
         try {
             const plantuml = trimlines(editor.session.getValue());
-            const response = await fetch("deleteActivation", {
+            const response = await documentFetch("deleteActivation", {
                 method: 'POST',
                 headers: {'Content-Type': 'application/json'},
                 body: JSON.stringify({
@@ -211,7 +211,7 @@ async function submitActivation(endType) {
 
     try {
         const plantuml = trimlines(editor.session.getValue());
-        const response = await fetch("addActivation", {
+        const response = await documentFetch("addActivation", {
             method: 'POST',
             headers: {'Content-Type': 'application/json'},
             body: JSON.stringify({
@@ -297,7 +297,7 @@ function messageEventListeners() {
             let response;
             if (messageEditMode) {
                 messageEditMode = false;
-                response = await fetch("editMessageText", {
+                response = await documentFetch("editMessageText", {
                     method: 'POST',
                     headers: {'Content-Type': 'application/json'},
                     body: JSON.stringify({
@@ -308,7 +308,7 @@ function messageEventListeners() {
                     }),
                 });
             } else {
-                response = await fetch("addMessage", {
+                response = await documentFetch("addMessage", {
                     method: 'POST',
                     headers: {'Content-Type': 'application/json'},
                     body: JSON.stringify({
@@ -21,7 +21,7 @@ async function extractLifelinePositions() {
     if (!svg) return;
     try {
         const plantuml = trimlines(editor.session.getValue());
-        const response = await fetch("getParticipantPositions", {
+        const response = await documentFetch("getParticipantPositions", {
             method: 'POST',
             headers: {'Content-Type': 'application/json'},
             body: JSON.stringify({plantuml: plantuml, svg: svg.innerHTML})
@@ -61,7 +61,7 @@ function participantEventListeners() {
         var newname = $('#participant-name-text').val()
         try {
             const plantuml = trimlines(editor.session.getValue());
-            const response = await fetch("editParticipantName", {
+            const response = await documentFetch("editParticipantName", {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json'
@@ -86,7 +86,7 @@ function participantEventListeners() {
         const svg = element.querySelector('g');
         try {
             const plantuml = trimlines(editor.session.getValue());
-            const response = await fetch("getParticipantName", {
+            const response = await documentFetch("getParticipantName", {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json'
@@ -140,7 +140,7 @@ function participantEventListeners() {
                         toBeStringified[key] = value;
                     }
                 }
-                const response = await fetch(item.endpoint, {
+                const response = await documentFetch(item.endpoint, {
                     method: 'POST',
                     headers: {
                         'Content-Type': 'application/json'
@@ -174,7 +174,7 @@ function setupParticipantHandlers(svgelements, svg, element) {
             lastclickedsvgelement = svgelement;
             try {
                 const plantuml = trimlines(editor.session.getValue());
-                const response = await fetch("getParticipantName", {
+                const response = await documentFetch("getParticipantName", {
                     method: 'POST',
                     headers: {
                         'Content-Type': 'application/json'
@@ -233,6 +233,10 @@ function sequenceEventListeners() {
 // Called on every render when diagram type is sequence
 async function setHandlersForSequenceDiagram(pumlcontent, element) {
     fetchSvgFromPlantUml().then(async (svgContent) => {
+        if (svgContent === null) {
+            toggleLoadingOverlay();
+            return;
+        }
         element.innerHTML = svgContent;
         const svgContainer = element.querySelector('svg');
         const svg = element.querySelector('g');
@@ -323,7 +327,7 @@ function messageOperationEventListeners() {
         const svg = element.querySelector('g');
         try {
             const plantuml = trimlines(editor.session.getValue());
-            const response = await fetch("getMessageText", {
+            const response = await documentFetch("getMessageText", {
                 method: 'POST',
                 headers: {'Content-Type': 'application/json'},
                 body: JSON.stringify({
@@ -351,7 +355,7 @@ function messageOperationEventListeners() {
         const svg = element.querySelector('g');
         try {
             const plantuml = trimlines(editor.session.getValue());
-            const response = await fetch("deleteMessage", {
+            const response = await documentFetch("deleteMessage", {
                 method: 'POST',
                 headers: {'Content-Type': 'application/json'},
                 body: JSON.stringify({
@@ -458,7 +462,7 @@ function noteOperationEventListeners() {
         var svg = element.querySelector('g');
         try {
             var plantuml = trimlines(editor.session.getValue());
-            var response = await fetch("getSeqNoteText", {
+            var response = await documentFetch("getSeqNoteText", {
                 method: 'POST',
                 headers: {'Content-Type': 'application/json'},
                 body: JSON.stringify({
@@ -484,7 +488,7 @@ function noteOperationEventListeners() {
         var svg = element.querySelector('g');
         try {
             var plantuml = trimlines(editor.session.getValue());
-            var response = await fetch("deleteSeqNote", {
+            var response = await documentFetch("deleteSeqNote", {
                 method: 'POST',
                 headers: {'Content-Type': 'application/json'},
                 body: JSON.stringify({
@@ -514,7 +518,7 @@ async function submitNote() {
         var response;
         if (noteEditMode) {
             noteEditMode = false;
-            response = await fetch("editSeqNote", {
+            response = await documentFetch("editSeqNote", {
                 method: 'POST',
                 headers: {'Content-Type': 'application/json'},
                 body: JSON.stringify({
@@ -537,7 +541,7 @@ async function submitNote() {
             if (notePlacement === 'spanning') {
                 body.secondParticipant = document.getElementById('seq-note-second-participant').value;
             }
-            response = await fetch("addNote", {
+            response = await documentFetch("addNote", {
                 method: 'POST',
                 headers: {'Content-Type': 'application/json'},
                 body: JSON.stringify(body)
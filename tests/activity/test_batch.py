@@ -0,0 +1,116 @@
+# SPDX-License-Identifier: MIT
+#
+# MIT License
+#
+# Copyright (c) 2026 Ericsson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""Tests for /batch, several activity edits in one request."""
+
+from test_element_map import PUML, SVG
+
+from plantuml_gui.shared.line_delta import apply_line_delta
+from plantuml_gui.shared.svg_fragment import svg_fragment
+
+FRAGMENT = svg_fragment(SVG)
+FIRST_ACTIVITY = '<rect fill="#F1F1F1" x="74.5" y="50"></rect>'
+SECOND_ACTIVITY = '<rect fill="#F1F1F1" x="23" y="164.2656"></rect>'
+THIRD_ACTIVITY = '<rect fill="#F1F1F1" x="126" y="200.5625"></rect>'
+NOTE = (
+    '<path d="M157.5,54.418 L157.5,62.9844 L137.5,66.9844 L157.5,70.9844 '
+    "L157.5,79.5508 A0,0 0 0 0 157.5,79.5508 L207.5,79.5508 A0,0 0 0 0 "
+    "207.5,79.5508 L207.5,64.418 L197.5,54.418 L157.5,54.418 A0,0 0 0 0 "
+    '157.5,54.418 "></path>'
+)
+
+
+def post_batch(client, operations, **fields):
+    return client.post(
+        "/batch",
+        json={"plantuml": PUML, "svg": FRAGMENT, "operations": operations, **fields},
+    )
+
+
+class TestBatch:
+    def test_clicks_follow_earlier_edits(self, client):
+        # Once the first activity is gone the others are drawn one ordinal
+        # earlier; each click must still reach the activity it was made on.
+        response = post_batch(
+            client,
+            [
+                {"endpoint": "deleteActivity", "svgelement": FIRST_ACTIVITY},
+                {
+                    "endpoint": "editText",
+                    "svgelement": SECOND_ACTIVITY,
+                    "newname": "Renamed",
+                },
+                {"endpoint": "deleteActivity", "svgelement": THIRD_ACTIVITY},
+            ],
+        )
+        assert response.status_code == 200
+        assert (
+            response.data.decode()
+            == """@startuml
+start
+group group
+if (Statement) then (yes)
+  :Renamed;
+else (no)
+group hej
+end group
+endif
+end group
+stop
+@enduml"""
+        )
+
+    def test_delta(self, client):
+        operations = [{"endpoint": "deleteActivity", "svgelement": THIRD_ACTIVITY}]
+        full = post_batch(client, operations).data.decode()
+        delta = post_batch(client, operations, delta=True).get_json()
+        assert apply_line_delta(PUML, delta["ops"]) == full
+
+    def test_removed_target(self, client):
+        # Deleting an activity deletes the note attached to it.
+        response = post_batch(
+            client,
+            [
+                {"endpoint": "deleteActivity", "svgelement": FIRST_ACTIVITY},
+                {"endpoint": "deleteNote", "svgelement": NOTE},
+            ],
+        )
+        assert response.status_code == 422
+        assert response.get_json()["error"] == "batch_failed"
+        assert response.get_json()["index"] == 1
+
+    def test_rejects_routes_that_do_not_edit(self, client):
+        response = post_batch(
+            client,
+            [
+                {"endpoint": "deleteActivity", "svgelement": FIRST_ACTIVITY},
+                {"endpoint": "getText", "svgelement": SECOND_ACTIVITY},
+            ],
+        )
+        assert response.status_code == 422
+        assert response.get_json()["index"] == 1
+        for endpoint in ("batch", "deleteParticipant", "noSuchRoute"):
+            response = post_batch(client, [{"endpoint": endpoint}])
+            assert response.status_code == 422
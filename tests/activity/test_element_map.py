@@ -0,0 +1,137 @@
+# SPDX-License-Identifier: MIT
+#
+# MIT License
+#
+# Copyright (c) 2026 Ericsson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Tests for the clickable activity shapes and the lookups /render prepares."""
+
+from flask import json
+from plantuml_gui.activity import element_map
+from plantuml_gui.activity.element_map import activity_shapes
+from plantuml_gui.activity.svg_index import svg_index
+from plantuml_gui.activity.util import is_statement_chunk
+from plantuml_gui.shared.svg_fragment import svg_fragment
+from plantuml_gui.shared import routes
+
+PUML = """@startuml
+start
+:Activity;
+note right
+note
+end note
+group group
+if (Statement) then (yes)
+  :Activity;
+else (no)
+group hej
+  :Activity;
+end group
+endif
+end group
+stop
+@enduml"""
+
+# Raw PlantUML output for PUML: namespaced, self-closing XML.
+SVG = """<?xml version="1.0" encoding="us-ascii" standalone="no"?><svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" contentStyleType="text/css" height="341px" preserveAspectRatio="none" style="width:230px;height:341px;background:#FFFFFF;" version="1.1" viewBox="0 0 230 341" width="230px" zoomAndPan="magnify"><defs/><g><ellipse cx="106" cy="20" fill="#222222" rx="10" ry="10" style="stroke:#222222;stroke-width:1.0;"/><path d="M157.5,54.418 L157.5,62.9844 L137.5,66.9844 L157.5,70.9844 L157.5,79.5508 A0,0 0 0 0 157.5,79.5508 L207.5,79.5508 A0,0 0 0 0 207.5,79.5508 L207.5,64.418 L197.5,54.418 L157.5,54.418 A0,0 0 0 0 157.5,54.418 " fill="#FEFFDD" style="stroke:#181818;stroke-width:0.5;"/><path d="M197.5,54.418 L197.5,64.418 L207.5,64.418 L197.5,54.418 " fill="#FEFFDD" style="stroke:#181818;stroke-width:0.5;"/><text fill="#000000" font-family="sans-serif" font-size="13" lengthAdjust="spacing" textLength="29" x="163.5" y="71.3008">note</text><rect fill="#F1F1F1" height="33.9688" rx="12.5" ry="12.5" style="stroke:#181818;stroke-width:0.5;" width="63" x="74.5" y="50"/><text fill="#000000" font-family="sans-serif" font-size="12" lengthAdjust="spacing" textLength="43" x="84.5" y="70.9688">Activity</text><rect fill="none" height="194.5625" style="stroke:#000000;stroke-width:1.5;" width="208" x="11" y="93.9688"/><path d="M62,93.9688 L62,103.2656 L52,113.2656 L11,113.2656 " fill="none" style="stroke:#000000;stroke-width:1.5;"/><text fill="#000000" font-family="sans-serif" font-size="14" lengthAdjust="spacing" textLength="41" x="14" y="107.7656">group</text><polygon fill="#F1F1F1" points="76.5,130.2656,135.5,130.2656,147.5,142.2656,135.5,154.2656,76.5,154.2656,64.5,142.2656,76.5,130.2656" style="stroke:#181818;stroke-width:0.5;"/><text fill="#000000" font-family="sans-serif" font-size="11" lengthAdjust="spacing" textLength="59" x="76.5" y="145.918">Statement</text><text fill="#000000" font-family="sans-serif" font-size="11" lengthAdjust="spacing" textLength="20" x="44.5" y="139.5156">yes</text><text fill="#000000" font-family="sans-serif" font-size="11" lengthAdjust="spacing" textLength="14" x="147.5" y="139.5156">no</text><rect fill="#F1F1F1" height="33.9688" rx="12.5" ry="12.5" style="stroke:#181818;stroke-width:0.5;" width="63" x="23" y="164.2656"/><text fill="#000000" font-family="sans-serif" font-size="12" lengthAdjust="spacing" textLength="43" x="33" y="185.2344">Activity</text><rect fill="none" height="82.2656" style="stroke:#000000;stroke-width:1.5;" width="83" x="116" y="164.2656"/><path d="M147,164.2656 L147,173.5625 L137,183.5625 L116,183.5625 " fill="none" style="stroke:#000000;stroke-width:1.5;"/><text fill="#000000" font-family="sans-serif" font-size="14" lengthAdjust="spacing" textLength="21" x="119" y="178.0625">hej</text><rect fill="#F1F1F1" height="33.9688" rx="12.5" ry="12.5" style="stroke:#181818;stroke-width:0.5;" width="63" x="126" y="200.5625"/><text fill="#000000" font-family="sans-serif" font-size="12" lengthAdjust="spacing" textLength="43" x="136" y="221.5313">Activity</text><polygon fill="#F1F1F1" points="106,252.5313,118,264.5313,106,276.5313,94,264.5313,106,252.5313" style="stroke:#181818;stroke-width:0.5;"/><ellipse cx="106" cy="319.5313" fill="transparent" rx="11" ry="11" style="stroke:#222222;stroke-width:1.0;"/><ellipse cx="106" cy="319.5313" fill="#222222" rx="6" ry="6" style="stroke:#111111;stroke-width:1.0;"/><line style="stroke:#181818;stroke-width:1.0;" x1="106" x2="106" y1="30" y2="50"/><polygon fill="#181818" points="102,40,106,50,110,40,106,44" style="stroke:#181818;stroke-width:1.0;"/><line style="stroke:#181818;stroke-width:1.0;" x1="64.5" x2="54.5" y1="142.2656" y2="142.2656"/><line style="stroke:#181818;stroke-width:1.0;" x1="54.5" x2="54.5" y1="142.2656" y2="164.2656"/><polygon fill="#181818" points="50.5,154.2656,54.5,164.2656,58.5,154.2656,54.5,158.2656" style="stroke:#181818;stroke-width:1.0;"/><line style="stroke:#181818;stroke-width:1.0;" x1="147.5" x2="157.5" y1="142.2656" y2="142.2656"/><line style="stroke:#181818;stroke-width:1.0;" x1="157.5" x2="157.5" y1="142.2656" y2="200.5625"/><polygon fill="#181818" points="153.5,190.5625,157.5,200.5625,161.5,190.5625,157.5,194.5625" style="stroke:#181818;stroke-width:1.0;"/><line style="stroke:#181818;stroke-width:1.0;" x1="54.5" x2="54.5" y1="198.2344" y2="264.5313"/><line style="stroke:#181818;stroke-width:1.0;" x1="54.5" x2="94" y1="264.5313" y2="264.5313"/><polygon fill="#181818" points="84,260.5313,94,264.5313,84,268.5313,88,264.5313" style="stroke:#181818;stroke-width:1.0;"/><line style="stroke:#181818;stroke-width:1.0;" x1="157.5" x2="157.5" y1="234.5313" y2="264.5313"/><line style="stroke:#181818;stroke-width:1.0;" x1="157.5" x2="118" y1="264.5313" y2="264.5313"/><polygon fill="#181818" points="128,260.5313,118,264.5313,128,268.5313,124,264.5313" style="stroke:#181818;stroke-width:1.0;"/><line style="stroke:#181818;stroke-width:1.0;" x1="106" x2="106" y1="83.9688" y2="130.2656"/><polygon fill="#181818" points="102,120.2656,106,130.2656,110,120.2656,106,124.2656" style="stroke:#181818;stroke-width:1.0;"/><line style="stroke:#181818;stroke-width:1.0;" x1="106" x2="106" y1="276.5313" y2="308.5313"/><polygon fill="#181818" points="102,298.5313,106,308.5313,110,298.5313,106,302.5313" style="stroke:#181818;stroke-width:1.0;"/></g></svg>"""
+
+
+class TestSvgFragment:
+    def test_matches_browser_inner_html(self):
+        fragment = svg_fragment(SVG)
+        assert fragment.startswith('<ellipse cx="106" cy="20"')
+        assert "></ellipse><path" in fragment
+        assert "xmlns" not in fragment
+        assert "<g>" not in fragment
+
+    def test_invalid_svg(self):
+        assert svg_fragment("not svg") == ""
+
+
+class TestActivityShapes:
+    def test_kinds_and_ordinals(self):
+        shapes = activity_shapes(svg_fragment(SVG))
+        assert [(kind, ordinal) for kind, ordinal, _ in shapes] == [
+            ("activity", 1),
+            ("activity", 2),
+            ("activity", 3),
+            ("if", 1),
+            ("ellipse", 1),
+            ("ellipse", 2),
+            ("note", 1),
+            ("group", 1),
+            ("group", 2),
+            ("merge", 1),
+        ]
+
+    def test_shapes_are_the_svg_elements(self):
+        shapes = activity_shapes(svg_fragment(SVG))
+        assert (shapes[0][2].x, shapes[0][2].y) == (74.5, 50.0)
+        assert (shapes[4][2].cx, shapes[4][2].cy) == (106.0, 20.0)
+        assert shapes[7][2].d.startswith("M62,93.9688")
+
+
+class TestRenderLookups:
+    def test_plain_render_is_unchanged(self, client, monkeypatch):
+        monkeypatch.setattr(routes, "_create_svg_from_uml", lambda puml: SVG)
+        response = client.post(
+            "/render",
+            data=json.dumps({"plantuml": PUML}),
+            content_type="application/json",
+        )
+        assert response.data.decode("utf-8") == SVG
+
+    def test_stored_activity_render_prepares_click_lookups(self, client, monkeypatch):
+        monkeypatch.setattr(routes, "_create_svg_from_uml", lambda puml: SVG)
+        client.post(
+            "/render",
+            data=json.dumps(
+                {"plantuml": PUML, "document": "lookups", "diagram": "activity"}
+            ),
+            content_type="application/json",
+        )
+        memo = svg_index(svg_fragment(SVG)).memo
+        assert {"activity_chunks", "note_ordinals", "merge_ordinals"} <= memo.keys()
+        assert is_statement_chunk in memo["polygon_chunks"].ordinals
+
+    def test_stored_activity_render_patches_the_previous_structure(
+        self, client, monkeypatch
+    ):
+        monkeypatch.setattr(routes, "_create_svg_from_uml", lambda puml: SVG)
+        edits = []
+        edited = element_map.edited_structure
+
+        def recording(old_lines, lines):
+            edits.append((len(old_lines), len(lines)))
+            return edited(old_lines, lines)
+
+        monkeypatch.setattr(element_map, "edited_structure", recording)
+        edited_puml = PUML.replace(":Activity;", ":Activity;\n:Next;", 1)
+        for puml in (PUML, edited_puml):
+            client.post(
+                "/render",
+                data=json.dumps(
+                    {"plantuml": puml, "document": "patched", "diagram": "activity"}
+                ),
+                content_type="application/json",
+            )
+        lines = len(PUML.splitlines())
+        assert (lines, lines + 1) in edits
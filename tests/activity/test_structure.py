@@ -0,0 +1,304 @@
+# SPDX-License-Identifier: MIT
+#
+# MIT License
+#
+# Copyright (c) 2026 Ericsson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Tests for the one-pass block structure of activity puml."""
+
+import random
+import sys
+
+from plantuml_gui.activity import structure as structure_module
+from plantuml_gui.activity.structure import (
+    activity_structure,
+    build_structure,
+    changed_lines,
+    edited_structure,
+)
+
+PUML = """@startuml
+if (first
+line) then (yes)
+  while (outer)
+    while (inner)
+      :a;
+    endwhile
+  endwhile
+else (no
+more)
+  if (nested) then (yes)
+    :b;
+  endif
+endif
+partition p {
+  group g
+    :c;
+    note right
+    text
+    end note
+  end group
+}
+fork
+  :d;
+fork again
+  fork
+    :e;
+  end merge
+end fork
+@enduml""".splitlines()
+
+LEAVES = """@startuml
+start
+:a;
+repeat
+  :b;
+  backward :back;
+repeat while (again?)
+if (x) then (yes)
+  :c;
+  detach
+else (no)
+  (A)
+endif
+#red:d;
+#blue(B)
+note right
+end
+end note
+if (y) then (yes)
+  :e;
+endif
+stop
+@enduml""".splitlines()
+
+
+class TestStructure:
+    def test_if_bounds_and_labels(self):
+        structure = build_structure(PUML)
+        block = structure.blocks[1]
+        assert (block.kind, block.end, block.parent) == ("if", 13, -1)
+        assert structure.if_header(1) == (1, 2)
+        assert structure.else_bounds(1) == (8, 9)
+        assert block.branches == (8,)
+        assert structure.blocks[10].parent == 1
+        assert structure.else_bounds(10) == (-1, -1)
+
+    def test_whiles_are_ordered_innermost_first(self):
+        structure = build_structure(PUML)
+        assert structure.whiles == (4, 3)
+        assert structure.while_start(1) == 4
+        assert structure.end(3) == 7
+        assert structure.while_start(3) == -1
+
+    def test_groups_nested_in_partitions(self):
+        structure = build_structure(PUML)
+        assert structure.group_bounds(1) == (14, 21)
+        assert structure.group_bounds(2) == (15, 20)
+        assert structure.note_bounds(1) == (17, 19)
+        assert structure.blocks[17].parent == 15
+        assert structure.note_bounds(0) == (-1, -1)
+
+    def test_fork_bars(self):
+        structure = build_structure(PUML)
+        assert structure.fork_bars == (22, 25, 28)
+        assert structure.fork_bounds(1) == (22, 28)
+        assert structure.fork_bounds(2) == (25, 27)
+        assert structure.blocks[22].branches == (24,)
+        # The third bar is the end fork, not a fork of its own.
+        assert structure.fork_bounds(3) == (-1, -1)
+
+    def test_statements_in_svg_order(self):
+        structure = build_structure(PUML)
+        # The outer if has both branches, so its diamond comes first; the
+        # nested if has no else, so its diamond follows its branch.
+        assert structure.statements == (1, 10)
+        assert structure.statement_start(2) == 10
+        assert structure.statement_start(3) == -1
+
+    def test_else_after_a_nested_if_belongs_to_the_outer_if(self):
+        lines = """@startuml
+if (a) then (yes)
+  if (b) then (yes)
+    :x;
+  endif
+else (no)
+  :y;
+endif
+@enduml""".splitlines()
+        structure = build_structure(lines)
+        # The nested endif closes b, so the else is a's and a, having both
+        # branches, is drawn before b.
+        assert structure.else_bounds(1) == (5, 5)
+        assert structure.else_bounds(2) == (-1, -1)
+        assert structure.statements == (1, 2)
+
+    def test_elseif_after_a_nested_if_belongs_to_the_outer_if(self):
+        lines = """@startuml
+if (a) then (yes)
+  if (b) then (yes)
+    :x;
+  endif
+  :z;
+elseif (c) then (yes)
+  :y;
+else (no)
+  :w;
+endif
+@enduml""".splitlines()
+        structure = build_structure(lines)
+        assert structure.else_bounds(1) == (6, 6)
+        assert structure.blocks[1].branches == (6, 8)
+        assert structure.else_bounds(2) == (-1, -1)
+        assert structure.statements == (1, 2)
+
+    def test_partition_inside_a_group(self):
+        lines = """@startuml
+group g
+  partition p {
+    :a;
+  }
+  :b;
+end group
+@enduml""".splitlines()
+        structure = build_structure(lines)
+        assert structure.group_bounds(1) == (1, 6)
+        assert structure.group_bounds(2) == (2, 4)
+        assert structure.blocks[2].parent == 1
+
+    def test_group_inside_a_partition_ends_at_end_group(self):
+        lines = """@startuml
+partition p {
+  group g
+    :a;
+  end group
+}
+@enduml""".splitlines()
+        structure = build_structure(lines)
+        assert structure.group_bounds(1) == (1, 5)
+        assert structure.group_bounds(2) == (2, 4)
+
+    def test_activities_in_svg_order(self):
+        structure = build_structure(LEAVES)
+        # A repeat's backward activity is drawn when the loop closes.
+        assert structure.activities == (2, 4, 5, 8, 13, 19)
+        assert structure.activity_start(3) == 5
+        assert structure.activity_start(7) == -1
+
+    def test_merges_skip_endifs_a_detach_removes(self):
+        structure = build_structure(LEAVES)
+        # The first endif follows an else that comes right after a detach,
+        # which also hides every later endif's merge.
+        assert structure.merges == (3,)
+        assert build_structure(PUML).merges == (12, 13, 27)
+        assert structure.merge_line(2) == -1
+
+    def test_ellipses_and_connectors(self):
+        structure = build_structure(LEAVES)
+        # "end" inside a note is note text, not an end ellipse.
+        assert structure.ellipses == (1, 21)
+        assert structure.connectors == (11, 14)
+        assert structure.connector_line(2) == 14
+
+    def test_deep_nesting_is_not_limited_by_recursion(self):
+        depth = sys.getrecursionlimit() + 100
+        lines = ["@startuml", *["if (c) then (yes)"] * depth, *["endif"] * depth]
+        structure = build_structure(lines)
+        assert structure.statements == tuple(range(depth, 0, -1))
+        assert structure.end(1) == 2 * depth
+
+    def test_unclosed_blocks_have_no_end(self):
+        structure = build_structure(["@startuml", "repeat", ":a;", "@enduml"])
+        assert structure.end(1) == -1
+
+    def test_structure_is_cached_by_content(self, monkeypatch):
+        monkeypatch.setattr(structure_module, "_cache", type(structure_module._cache)())
+        assert activity_structure(PUML) is activity_structure(list(PUML))
+        assert activity_structure(PUML) is not activity_structure(PUML[:-1])
+
+
+class TestEditedStructure:
+    EDITS = [
+        [":x;"],
+        ["stop"],
+        ["(C)"],
+        ["else (no)"],
+        ["endif"],
+        ["if (c) then (yes)", ":y;", "else (no)", "endif"],
+        ["repeat", ":r;", "backward :b;", "repeat while (again?)"],
+        ["while (w)", ":w;", "endwhile"],
+        ["fork", ":f;", "fork again", "end fork"],
+        ["note right", "text", "end note"],
+    ]
+
+    def scanned(self, monkeypatch):
+        monkeypatch.setattr(structure_module, "_cache", type(structure_module._cache)())
+        lengths = []
+        scan = structure_module._scan
+
+        def recording(lines):
+            lengths.append(len(lines))
+            return scan(lines)
+
+        monkeypatch.setattr(structure_module, "_scan", recording)
+        return lengths
+
+    def test_changed_lines(self):
+        assert changed_lines(PUML, PUML) == (len(PUML), len(PUML), len(PUML))
+        edited = PUML[:5] + [":x;", ":y;"] + PUML[6:]
+        assert changed_lines(PUML, edited) == (5, 6, 7)
+        assert changed_lines(PUML, PUML[:3] + PUML[4:]) == (3, 4, 3)
+
+    def test_edit_rescans_only_the_changed_lines(self, monkeypatch):
+        lengths = self.scanned(monkeypatch)
+        activity_structure(PUML)
+        edited = PUML[:5] + [":x;", "if (c) then (yes)", ":y;", "endif"] + PUML[6:]
+        structure = edited_structure(PUML, edited)
+        assert lengths[1:] == [1, 4]
+        assert structure == build_structure(edited)
+
+    def test_edit_to_a_branch_rescans_the_block_around_it(self, monkeypatch):
+        lengths = self.scanned(monkeypatch)
+        activity_structure(PUML)
+        edited = PUML[:8] + ["else (never"] + PUML[9:]
+        structure = edited_structure(PUML, edited)
+        assert lengths[1:] == [1, 1, 13, 13]  # the else alone, then its if
+        assert structure == build_structure(edited)
+
+    def test_random_edits_match_a_full_scan(self, monkeypatch):
+        self.scanned(monkeypatch)
+        rng = random.Random(14)
+        lines = PUML
+        for _ in range(150):
+            edited = list(lines)
+            start = rng.randrange(1, len(edited))
+            stop = min(start + rng.randrange(3), len(edited) - 1)
+            edited[start:stop] = rng.choice(self.EDITS)
+            assert edited_structure(lines, edited) == build_structure(edited)
+            if structure_module._scan(edited).clean:
+                lines = edited  # go on editing a document that can be patched
+
+    def test_unmatched_lines_are_scanned_in_full(self, monkeypatch):
+        lengths = self.scanned(monkeypatch)
+        activity_structure(LEAVES)  # an else right after a detach
+        edited = LEAVES[:2] + [":x;"] + LEAVES[2:]
+        edited_structure(LEAVES, edited)
+        assert lengths[1:] == [len(edited)]
@@ -0,0 +1,107 @@
+# SPDX-License-Identifier: MIT
+#
+# MIT License
+#
+# Copyright (c) 2026 Ericsson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Tests for the parsed SVG index shared by the activity modules."""
+
+from plantuml_gui.activity import svg_index as svg_index_module
+from plantuml_gui.activity.classes import Ellipse, PolyElement, RectElement
+from plantuml_gui.activity.svg_index import (
+    build_svg_index,
+    memoized,
+    ordinals,
+    svg_index,
+    text_run,
+)
+
+SVG = (
+    '<ellipse cx="41" cy="20" fill="#222222" rx="10" ry="10"></ellipse>'
+    '<rect fill="#F1F1F1" height="33.9688" rx="12.5" ry="12.5" '
+    'style="stroke:#181818;stroke-width:0.5;" width="52" x="15" y="50"></rect>'
+    '<text x="25" y="70.9688">First  line</text>'
+    '<a href="https://example.com"><text x="25" y="84">link</text></a>'
+    "<!--comment-->"
+    '<text x="25" y="98">after comment</text>'
+    '<polygon points="102,40,106,50,110,40,106,44"></polygon>'
+)
+
+
+class TestSvgIndex:
+    def test_typed_shapes_in_document_order(self):
+        index = build_svg_index(SVG)
+        assert [rect.element for rect in index.rects] == [RectElement(15, 50)]
+        assert index.rects[0].numbers["height"] == 33.9688
+        assert [e.element for e in index.ellipses] == [Ellipse(41, 20)]
+        assert [p.element for p in index.polygons] == [
+            PolyElement("102,40,106,50,110,40,106,44")
+        ]
+        assert [t.element.label for t in index.texts] == [
+            "First line",
+            "[[https://example.com link]]",
+            "link",
+            "after comment",
+        ]
+
+    def test_text_run_stops_at_comment(self):
+        index = build_svg_index(SVG)
+        assert [t.label for t in text_run(index.rects[0])] == [
+            "First line",
+            "[[https://example.com link]]",
+        ]
+
+    def test_index_is_cached_by_content(self, monkeypatch):
+        monkeypatch.setattr(svg_index_module, "_cache", type(svg_index_module._cache)())
+        assert svg_index(SVG) is svg_index("".join(SVG))
+        assert svg_index(SVG) is not svg_index(SVG + "<g></g>")
+
+    def test_least_recently_used_index_is_evicted(self, monkeypatch):
+        monkeypatch.setattr(svg_index_module, "_cache", type(svg_index_module._cache)())
+        monkeypatch.setattr(svg_index_module, "SVG_INDEX_CACHE_SIZE", 2)
+        first = svg_index(SVG)
+        svg_index(SVG + "<g></g>")
+        svg_index(SVG)
+        svg_index(SVG + "<g><g></g></g>")
+        assert svg_index(SVG) is first
+        assert len(svg_index_module._cache) == 2
+
+    def test_memoized_builds_once_per_svg(self, monkeypatch):
+        monkeypatch.setattr(svg_index_module, "_cache", type(svg_index_module._cache)())
+        builds = []
+
+        def count_rects(index):
+            builds.append(index)
+            return len(index.rects)
+
+        assert memoized(SVG, "rects", count_rects) == 1
+        assert memoized("".join(SVG), "rects", count_rects) == 1
+        assert len(builds) == 1
+
+
+class TestOrdinals:
+    def test_counts_flagged_shapes_up_to_the_first_match(self):
+        table = ordinals([("a", True), ("b", False), ("c", True), ("a", True)])
+        assert [table.of(shape) for shape in "abc"] == [1, 1, 2]
+
+    def test_missing_shape_counts_every_flagged_shape(self):
+        table = ordinals([("a", True), ("b", False), ("c", True)])
+        assert table.of(PolyElement("1,2")) == table.size == 2
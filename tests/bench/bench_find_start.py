@@ -0,0 +1,106 @@
+# SPDX-License-Identifier: MIT
+#
+# MIT License
+#
+# Copyright (c) 2026 Ericsson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Benchmark: resolving a clicked if diamond to its puml line.
+
+Times ``find_start()`` for the last diamond of a diagram with a growing
+number of if-statements, either all nested inside each other or one after
+the other:
+
+- ``cold``: the structure cache is empty, so the puml is scanned
+- ``warm``: the structure of the same puml is already cached, as for every
+  route after the first one that sees a given diagram
+
+The ``slope`` column is the scaling exponent between consecutive sizes
+(1.0 is linear, 2.0 quadratic). Deep nesting is walked without recursion,
+so it is not bounded by the interpreter's recursion limit.
+
+Run from the repository root::
+
+    python -m tests.bench.bench_find_start [--sizes 100 1000 10000] [--repeat 5]
+"""
+
+import argparse
+import math
+import time
+
+from plantuml_gui.activity import structure
+from plantuml_gui.activity.if_statements import find_start
+
+
+def nested_ifs(count: int) -> list[str]:
+    """Return ``count`` if/else statements, each inside the previous one."""
+    opening = [f"if (condition {i}) then (yes)\n:step {i};" for i in range(count)]
+    closing = ["else (no)\n:other;\nendif"] * count
+    return ["@startuml", *"\n".join(opening + closing).splitlines(), "@enduml"]
+
+
+def sequential_ifs(count: int) -> list[str]:
+    """Return ``count`` if/else statements one after the other."""
+    body = [
+        f"if (condition {i}) then (yes)\n:step {i};\nelse (no)\n:other;\nendif"
+        for i in range(count)
+    ]
+    return ["@startuml", *"\n".join(body).splitlines(), "@enduml"]
+
+
+def measure(lines: list[str], count: int, repeat: int, cold: bool) -> float:
+    """Return the best wall time of ``repeat`` lookups in milliseconds."""
+    best = float("inf")
+    find_start(lines, count)
+    for _ in range(repeat):
+        if cold:
+            structure._cache.clear()
+        start = time.perf_counter()
+        find_start(lines, count)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[100, 300, 1000, 3000, 10000]
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'ifs':>6} {'shape':>10} {'cache':>5} {'best ms':>10} {'slope':>6}")
+    for shape, build in (("nested", nested_ifs), ("sequential", sequential_ifs)):
+        for cold in (True, False):
+            previous = None
+            for size in args.sizes:
+                ms = measure(build(size), size, args.repeat, cold)
+                slope = (
+                    f"{math.log(ms / previous[1]) / math.log(size / previous[0]):.2f}"
+                    if previous
+                    else ""
+                )
+                previous = (size, ms)
+                cache = "cold" if cold else "warm"
+                print(f"{size:>6} {shape:>10} {cache:>5} {ms:>10.2f} {slope:>6}")
+
+
+if __name__ == "__main__":
+    main()
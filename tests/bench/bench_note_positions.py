@@ -0,0 +1,145 @@
+# SPDX-License-Identifier: MIT
+#
+# MIT License
+#
+# Copyright (c) 2026 Ericsson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""Benchmark: sequence note positions, per-note rescans against one pass.
+
+Builds a synthetic protocol trace (a message and a note per step, and the
+note paths PlantUML draws for it) of increasing size, then times two ways
+to pair every drawn note with its puml line:
+
+- ``rescan``: split the puml and walk it from the top for every note, as
+  ``extract_note_positions`` did before the line tables
+- ``merged``: ``extract_note_positions()`` with cold line tables (one
+  classifying pass, then the notes zipped with the drawn paths)
+
+The exponent column is the growth of the time between two sizes as a
+power of the growth in notes: about 2 for the rescans, 1 for one pass.
+
+Run from the repository root::
+
+    python -m tests.bench.bench_note_positions [--sizes 100 500 2000] [--repeat 5]
+"""
+
+import argparse
+import math
+import time
+
+from plantuml_gui.sequence import lexer
+from plantuml_gui.sequence.util import extract_note_positions
+from plantuml_gui.shared.svg_scan import scan_svg
+
+NOTE_FILL = "#FEFFDD"
+
+
+def trace(notes: int) -> tuple[str, str]:
+    """Return the puml and SVG fragment of ``notes`` message and note steps."""
+    lines = ["@startuml", "participant alice", "participant bob"]
+    parts = []
+    for i in range(notes):
+        lines.append(f"alice -> bob: request {i}")
+        lines.append(f"note over alice : step {i}")
+        y = 80 + i * 60
+        parts.append(
+            f'<line style="stroke:#181818;stroke-width:1.0;" x1="30" x2="120" '
+            f'y1="{y}" y2="{y}"></line>'
+            f'<path d="M10,{y + 10} L60,{y + 10} L60,{y + 40} L10,{y + 40} '
+            f'L10,{y + 10}" fill="{NOTE_FILL}"></path>'
+            f'<path d="M50,{y + 10} L50,{y + 20} L60,{y + 20}" '
+            f'fill="{NOTE_FILL}"></path>'
+            f'<text x="15" y="{y + 28}">step {i}</text>'
+        )
+    lines.append("@enduml")
+    return "\n".join(lines), "".join(parts)
+
+
+def rescan_positions(svg: str, puml: str) -> list[tuple[float, int]]:
+    def note_line(ordinal: int) -> int:
+        count = 0
+        for i, line in enumerate(puml.splitlines()):
+            if line.strip().startswith("note "):
+                count += 1
+                if count == ordinal:
+                    return i
+        return -1
+
+    paths = [element for element in scan_svg(svg) if element.tag == "path"]
+    positions = []
+    i = 0
+    while i < len(paths):
+        if paths[i].attrs.get("fill") == NOTE_FILL and (
+            i + 1 < len(paths) and paths[i + 1].attrs.get("fill") == NOTE_FILL
+        ):
+            cy = float(paths[i].attrs["d"].split(",")[1].split(" ")[0])
+            positions.append((cy, note_line(len(positions) + 1)))
+            i += 2
+        else:
+            i += 1
+    return positions
+
+
+def merged_positions(svg: str, puml: str) -> list[tuple[float, int]]:
+    lexer._cache.clear()
+    return extract_note_positions(svg, puml)
+
+
+def measure(function, svg: str, puml: str, repeat: int) -> float:
+    """Return the best wall time of ``repeat`` runs in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(svg, puml)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 500, 2000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    implementations = {"rescan": rescan_positions, "merged": merged_positions}
+    previous: dict[str, tuple[int, float]] = {}
+    print(f"{'notes':>6} {'method':>8} {'best ms':>10} {'speedup':>8} {'exponent':>9}")
+    for size in args.sizes:
+        puml, svg = trace(size)
+        expected = rescan_positions(svg, puml)
+        baseline = None
+        for name, function in implementations.items():
+            assert function(svg, puml) == expected, name
+            ms = measure(function, svg, puml, args.repeat)
+            baseline = baseline or ms
+            exponent = ""
+            if name in previous:
+                size0, ms0 = previous[name]
+                exponent = f"{math.log(ms / ms0) / math.log(size / size0):.2f}"
+            previous[name] = size, ms
+            print(
+                f"{size:>6} {name:>8} {ms:>10.1f} {baseline / ms:>7.1f}x {exponent:>9}"
+            )
+
+
+if __name__ == "__main__":
+    main()
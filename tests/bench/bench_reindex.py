@@ -0,0 +1,117 @@
+# SPDX-License-Identifier: MIT
+#
+# MIT License
+#
+# Copyright (c) 2026 Ericsson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""Benchmark: re-indexing the structure of an edited activity diagram.
+
+Times the structure of a diagram of sequential if/else, repeat and while
+blocks after an activity inside a block was renamed, or had another
+inserted after it, near the start, the middle or the end of the puml:
+
+- ``full``: ``build_structure()`` scans the edited puml from scratch
+- ``edit``: ``edited_structure()`` patches the cached structure of the puml
+  before the edit, re-scanning only the block around the changed line
+
+An insert moves every block after it, so ``edit`` still grows with the
+number of lines after the edit, but far more slowly than a full scan.
+
+Run from the repository root::
+
+    python -m tests.bench.bench_reindex [--sizes 1000 10000 50000] [--repeat 5]
+"""
+
+import argparse
+import time
+
+from plantuml_gui.activity import structure
+from plantuml_gui.activity.structure import (
+    activity_structure,
+    build_structure,
+    edited_structure,
+)
+
+BLOCKS = (
+    "if (condition {i}) then (yes)\n:step {i};\nelse (no)\n:other;\nendif",
+    "repeat\n:step {i};\nrepeat while (again {i}?)",
+    "while (loop {i})\n:step {i};\nendwhile",
+)
+
+
+def diagram(size: int) -> list[str]:
+    """Return a puml of about ``size`` lines of sequential blocks."""
+    body: list[str] = []
+    while len(body) < size:
+        body.extend(BLOCKS[len(body) % 3].format(i=len(body)).splitlines())
+    return ["@startuml", *body, "@enduml"]
+
+
+def edit(lines: list[str], at: float, change: str) -> list[str]:
+    """Rename, or insert after, the first activity from fraction ``at`` on."""
+    index = next(
+        i for i in range(int(len(lines) * at), len(lines)) if lines[i].startswith(":")
+    )
+    kept = lines[index : index + 1] if change == "insert" else []
+    return [*lines[:index], *kept, ":edited;", *lines[index + 1 :]]
+
+
+def measure(lines: list[str], edited: list[str], repeat: int, patch: bool) -> float:
+    """Return the best wall time of ``repeat`` re-indexes in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        structure._cache.clear()
+        activity_structure(lines)
+        start = time.perf_counter()
+        if patch:
+            edited_structure(lines, edited)
+        else:
+            build_structure(edited)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(
+        f"{'lines':>6} {'change':>6} {'at':>4} {'full ms':>10} {'edit ms':>10} "
+        f"{'speedup':>8}"
+    )
+    for size in args.sizes:
+        lines = diagram(size)
+        for change in ("rename", "insert"):
+            for at in (0.1, 0.5, 0.9):
+                edited = edit(lines, at, change)
+                full = measure(lines, edited, args.repeat, patch=False)
+                patched = measure(lines, edited, args.repeat, patch=True)
+                print(
+                    f"{size:>6} {change:>6} {at:>4.0%} {full:>10.2f} {patched:>10.2f} "
+                    f"{full / patched:>7.1f}x"
+                )
+
+
+if __name__ == "__main__":
+    main()
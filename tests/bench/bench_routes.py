@@ -0,0 +1,434 @@
+# SPDX-License-Identifier: MIT
+#
+# MIT License
+#
+# Copyright (c) 2026 Ericsson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""Benchmark: the editor's routes end to end, over growing diagrams.
+
+Drives ``app.test_client()`` through ``/render`` and the activity and
+sequence element routes with requests shaped like the frontend's (a click
+on a shape near the middle of the diagram), for diagrams of 10 to 10,000
+elements from ``tests.bench.generate``: activity shapes, or sequence
+messages. Each route reports its p50 and p95 wall time per size and a
+scaling exponent, the slope of log(p50) over log(size): about 1 for work
+linear in the diagram, 2 for quadratic.
+
+``--renderer stub`` (the default) answers ``/render`` with
+``tests.bench.stub_render`` instead of PlantUML, so the suite runs offline
+and times the app alone; ``--renderer jar`` renders with the configured
+PlantUML jar. Element routes never render, so only ``/render`` differs.
+
+Requests run on warm caches, as clicks on a rendered diagram do; ``--cold``
+clears the content caches (SVG index, structure, sequence lines, label
+counters) before every request instead.
+
+``--baseline-out`` writes the results as JSON and ``--compare`` prints each
+p50 against such a file, to check optimization work before and after.
+
+Run from the repository root::
+
+    python -m tests.bench.bench_routes [--sizes 10 100 1000 10000] [--repeat 5]
+        [--seed 0] [--routes render delIf] [--cold] [--renderer stub|jar]
+        [--baseline-out bench.json] [--compare bench.json]
+"""
+
+import argparse
+import json
+import math
+import platform
+import time
+from dataclasses import dataclass, field
+from functools import cached_property
+from html import escape
+from typing import Any, Callable
+
+from plantuml_gui.activity import structure, svg_index
+from plantuml_gui.activity.classes import PathElement, PolyElement, RectElement
+from plantuml_gui.activity.element_map import Shape, activity_shapes
+from plantuml_gui.activity.structure import activity_structure
+from plantuml_gui.app import app
+from plantuml_gui.sequence import lexer
+from plantuml_gui.sequence.classes import Diagram, is_participant_rect
+from plantuml_gui.shared import routes as shared_routes
+from plantuml_gui.shared.svg_fragment import svg_fragment
+from plantuml_gui.shared.svg_scan import SvgElement, scan_svg
+
+from .generate import activity_diagram, sequence_diagram
+from .stub_render import ACTIVATION_STYLE, stub_svg
+
+
+def markup(element: SvgElement) -> str:
+    """Return ``element`` as the outerHTML the frontend posts for a click."""
+    attrs = "".join(
+        f' {name}="{escape(value)}"' for name, value in element.attrs.items()
+    )
+    return f"<{element.tag}{attrs}></{element.tag}>"
+
+
+def shape_markup(shape: Shape) -> str:
+    if isinstance(shape, RectElement):
+        return f'<rect x="{shape.x}" y="{shape.y}"></rect>'
+    if isinstance(shape, PolyElement):
+        return f'<polygon points="{shape.points}"></polygon>'
+    if isinstance(shape, PathElement):
+        return f'<path d="{shape.d}"></path>'
+    return f'<ellipse cx="{shape.cx}" cy="{shape.cy}"></ellipse>'
+
+
+@dataclass
+class Fixture:
+    """One diagram and the shapes the benchmarked clicks land on."""
+
+    diagram: str
+    puml: str
+    svg: str = field(init=False)
+
+    def __post_init__(self):
+        self.svg = svg_fragment(stub_svg(self.puml))
+
+    @cached_property
+    def shapes(self) -> dict[str, list[tuple[str, str]]]:
+        """Markup and first puml line of every shape, by kind."""
+        lines = self.puml.splitlines()
+        statements = activity_structure(lines).statements
+        by_kind: dict[str, list[tuple[str, str]]] = {}
+        for kind, ordinal, shape in activity_shapes(self.svg):
+            line = lines[statements[ordinal - 1]].strip() if kind == "if" else ""
+            by_kind.setdefault(kind, []).append((shape_markup(shape), line))
+        return by_kind
+
+    def pick(self, kind: str, offset: int = 0, line: str = "") -> str:
+        """Markup of the shape of ``kind`` nearest the middle of the diagram.
+
+        ``line`` narrows the shapes to those whose puml line starts with it
+        (``"if"`` among the if/repeat/switch diamonds, say). Raises
+        IndexError when the diagram draws no such shape.
+        """
+        shapes = [m for m, first in self.shapes.get(kind, []) if first.startswith(line)]
+        return shapes[min(len(shapes) // 2 + offset, len(shapes) - 1)]
+
+    @cached_property
+    def elements(self) -> list[SvgElement]:
+        return [element for element in scan_svg(self.svg) if element.tag]
+
+    @cached_property
+    def sequence(self) -> Diagram:
+        return Diagram.from_svg(self.svg, self.puml)
+
+    def middle(self, items: list) -> Any:
+        return items[len(items) // 2]
+
+    def participant(self) -> str:
+        rects = [e for e in self.elements if e.tag == "rect" and is_participant_rect(e)]
+        return markup(self.middle(rects))
+
+    def message(self) -> str:
+        cy = str(self.middle(self.sequence.messages).cy).removesuffix(".0")
+        lines = [
+            e
+            for e in self.elements
+            if e.tag == "line"
+            and e.attrs.get("style") == ACTIVATION_STYLE
+            and e.attrs["y1"] == cy
+        ]
+        return markup(lines[0])
+
+    def activation(self) -> str:
+        bars = [
+            e
+            for e in self.elements
+            if e.tag == "rect" and e.attrs.get("style") == ACTIVATION_STYLE
+        ]
+        return markup(self.middle(bars))
+
+    def note(self) -> str:
+        notes = [
+            e
+            for e in self.elements
+            if e.tag == "path"
+            and e.attrs.get("fill") == "#FEFFDD"
+            and e.next is not None
+            and e.next.tag == "path"
+        ]
+        return markup(self.middle(notes))
+
+
+@dataclass
+class Case:
+    """A route and the request body it is timed with on a fixture."""
+
+    diagram: str
+    route: str
+    body: Callable[[Fixture], dict[str, Any]]
+
+    @property
+    def name(self) -> str:
+        return f"{self.diagram} {self.route}"
+
+
+def click(
+    kind: str, line: str = "", **fields: Any
+) -> Callable[[Fixture], dict[str, Any]]:
+    """A body clicking the middle shape of ``kind`` with extra ``fields``."""
+    return lambda f: {
+        "plantuml": f.puml,
+        "svg": f.svg,
+        "svgelement": f.pick(kind, line=line),
+        **fields,
+    }
+
+
+def render(diagram: str) -> Callable[[Fixture], dict[str, Any]]:
+    extra = {"diagram": "activity"} if diagram == "activity" else {}
+    return lambda f: {"plantuml": f.puml, "document": f"bench-{diagram}", **extra}
+
+
+def sequence_click(
+    target: Callable[[Fixture], str], **fields: Any
+) -> Callable[[Fixture], dict[str, Any]]:
+    return lambda f: {
+        "plantuml": f.puml,
+        "svg": f.svg,
+        "svgelement": target(f),
+        **fields,
+    }
+
+
+def batch(f: Fixture) -> dict[str, Any]:
+    return {
+        "plantuml": f.puml,
+        "svg": f.svg,
+        "operations": [
+            {
+                "endpoint": "editText",
+                "svgelement": f.pick("activity", k),
+                "newname": "Edited",
+            }
+            for k in range(3)
+        ],
+    }
+
+
+def add_message(f: Fixture) -> dict[str, Any]:
+    first, second = f.sequence.participants[:2]
+    y = f.middle(f.sequence.messages).cy + 5
+    return {
+        "plantuml": f.puml,
+        "svg": f.svg,
+        "message": "Added",
+        "firstcoordinates": [first.cx, y],
+        "secondcoordinates": [second.cx, y],
+    }
+
+
+def add_activation(f: Fixture) -> dict[str, Any]:
+    messages = f.sequence.messages
+    start = len(messages) // 2
+    return {
+        "plantuml": f.puml,
+        "participant": messages[start].to_participant.name,
+        "startMessageIndex": messages[start].index,
+        "endMessageIndex": messages[min(start + 2, len(messages) - 1)].index,
+        "endType": "deactivate",
+    }
+
+
+def add_note(f: Fixture) -> dict[str, Any]:
+    message = f.middle(f.sequence.messages)
+    return {
+        "plantuml": f.puml,
+        "svg": f.svg,
+        "participant": message.from_participant.name,
+        "placement": "over",
+        "text": "Added",
+        "yPosition": message.cy + 20,
+    }
+
+
+def positions(f: Fixture) -> dict[str, Any]:
+    return {"plantuml": f.puml, "svg": f.svg}
+
+
+CASES = [
+    Case("activity", "render", render("activity")),
+    Case("activity", "getText", click("activity")),
+    Case("activity", "editText", click("activity", newname="Edited")),
+    Case("activity", "deleteActivity", click("activity")),
+    Case("activity", "addToActivity", click("activity", type="activity")),
+    Case("activity", "addNoteActivity", click("activity")),
+    Case("activity", "getTextPoly", click("if", "if")),
+    Case(
+        "activity",
+        "editTextIf",
+        click("if", "if", statement="Edited", branch1="yes", branch2="no"),
+    ),
+    Case("activity", "delIf", click("if", "if")),
+    Case("activity", "addToIf", click("if", "if", where="left", type="activity")),
+    Case("activity", "getTextWhile", click("while")),
+    Case("activity", "delWhile", click("while")),
+    Case("activity", "deleteEllipse", click("ellipse")),
+    Case("activity", "addToEllipse", click("ellipse", where="below", type="activity")),
+    Case("activity", "deleteFork", click("fork")),
+    Case("activity", "getNoteText", click("note")),
+    Case("activity", "editNote", click("note", text="Edited")),
+    Case("activity", "deleteNote", click("note")),
+    Case("activity", "getGroupText", click("group")),
+    Case("activity", "deleteGroup", click("group")),
+    Case("activity", "getMergeLine", click("merge")),
+    Case("activity", "getCharConnector", click("connector")),
+    Case("activity", "addTitle", lambda f: {"plantuml": f.puml}),
+    Case("activity", "batch", batch),
+    Case("sequence", "render", render("sequence")),
+    Case("sequence", "getParticipantName", sequence_click(Fixture.participant)),
+    Case(
+        "sequence",
+        "editParticipantName",
+        sequence_click(Fixture.participant, name="Renamed"),
+    ),
+    Case(
+        "sequence",
+        "addParticipant",
+        sequence_click(Fixture.participant, direction="right"),
+    ),
+    Case("sequence", "deleteParticipant", sequence_click(Fixture.participant)),
+    Case("sequence", "getParticipantPositions", positions),
+    Case("sequence", "getMessageText", sequence_click(Fixture.message)),
+    Case("sequence", "editMessageText", sequence_click(Fixture.message, text="Edited")),
+    Case("sequence", "deleteMessage", sequence_click(Fixture.message)),
+    Case("sequence", "addMessage", add_message),
+    Case("sequence", "getMessagePositions", positions),
+    Case("sequence", "addActivation", add_activation),
+    Case("sequence", "deleteActivation", sequence_click(Fixture.activation)),
+    Case("sequence", "addNote", add_note),
+    Case("sequence", "getSeqNoteText", sequence_click(Fixture.note)),
+    Case("sequence", "editSeqNote", sequence_click(Fixture.note, text="Edited")),
+    Case("sequence", "deleteSeqNote", sequence_click(Fixture.note)),
+]
+
+
+def clear_caches() -> None:
+    """Forget every content-keyed table, as a fresh worker would have."""
+    for module in (svg_index, structure, lexer):
+        with module._cache_lock:
+            module._cache.clear()
+
+
+def percentile(times: list[float], q: float) -> float:
+    """Return the nearest-rank ``q`` percentile of ``times``."""
+    ordered = sorted(times)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def measure(
+    client, case: Case, body: dict[str, Any], repeat: int, cold: bool
+) -> list[float]:
+    """Return the wall time of ``repeat`` requests in milliseconds."""
+    response = client.post(f"/{case.route}", json=body)  # warm-up, and a check
+    assert response.status_code == 200, (case.name, response.status_code)
+    times = []
+    for _ in range(repeat):
+        if cold:
+            clear_caches()
+        start = time.perf_counter()
+        client.post(f"/{case.route}", json=body)
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def exponent(sizes: list[int], p50s: list[float]) -> float | None:
+    """Least-squares slope of log(p50) over log(size)."""
+    if len(sizes) < 2:
+        return None
+    xs = [math.log(size) for size in sizes]
+    ys = [math.log(max(p50, 1e-6)) for p50 in p50s]
+    mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+    spread = sum((x - mean_x) ** 2 for x in xs)
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / spread
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--routes", nargs="+", help="only these routes")
+    parser.add_argument("--cold", action="store_true")
+    parser.add_argument("--renderer", choices=("stub", "jar"), default="stub")
+    parser.add_argument("--baseline-out", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="print p50 ratios against this JSON file")
+    args = parser.parse_args()
+
+    if args.renderer == "stub":
+        shared_routes._create_svg_from_uml = stub_svg
+    cases = [c for c in CASES if not args.routes or c.route in args.routes]
+    builders = {"activity": activity_diagram, "sequence": sequence_diagram}
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)["routes"]
+
+    client = app.test_client()
+    results: dict[str, dict[str, Any]] = {}
+    header = f"{'route':>32} {'size':>6} {'p50 ms':>9} {'p95 ms':>9}"
+    print(header + (f" {'vs base':>8}" if baseline else ""))
+    for case in cases:
+        sizes: dict[str, dict[str, float]] = {}
+        for size in args.sizes:
+            fixture = Fixture(case.diagram, builders[case.diagram](size, args.seed))
+            try:
+                body = case.body(fixture)
+            except IndexError:
+                print(f"{case.name:>32} {size:>6} {'not drawn':>9}")
+                continue
+            times = measure(client, case, body, args.repeat, args.cold)
+            p50, p95 = percentile(times, 50), percentile(times, 95)
+            sizes[str(size)] = {"p50": p50, "p95": p95}
+            line = f"{case.name:>32} {size:>6} {p50:>9.2f} {p95:>9.2f}"
+            before = (baseline or {}).get(case.name, {}).get("sizes", {}).get(str(size))
+            if before:
+                line += f" {p50 / before['p50']:>7.2f}x"
+            print(line)
+        measured = [size for size in args.sizes if str(size) in sizes]
+        slope = exponent(measured, [sizes[str(size)]["p50"] for size in measured])
+        results[case.name] = {"sizes": sizes, "exponent": slope}
+        if slope is not None:
+            print(f"{case.name:>32} {'n^':>6} {slope:>9.2f}")
+
+    if args.baseline_out:
+        with open(args.baseline_out, "w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "renderer": args.renderer,
+                    "cold": args.cold,
+                    "repeat": args.repeat,
+                    "seed": args.seed,
+                    "python": platform.python_version(),
+                    "routes": results,
+                },
+                file,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+# SPDX-License-Identifier: MIT
+#
+# MIT License
+#
+# Copyright (c) 2026 Ericsson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Benchmark: streaming SVG scan against the former PyQuery chunk building.
+
+Builds a synthetic activity diagram fragment (the ``<g>`` inner HTML the
+browser posts) of increasing size, then times the three ways to turn it
+into activity chunks:
+
+- ``pyquery``: parse with PyQuery and reserialize every rect to build its
+  ``RectElement``, as the element modules did before the SVG index
+- ``scan``: iterate ``scan_svg()`` and build the chunks from its elements
+- ``index``: ``svgtochunklist()`` on a cold SVG index (scan + index build)
+
+Run from the repository root::
+
+    python -m tests.bench.bench_svg_scan [--sizes 100 1000 5000] [--repeat 5]
+"""
+
+import argparse
+import time
+
+from pyquery import PyQuery as Pq
+
+from plantuml_gui.activity import svg_index
+from plantuml_gui.activity.activity import svgtochunklist
+from plantuml_gui.activity.classes import RectElement, SvgChunk, TextElement
+from plantuml_gui.shared.svg_scan import scan_svg
+
+ACTIVITY_STYLE = "stroke:#181818;stroke-width:0.5;"
+
+
+def activity_fragment(activities: int) -> str:
+    """Return a column of ``activities`` boxes joined by arrows."""
+    parts = []
+    for i in range(activities):
+        y = 50 + i * 54
+        parts.append(
+            f'<rect fill="#F1F1F1" height="33.9688" rx="12.5" ry="12.5" '
+            f'style="{ACTIVITY_STYLE}" width="63" x="74.5" y="{y}"></rect>'
+            f'<text fill="#000000" font-family="sans-serif" font-size="12" '
+            f'lengthAdjust="spacing" textLength="43" x="84.5" y="{y + 21}">'
+            f"Activity {i}</text>"
+            f'<line style="stroke:#181818;stroke-width:1.0;" x1="106" x2="106" '
+            f'y1="{y + 34}" y2="{y + 54}"></line>'
+            f'<polygon fill="#181818" points="102,{y + 44},106,{y + 54},110,'
+            f'{y + 44},106,{y + 48}" style="stroke:#181818;stroke-width:1.0;">'
+            f"</polygon>"
+        )
+    return "".join(parts)
+
+
+def pyquery_chunks(svg: str) -> list[SvgChunk]:
+    chunks = []
+    for rect in Pq(svg)("rect"):
+        if float(rect.get("height")) > 6 and rect.get("style") == ACTIVITY_STYLE:
+            rect = Pq(rect)
+            rect_obj = RectElement.from_svg(str(rect)[:-2] + "></rect>")
+            texts = []
+            next_elem = rect.next()
+            while next_elem and next_elem[0].tag == "text":
+                texts.append(
+                    TextElement(
+                        next_elem.text(),
+                        float(next_elem.attr("x")),
+                        float(next_elem.attr("y")),
+                    )
+                )
+                next_elem = next_elem.next()
+            chunks.append(SvgChunk(object=rect_obj, text_elements=texts))
+    return chunks
+
+
+def scan_chunks(svg: str) -> list[SvgChunk]:
+    chunks = []
+    elements = list(scan_svg(svg))
+    for element in elements:
+        if (
+            element.tag == "rect"
+            and element.number("height") > 6
+            and element.attrs.get("style") == ACTIVITY_STYLE
+        ):
+            texts = []
+            sibling = element.next
+            while sibling is not None and sibling.tag == "text":
+                texts.append(
+                    TextElement(sibling.text, sibling.number("x"), sibling.number("y"))
+                )
+                sibling = sibling.next
+            rect = RectElement(element.number("x"), element.number("y"))
+            chunks.append(SvgChunk(object=rect, text_elements=texts))
+    return chunks
+
+
+def index_chunks(svg: str) -> list[SvgChunk]:
+    svg_index._cache.clear()
+    return svgtochunklist(svg)
+
+
+def measure(function, svg: str, repeat: int) -> float:
+    """Return the best wall time of ``repeat`` runs in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(svg)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    implementations = {
+        "pyquery": pyquery_chunks,
+        "scan": scan_chunks,
+        "index": index_chunks,
+    }
+    print(f"{'activities':>10} {'method':>8} {'best ms':>10} {'speedup':>8}")
+    for size in args.sizes:
+        svg = activity_fragment(size)
+        expected = pyquery_chunks(svg)
+        baseline = None
+        for name, function in implementations.items():
+            assert function(svg) == expected, name
+            ms = measure(function, svg, args.repeat)
+            baseline = baseline or ms
+            print(f"{size:>10} {name:>8} {ms:>10.1f} {baseline / ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+# SPDX-License-Identifier: MIT
+#
+# MIT License
+#
+# Copyright (c) 2026 Ericsson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""Seeded generator of large activity and sequence diagrams.
+
+The same kind, size and seed always give the same puml, so benchmarks and
+stress tests can share inputs without hand-written fixtures:
+
+- ``activity_diagram()`` writes a flow of nested if/switch/repeat/while,
+  fork, group and note blocks, sized by the number of shapes it draws
+- ``sequence_diagram()`` writes a trace between declared participants with
+  self messages, attached and standalone notes and nested activation bars
+
+``write_fixture()`` saves a diagram with its rendered SVG, rendered by
+``tests.bench.stub_render`` or, with ``renderer="jar"``, by PlantUML.
+
+Run from the repository root::
+
+    python -m tests.bench.generate activity --size 5000 [--seed 0]
+        [--renderer stub|jar] [--out tests/bench/fixtures]
+    python -m tests.bench.generate sequence --size 20000 --participants 200
+"""
+
+import argparse
+import random
+from pathlib import Path
+
+from .stub_render import stub_svg
+
+FIXTURES = Path(__file__).parent / "fixtures"
+MAX_DEPTH = 6  # deepest block nesting in generated activity diagrams
+
+# Activity blocks and how often the generator picks each one.
+BLOCK_WEIGHTS = {
+    "activity": 8,
+    "note": 2,
+    "if": 3,
+    "switch": 1,
+    "repeat": 1,
+    "while": 1,
+    "fork": 1,
+    "group": 1,
+    "connector": 1,
+}
+
+
+class _ActivityWriter:
+    """Appends random blocks to ``lines`` until a shape budget is spent."""
+
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+        self.lines: list[str] = []
+        self.count = 0  # numbers every label, so each line is distinct
+
+    def label(self, prefix: str) -> str:
+        self.count += 1
+        return f"{prefix} {self.count}"
+
+    def steps(self, budget: int, depth: int) -> int:
+        """Write blocks drawing about ``budget`` shapes; return how many."""
+        kinds = list(BLOCK_WEIGHTS)
+        weights = list(BLOCK_WEIGHTS.values())
+        drawn = 0
+        while drawn < budget:
+            kind = "activity"
+            if depth < MAX_DEPTH and budget - drawn >= 4:
+                kind = self.rng.choices(kinds, weights)[0]
+            drawn += getattr(self, f"_{kind}")(budget - drawn, depth)
+        return drawn
+
+    def _split(self, budget: int, parts: int) -> list[int]:
+        """Share part of ``budget`` out among ``parts`` nested blocks."""
+        inner = self.rng.randint(parts, max(parts, (budget - 2) // 2))
+        shares = [1] * parts
+        for _ in range(inner - parts):
+            shares[self.rng.randrange(parts)] += 1
+        return shares
+
+    def _activity(self, budget: int, depth: int) -> int:
+        self.lines.append(f":{self.label('Step')};")
+        return 1
+
+    def _note(self, budget: int, depth: int) -> int:
+        side = self.rng.choice(("left", "right"))
+        self.lines.extend(
+            [f":{self.label('Step')};", f"note {side}", self.label("Note"), "end note"]
+        )
+        return 2
+
+    def _if(self, budget: int, depth: int) -> int:
+        yes, no = self._split(budget, 2)
+        self.lines.append(f"if ({self.label('Condition')}?) then (yes)")
+        drawn = self.steps(yes, depth + 1)
+        self.lines.append("else (no)")
+        drawn += self.steps(no, depth + 1)
+        self.lines.append("endif")
+        return drawn + 2  # the diamond and its merge
+
+    def _switch(self, budget: int, depth: int) -> int:
+        shares = self._split(budget, self.rng.randint(2, 4))
+        self.lines.append(f"switch ({self.label('Switch')})")
+        drawn = 2  # the diamond and its merge
+        for case, share in enumerate(shares, 1):
+            self.lines.append(f"case ({case})")
+            drawn += self.steps(share, depth + 1)
+        self.lines.append("endswitch")
+        return drawn
+
+    def _repeat(self, budget: int, depth: int) -> int:
+        (body,) = self._split(budget, 1)
+        self.lines.append("repeat")
+        drawn = self.steps(body, depth + 1)
+        backward = self.rng.random() < 0.3
+        if backward:
+            self.lines.append(f"backward :{self.label('Back')};")
+        self.lines.append(f"repeat while ({self.label('More')}?)")
+        return drawn + 2 + backward
+
+    def _while(self, budget: int, depth: int) -> int:
+        (body,) = self._split(budget, 1)
+        self.lines.append(f"while ({self.label('Loop')}?)")
+        drawn = self.steps(body, depth + 1)
+        self.lines.append("endwhile")
+        return drawn + 1
+
+    def _fork(self, budget: int, depth: int) -> int:
+        shares = self._split(budget, self.rng.randint(2, 3))
+        self.lines.append("fork")
+        drawn = 2  # the two bars
+        for i, share in enumerate(shares):
+            if i:
+                self.lines.append("fork again")
+            drawn += self.steps(share, depth + 1)
+        self.lines.append("end fork")
+        return drawn
+
+    def _group(self, budget: int, depth: int) -> int:
+        (body,) = self._split(budget, 1)
+        self.lines.append(f"group {self.label('Group')}")
+        drawn = self.steps(body, depth + 1)
+        self.lines.append("end group")
+        return drawn + 1
+
+    def _connector(self, budget: int, depth: int) -> int:
+        self.lines.append(f"({self.rng.choice('ABCDE')})")
+        return 1
+
+
+def activity_diagram(size: int, seed: int = 0) -> str:
+    """Return an activity diagram drawing about ``size`` shapes."""
+    writer = _ActivityWriter(random.Random(seed))
+    writer.steps(max(size - 2, 1), 0)  # start and stop take two
+    return "\n".join(["@startuml", "start", *writer.lines, "stop", "@enduml"])
+
+
+def sequence_diagram(size: int, seed: int = 0, participants: int = 0) -> str:
+    """Return a sequence diagram of ``size`` messages.
+
+    ``participants`` defaults to one per hundred messages, between 2 and
+    200. About one message in ten gets a note, attached to it or over a
+    participant, and activation bars open and close on message targets,
+    nested up to three deep on one lifeline.
+    """
+    rng = random.Random(seed)
+    count = participants or min(max(size // 100, 2), 200)
+    names = [f"P{i}" for i in range(count)]
+    lines = ["@startuml", *(f"participant {name}" for name in names)]
+    open_bars: dict[str, int] = {}
+    for k in range(size):
+        source = rng.choice(names)
+        target = source if rng.random() < 0.05 else rng.choice(names)
+        arrow = rng.choice(("->", "->", "-->"))
+        lines.append(f"{source} {arrow} {target}: Message {k}")
+        roll = rng.random()
+        if roll < 0.07:
+            lines.append(f"note {rng.choice(('left', 'right'))}: Note {k}")
+        elif roll < 0.1:
+            lines.append(f"note over {rng.choice(names)}: Note {k}")
+        roll = rng.random()
+        if roll < 0.08 and open_bars.get(target, 0) < 3:
+            lines.append(f"activate {target}")
+            open_bars[target] = open_bars.get(target, 0) + 1
+        elif roll < 0.16 and open_bars:
+            name = rng.choice(sorted(open_bars))
+            lines.append(f"deactivate {name}")
+            open_bars[name] -= 1
+            if not open_bars[name]:
+                del open_bars[name]
+    for name, depth in sorted(open_bars.items()):
+        lines.extend([f"deactivate {name}"] * depth)
+    lines.append("@enduml")
+    return "\n".join(lines)
+
+
+def render(puml: str, renderer: str = "stub") -> str:
+    """Return the SVG of ``puml`` from the stub renderer or PlantUML."""
+    if renderer == "jar":
+        from plantuml_gui.shared.render import _create_svg_from_uml
+
+        return _create_svg_from_uml(puml)
+    return stub_svg(puml)
+
+
+def write_fixture(
+    kind: str,
+    size: int,
+    seed: int = 0,
+    renderer: str = "stub",
+    directory: Path = FIXTURES,
+    participants: int = 0,
+) -> tuple[Path, Path]:
+    """Write ``<name>.puml`` and its rendered ``<name>.svg`` to ``directory``.
+
+    Files already there are kept, so a slow jar render is done once per
+    kind, size, seed and renderer.
+    """
+    name = f"{kind}-{size}-seed{seed}"
+    if kind == "sequence" and participants:
+        name += f"-p{participants}"
+    puml_path = directory / f"{name}.puml"
+    svg_path = directory / f"{name}-{renderer}.svg"
+    if kind == "activity":
+        puml = activity_diagram(size, seed)
+    else:
+        puml = sequence_diagram(size, seed, participants)
+    directory.mkdir(parents=True, exist_ok=True)
+    if not puml_path.exists():
+        puml_path.write_text(puml, encoding="utf-8")
+    if not svg_path.exists():
+        svg_path.write_text(render(puml, renderer), encoding="utf-8")
+    return puml_path, svg_path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("kind", choices=("activity", "sequence"))
+    parser.add_argument("--size", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--participants", type=int, default=0)
+    parser.add_argument("--renderer", choices=("stub", "jar"), default="stub")
+    parser.add_argument("--out", type=Path, default=FIXTURES)
+    args = parser.parse_args()
+
+    for path in write_fixture(
+        args.kind, args.size, args.seed, args.renderer, args.out, args.participants
+    ):
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+# SPDX-License-Identifier: MIT
+#
+# MIT License
+#
+# Copyright (c) 2026 Ericsson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""Offline stand-in for PlantUML: SVG the element parsers accept, without Java.
+
+The shapes are not laid out like PlantUML's, only drawn the way the parsers
+recognise them and in the per-kind order the app maps clicks with, so a
+route benchmark measures the app rather than the JVM:
+
+- activity diagrams draw one shape per entry of the structure's orders
+  (activity boxes, if/while diamonds, fork bars, notes, groups, merges,
+  start/stop ellipses and connectors); arrows are not drawn
+- sequence diagrams (a puml declaring participants) draw each participant,
+  lifeline, message, activation bar and note
+
+``stub_svg()`` returns a whole PlantUML-like SVG document.
+"""
+
+from bisect import bisect_left
+from html import escape
+
+from plantuml_gui.activity.structure import activity_structure
+from plantuml_gui.sequence.lexer import sequence_lines
+
+SHAPE_STYLE = "stroke:#181818;stroke-width:0.5;"
+GROUP_STYLE = "stroke:#000000;stroke-width:1.5;"
+ACTIVATION_STYLE = "stroke:#181818;stroke-width:1.0;"
+LIFELINE_STYLE = "stroke:#181818;stroke-width:0.5;stroke-dasharray:5.0,5.0;"
+ROW = 40  # vertical distance between shapes, so every shape is unique
+
+
+def stub_svg(puml: str) -> str:
+    """Return an SVG document drawing ``puml``'s clickable shapes."""
+    if sequence_lines(puml).participants:
+        body, width, height = _sequence(puml)
+    else:
+        body, width, height = _activity(puml)
+    return (
+        '<?xml version="1.0" encoding="us-ascii" standalone="no"?>'
+        '<svg xmlns="http://www.w3.org/2000/svg" '
+        'xmlns:xlink="http://www.w3.org/1999/xlink" '
+        f'height="{height}px" version="1.1" viewBox="0 0 {width} {height}" '
+        f'width="{width}px" zoomAndPan="magnify"><defs/><g>{body}</g></svg>'
+    )
+
+
+def _text(x: float, y: float, label: str) -> str:
+    return (
+        f'<text fill="#000000" font-family="sans-serif" font-size="12" '
+        f'x="{x}" y="{y}">{escape(label)}</text>'
+    )
+
+
+def _label(line: str) -> str:
+    """The text a line draws: its activity body or parenthesised condition."""
+    line = line.strip()
+    if line.startswith(":"):
+        return line[1:].rstrip(";") or " "
+    start, end = line.find("("), line.find(")")
+    return line[start + 1 : end] if 0 <= start < end else line or " "
+
+
+def _activity(puml: str) -> tuple[str, int, int]:
+    lines = puml.splitlines()
+    structure = activity_structure(lines)
+    parts: list[str] = []
+    y = 20
+
+    for line in structure.ellipses:
+        parts.append(
+            f'<ellipse cx="100" cy="{y}" fill="#222222" rx="10" ry="10" '
+            'style="stroke:#222222;stroke-width:1.0;"></ellipse>'
+        )
+        y += ROW
+    for line in structure.connectors:
+        parts.append(
+            f'<ellipse cx="100" cy="{y}" fill="#F1F1F1" rx="12" ry="12" '
+            f'style="{SHAPE_STYLE}"></ellipse>'
+            f'<path d="M96,{y - 4} L104,{y + 4} " fill="#000000"></path>'
+        )
+        y += ROW
+    for line in structure.activities:
+        if line < 0:
+            continue  # a repeat without a backward activity draws no box
+        parts.append(
+            f'<rect fill="#F1F1F1" height="33.9688" rx="12.5" ry="12.5" '
+            f'style="{SHAPE_STYLE}" width="120" x="40" y="{y}"></rect>'
+            + _text(50, y + 21, _label(lines[line]))
+        )
+        y += ROW
+    for line in structure.statements:
+        # The condition sits inside the diamond, so it is not a while.
+        parts.append(_diamond(y) + _text(70, y + 15, _label(lines[line])))
+        parts.append(_text(30, y + 8, "yes") + _text(162, y + 8, "no"))
+        y += ROW
+    for line in structure.whiles:
+        # The condition sits below the diamond and the exit label left of
+        # every point, the way PlantUML draws a while.
+        parts.append(_diamond(y) + _text(70, y + 40, _label(lines[line])))
+        parts.append(_text(110, y + 40, "loop") + _text(20, y + 8, "exit"))
+        y += ROW
+    for line in structure.fork_bars:
+        parts.append(
+            f'<rect fill="#555555" height="6" rx="2.5" ry="2.5" '
+            f'style="stroke:#555555;stroke-width:1.0;" width="120" '
+            f'x="40" y="{y}"></rect>'
+        )
+        y += ROW
+    for line in structure.notes:
+        parts.append(_note(200, y) + _text(206, y + 17, "note"))
+        y += ROW
+    for line in structure.groups:
+        parts.append(
+            f'<rect fill="none" height="30" style="{GROUP_STYLE}" width="160" '
+            f'x="20" y="{y}"></rect>'
+            f'<path d="M60,{y} L60,{y + 9} L50,{y + 19} L20,{y + 19} " '
+            f'fill="none" style="{GROUP_STYLE}"></path>'
+            + _text(23, y + 14, _label(lines[line]))
+        )
+        y += ROW
+    for line in structure.merges:
+        parts.append(
+            f'<polygon fill="#F1F1F1" points="100,{y},112,{y + 12},100,{y + 24},'
+            f'88,{y + 12},100,{y}" style="{SHAPE_STYLE}"></polygon>'
+        )
+        y += ROW
+    return "".join(parts), 300, y
+
+
+def _diamond(y: float) -> str:
+    """An if/while diamond: six distinct points between x 64 and 148."""
+    return (
+        f'<polygon fill="#F1F1F1" points="76,{y},136,{y},148,{y + 12},'
+        f'136,{y + 24},76,{y + 24},64,{y + 12},76,{y}" '
+        f'style="{SHAPE_STYLE}"></polygon>'
+    )
+
+
+def _note(x: float, y: float) -> str:
+    """A note's outline and folded corner, the two paths parsers pair."""
+    return (
+        f'<path d="M{x},{y} L{x},{y + 25} L{x + 80},{y + 25} L{x + 80},{y + 10} '
+        f'L{x + 70},{y} L{x},{y} " fill="#FEFFDD" style="{SHAPE_STYLE}"></path>'
+        f'<path d="M{x + 70},{y} L{x + 70},{y + 10} L{x + 80},{y + 10} '
+        f'L{x + 70},{y} " fill="#FEFFDD" style="{SHAPE_STYLE}"></path>'
+    )
+
+
+def _sequence(puml: str) -> tuple[str, int, int]:
+    lines = puml.splitlines()
+    tables = sequence_lines(puml)
+    names = [_participant_name(lines[index]) for index in tables.participants]
+    for message in tables.messages:
+        for name in (message.source, message.target):
+            if name and name not in names:
+                names.append(name)  # PlantUML adds undeclared participants
+    centre = {name: 70 + 120 * i for i, name in enumerate(names)}
+
+    # One row per message and note, in puml order.
+    rows: dict[int, int] = {}
+    y = 70
+    for index in sorted([m.index for m in tables.messages] + list(tables.notes)):
+        rows[index] = y
+        y += ROW
+    bottom = y
+
+    messages: list[str] = []
+    for message in tables.messages:
+        cy = rows[message.index]
+        source = centre.get(message.source, 70)
+        target = centre.get(message.target, 70)
+        label = _text(min(source, target) + 5, cy - 5, lines[message.index])
+        if source == target:
+            messages.append(
+                f'<line style="{ACTIVATION_STYLE}" x1="{source}" x2="{source + 40}" '
+                f'y1="{cy}" y2="{cy}"></line>'
+                f'<line style="{ACTIVATION_STYLE}" x1="{source + 40}" '
+                f'x2="{source + 40}" y1="{cy}" y2="{cy + 13}"></line>'
+                f'<line style="{ACTIVATION_STYLE}" x1="{source}" x2="{source + 40}" '
+                f'y1="{cy + 13}" y2="{cy + 13}"></line>'
+                + _arrowhead(source, cy + 13, -1)
+                + label
+            )
+            continue
+        direction = 1 if target > source else -1
+        messages.append(
+            _arrowhead(target, cy, direction)
+            + f'<line style="{ACTIVATION_STYLE}" x1="{source}" x2="{target}" '
+            f'y1="{cy}" y2="{cy}"></line>' + label
+        )
+
+    message_lines = sorted(m.index for m in tables.messages)
+    bars: list[str] = []
+    for name, pairs in tables.activations.items():
+        for activate, close, level in pairs:
+            # Drawn from the message above the activate line, as the routes
+            # expect, down to the last message before the close.
+            above = bisect_left(message_lines, activate)
+            below = bisect_left(message_lines, close)
+            if not above or name not in centre:
+                continue
+            top = rows[message_lines[above - 1]]
+            height = max(rows[message_lines[below - 1]] - top, 10)
+            x = centre[name] - 5 + level * 5
+            bars.append(
+                f'<rect fill="#FFFFFF" height="{height}" '
+                f'style="{ACTIVATION_STYLE}" width="10" x="{x}" y="{top}"></rect>'
+            )
+
+    headers: list[str] = []
+    lifelines: list[str] = []
+    for name, cx in centre.items():
+        lifelines.append(
+            f'<line style="{LIFELINE_STYLE}" x1="{cx}" x2="{cx}" '
+            f'y1="40" y2="{bottom}"></line>'
+        )
+        for top in (10, bottom):
+            headers.append(
+                f'<rect fill="#E2E2F0" height="30" rx="2.5" ry="2.5" '
+                f'style="{SHAPE_STYLE}" width="80" x="{cx - 40}" y="{top}"></rect>'
+                + _text(cx - 30, top + 20, name)
+            )
+
+    notes = [
+        _note(10, rows[index] - 12) + _text(16, rows[index] + 5, "note")
+        for index in tables.notes
+    ]
+    body = "".join(lifelines + bars + headers + messages + notes)
+    return body, 140 + 120 * len(names), bottom + 50
+
+
+def _participant_name(line: str) -> str:
+    """The name a ``participant`` line declares (its alias, if it has one)."""
+    words = line.split()
+    if "as" in words[:-1]:
+        return words[words.index("as") + 1]
+    return words[1].strip('"') if len(words) > 1 else ""
+
+
+def _arrowhead(x: float, y: float, direction: int) -> str:
+    back = x - 10 * direction
+    return (
+        f'<polygon fill="#181818" points="{back},{y - 4},{x},{y},{back},{y + 4},'
+        f'{x - 6 * direction},{y}" style="{ACTIVATION_STYLE}"></polygon>'
+    )
@@ -145,3 +145,14 @@ class TestFindChangedLines:
             }
         }""")
         assert result["success"] is True
+
+
+# Tests that line-delta operations from the edit routes rebuild the puml.
+class TestApplyLineDelta:
+    def test_should_apply_operations_from_the_last_back(self, app_url, page):
+        result = page.evaluate("""() => applyLineDelta("a\\nb\\nc\\nd", [
+            {op: "insert", index: 1, count: 0, lines: ["x"]},
+            {op: "delete", index: 2, count: 1},
+            {op: "replace", index: 3, count: 1, lines: ["D", "E"]},
+        ])""")
+        assert result == "a\nx\nb\nD\nE"
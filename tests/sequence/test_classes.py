@@ -0,0 +1,73 @@
+# SPDX-License-Identifier: MIT
+#
+# MIT License
+#
+# Copyright (c) 2026 Ericsson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""Tests for the sorted participant and message lookups of a Diagram."""
+
+from plantuml_gui.sequence.classes import (
+    Message,
+    MessageIndex,
+    Participant,
+    ParticipantIndex,
+)
+
+ALICE = Participant("alice", cx=50, cy=10, x_origin=30, width=40)
+BOB = Participant("bob", cx=150, cy=10, x_origin=135, width=30)
+CAROL = Participant("carol", cx=250, cy=10, x_origin=230, width=40)
+
+
+class TestParticipantIndex:
+    def test_at_prefers_the_header_spanning_x(self):
+        lookup = ParticipantIndex([CAROL, ALICE, BOB])
+        assert lookup.at(40) is ALICE
+        assert lookup.at(165) is BOB
+        # Outside every header: the closest lifeline.
+        assert lookup.at(120) is BOB
+        assert lookup.at(-5) is ALICE
+
+    def test_nearest_ties_go_to_the_first_parsed(self):
+        assert ParticipantIndex([BOB, ALICE]).nearest(100) is BOB
+        assert ParticipantIndex([ALICE, BOB]).nearest(100) is ALICE
+        assert ParticipantIndex([]).nearest(100) is None
+
+
+class TestMessageIndex:
+    def setup_method(self):
+        self.messages = [
+            Message(ALICE, BOB, "first", cy=40, index=3),
+            Message(BOB, ALICE, "second", cy=70, index=5),
+            Message(ALICE, BOB, "third", cy=100, index=9),
+        ]
+        self.lookup = MessageIndex(self.messages)
+
+    def test_cy_above(self):
+        assert self.lookup.cy_above(3) is None
+        assert self.lookup.cy_above(4) == 40
+        assert self.lookup.cy_above(9) == 70
+        assert self.lookup.cy_above(50) == 100
+
+    def test_near(self):
+        assert self.lookup.near(65, 10) == [self.messages[1]]
+        assert self.lookup.near(55, 20) == self.messages[:2]
+        assert self.lookup.near(30, 10) == []
@@ -0,0 +1,100 @@
+# SPDX-License-Identifier: MIT
+#
+# MIT License
+#
+# Copyright (c) 2026 Ericsson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""Tests for the line tables of a sequence diagram's puml."""
+
+from plantuml_gui.sequence import lexer
+from plantuml_gui.sequence.lexer import MessageLine, sequence_lines
+
+PUML = """@startuml
+participant alice
+participant bob
+alice -> bob: hello -> there
+activate bob
+bob <- alice: go->back
+activate bob
+alice <-> bob: both
+deactivate bob
+note over alice : a note
+  note left : attached
+destroy bob
+@enduml"""
+
+
+class TestSequenceLines:
+    def test_tables(self):
+        tables = sequence_lines(PUML)
+        assert tables.participants == (1, 2)
+        assert tables.messages == (
+            MessageLine(3, "alice", "bob"),
+            MessageLine(5, "alice", "bob"),
+            MessageLine(7, "alice", "bob"),
+        )
+        assert tables.notes == (9, 10)
+        assert tables.note_line(2) == 10
+        assert tables.note_line(3) == -1
+        # Nested bars: the inner one closes first.
+        assert tables.activations == {"bob": ((6, 8, 1), (4, 11, 0))}
+
+    def test_message_ends_follow_the_arrow(self):
+        lines = [
+            "alice ->> bob",
+            "alice -[#red]> bob",
+            "alice -[dashed]-> bob : styled -> text",
+            "alice ->x bob",
+            "alice -\\\\ bob",
+            "alice -/ bob",
+            "bob \\\\- alice",
+            "bob //-- alice",
+            "bob x<- alice",
+            "bob <<-- alice",
+            "alice o<->o bob",
+        ]
+        for line in lines:
+            assert lexer._message(0, line) == MessageLine(0, "alice", "bob"), line
+
+    def test_boundary_and_unnamed_ends(self):
+        assert lexer._message(0, "[-> bob") == MessageLine(0, "", "bob")
+        assert lexer._message(0, "alice ->] : out") == MessageLine(0, "alice", "")
+        assert lexer._message(0, "?-> bob") == MessageLine(0, "", "bob")
+        # Dashes in a name are not a shaft without a head.
+        assert lexer._message(0, "foo-bar -> bob") == MessageLine(0, "foo-bar", "bob")
+        # A participant named with a leading o or x is not a capped head.
+        assert lexer._message(0, "alice -> xavier") == MessageLine(0, "alice", "xavier")
+        assert lexer._message(0, "note left : a -> b") == MessageLine(0, "", "")
+
+    def test_unmatched_close_is_ignored(self):
+        tables = sequence_lines("deactivate bob\nactivate bob\nactivate alice")
+        assert tables.activations == {}
+
+    def test_scanned_once_per_puml(self, monkeypatch):
+        scans = []
+        scan = lexer._scan
+        monkeypatch.setattr(
+            lexer, "_scan", lambda lines: scans.append(1) or scan(lines)
+        )
+        puml = PUML + "\n"
+        assert sequence_lines(puml) is sequence_lines(puml)
+        assert scans == [1]
@@ -33,6 +33,7 @@ from plantuml_gui.sequence.note import (
     get_note_text,
     index_of_clicked_note,
 )
+from plantuml_gui.sequence.util import extract_note_positions
 from plantuml_gui.shared.render import _create_svg_from_uml
 from pyquery import PyQuery as Pq
 
@@ -228,6 +229,18 @@ class TestIndexOfClickedNote:
         assert index_of_clicked_note(svg, svgelement) == 2
 
 
+class TestExtractNotePositions:
+    def test_pairs_drawn_notes_with_note_lines_in_order(self):
+        puml = "@startuml\nnote over A : one\nA -> B: m\n  note left : two\n@enduml"
+        note = (
+            '<path d="M10,{y} L60,{y}" fill="#FEFFDD"></path>'
+            '<path d="M50,{y} L60,{y}" fill="#FEFFDD"></path>'
+        )
+        svg = "".join(note.format(y=y) for y in (40, 90, 140))
+        # A third drawn note has no puml line left.
+        assert extract_note_positions(svg, puml) == [(40, 1), (90, 3), (140, -1)]
+
+
 class TestGetNoteText:
     def test_get_note_text(self):
         puml = "@startuml\nparticipant Alice\nparticipant Bob\nnote over Alice : My note\n@enduml"
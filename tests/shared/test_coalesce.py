@@ -0,0 +1,122 @@
+# SPDX-License-Identifier: MIT
+#
+# MIT License
+#
+# Copyright (c) 2026 Ericsson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Tests for per-session render coalescing."""
+
+import threading
+import time
+
+from flask import json
+from plantuml_gui.shared.coalesce import RenderCoalescer
+from plantuml_gui.shared.routes import render_coalescer
+
+
+def _wait_for(condition):
+    deadline = time.monotonic() + 5
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+class TestRenderCoalescer:
+    def test_renders_when_not_superseded(self):
+        coalescer = RenderCoalescer()
+        assert coalescer.run("s", 1, lambda: "svg1") == "svg1"
+        assert coalescer.sessions() == 0
+
+    def test_waiting_revision_is_dropped_for_newer_one(self):
+        coalescer = RenderCoalescer()
+        started = threading.Event()
+        release = threading.Event()
+        rendered = []
+        results = {}
+
+        def slow_render(revision):
+            def render():
+                rendered.append(revision)
+                started.set()
+                release.wait(5)
+                return f"svg{revision}"
+
+            return render
+
+        def submit(revision):
+            results[revision] = coalescer.run("s", revision, slow_render(revision))
+
+        first = threading.Thread(target=submit, args=(1,))
+        first.start()
+        started.wait(5)
+        second = threading.Thread(target=submit, args=(2,))
+        second.start()
+        _wait_for(lambda: coalescer._sessions["s"].latest == 2)
+        third = threading.Thread(target=submit, args=(3,))
+        third.start()
+        second.join(5)
+        assert results[2] is None
+        release.set()
+        first.join(5)
+        third.join(5)
+        assert results == {1: "svg1", 2: None, 3: "svg3"}
+        assert rendered == [1, 3]
+
+    def test_older_revision_is_dropped_on_arrival(self):
+        coalescer = RenderCoalescer()
+        release = threading.Event()
+        thread = threading.Thread(
+            target=coalescer.run, args=("s", 5, lambda: release.wait(5))
+        )
+        thread.start()
+        _wait_for(lambda: coalescer._sessions.get("s") is not None)
+        try:
+            assert coalescer.run("s", 4, lambda: "stale") is None
+        finally:
+            release.set()
+            thread.join(5)
+
+    def test_sessions_are_independent(self):
+        coalescer = RenderCoalescer()
+        assert coalescer.run("a", 9, lambda: "a") == "a"
+        assert coalescer.run("b", 1, lambda: "b") == "b"
+
+
+class TestRenderRouteCoalescing:
+    def test_superseded_render_returns_409(self, client):
+        release = threading.Event()
+        thread = threading.Thread(
+            target=render_coalescer.run, args=("tab", 2, lambda: release.wait(5))
+        )
+        thread.start()
+        _wait_for(lambda: render_coalescer._sessions.get("tab") is not None)
+        try:
+            response = client.post(
+                "/render",
+                data=json.dumps(
+                    {"plantuml": "@startuml\n@enduml", "session": "tab", "revision": 1}
+                ),
+                content_type="application/json",
+            )
+            assert response.status_code == 409
+        finally:
+            release.set()
+            thread.join(5)
@@ -0,0 +1,137 @@
+# SPDX-License-Identifier: MIT
+#
+# MIT License
+#
+# Copyright (c) 2026 Ericsson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Tests for the server-side document store and document references."""
+
+import time
+
+from flask import json
+from plantuml_gui.shared import documents, routes
+from plantuml_gui.shared.documents import DocumentStore, revision_of
+from plantuml_gui.shared.svg_fragment import svg_fragment
+
+PUML = """@startuml
+  start
+  :First;
+  :Second;
+  stop
+@enduml"""
+
+SVG = """<?xml version="1.0" encoding="us-ascii" standalone="no"?><svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" version="1.1"><defs/><g><ellipse cx="41" cy="20" fill="#222222" rx="10" ry="10" style="stroke:#222222;stroke-width:1.0;"/><rect fill="#F1F1F1" height="33.9688" rx="12.5" ry="12.5" style="stroke:#181818;stroke-width:0.5;" width="52" x="15" y="50"/><text fill="#000000" font-family="sans-serif" font-size="12" lengthAdjust="spacing" textLength="32" x="25" y="70.9688">First</text><rect fill="#F1F1F1" height="33.9688" rx="12.5" ry="12.5" style="stroke:#181818;stroke-width:0.5;" width="64" x="9" y="103.9688"/><text fill="#000000" font-family="sans-serif" font-size="12" lengthAdjust="spacing" textLength="44" x="19" y="124.9375">Second</text></g></svg>"""
+
+# The second activity as the browser posts it, with the hover colour applied.
+CLICKED = '<rect fill="#d8d8d8" height="33.9688" rx="12.5" ry="12.5" style="stroke:#181818;stroke-width:0.5;" width="64" x="9" y="103.9688"></rect>'
+
+
+def post(client, url, data):
+    return client.post(url, data=json.dumps(data), content_type="application/json")
+
+
+class TestDocumentStore:
+    def test_revision_is_a_content_hash(self):
+        store = DocumentStore(ttl=60)
+        one = store.put("a", "one", "<rect/>").revision
+        two = store.put("a", "two", "<rect/>").revision
+        assert one != two
+        assert store.put("b", "one", "<rect/>").revision == one
+        assert store.put("c", "one", "<ellipse/>").revision != one
+        assert store.get("a").puml == "two"
+
+    def test_stores_never_share_a_revision_for_other_text(self):
+        first, second = DocumentStore(ttl=60), DocumentStore(ttl=60)
+        assert first.put("a", "one", "").revision != second.put("a", "two", "").revision
+
+    def test_directory_is_read_by_every_store(self, tmp_path):
+        first = DocumentStore(ttl=60, directory=tmp_path)
+        second = DocumentStore(ttl=60, directory=tmp_path)
+        first.put("a", "P1", "")
+        issued = second.put("a", "P2", "").revision
+        first.put("a", "P3", "")
+        document = second.get("a")
+        assert document.puml == "P3"
+        assert document.revision == revision_of("P3", "")
+        assert document.revision != issued
+
+    def test_expired_documents_are_gone(self):
+        store = DocumentStore(ttl=60)
+        store.put("a", "one", "")
+        store.get("a").updated = time.time() - 61
+        assert store.get("a") is None
+        assert store.put("a", "two", "").revision == revision_of("two", "")
+
+    def test_directory_survives_restart(self, tmp_path):
+        DocumentStore(ttl=60, directory=tmp_path).put("../a", "one", "<rect/>")
+        document = DocumentStore(ttl=60, directory=tmp_path).get("../a")
+        assert (document.puml, document.svg) == ("one", "<rect/>")
+        assert document.revision == revision_of("one", "<rect/>")
+        assert not (tmp_path.parent / "a").exists()
+
+
+class TestDocumentRoutes:
+    def test_render_stores_document(self, client, monkeypatch):
+        monkeypatch.setattr(documents, "_document_store", DocumentStore(ttl=60))
+        monkeypatch.setattr(routes, "_create_svg_from_uml", lambda puml: SVG)
+        response = post(client, "/render", {"plantuml": PUML, "document": "tab"})
+        assert response.data.decode("utf-8") == SVG
+        assert response.headers["X-Document-Revision"] == revision_of(
+            PUML, svg_fragment(SVG)
+        )
+        document = documents.document_store().get("tab")
+        assert document.puml == PUML
+        assert document.svg == svg_fragment(SVG)
+
+    def test_edit_by_reference_matches_full_request(self, client, monkeypatch):
+        monkeypatch.setattr(documents, "_document_store", DocumentStore(ttl=60))
+        monkeypatch.setattr(routes, "_create_svg_from_uml", lambda puml: SVG)
+        rendered = post(client, "/render", {"plantuml": PUML, "document": "tab"})
+        revision = rendered.headers["X-Document-Revision"]
+        edit = {"svgelement": CLICKED, "newname": "Renamed"}
+        full = post(
+            client,
+            "/editText",
+            {**edit, "plantuml": documents.editor_text(PUML), "svg": svg_fragment(SVG)},
+        )
+        referenced = post(
+            client,
+            "/editText",
+            {**edit, "document": "tab", "revision": revision, "trimlines": True},
+        )
+        assert referenced.status_code == 200
+        assert referenced.data == full.data
+        assert ":Renamed;" in referenced.data.decode("utf-8")
+
+    def test_stale_revision_is_rejected(self, client, monkeypatch):
+        monkeypatch.setattr(documents, "_document_store", DocumentStore(ttl=60))
+        monkeypatch.setattr(routes, "_create_svg_from_uml", lambda puml: SVG)
+        rendered = post(client, "/render", {"plantuml": PUML, "document": "tab"})
+        revision = rendered.headers["X-Document-Revision"]
+        edited = PUML.replace(":First;", ":Renamed;")
+        post(client, "/render", {"plantuml": edited, "document": "tab"})
+        response = post(
+            client,
+            "/getText",
+            {"svgelement": CLICKED, "document": "tab", "revision": revision},
+        )
+        assert response.status_code == 409
+        assert response.get_json()["error"] == "document_stale"
@@ -0,0 +1,134 @@
+# SPDX-License-Identifier: MIT
+#
+# MIT License
+#
+# Copyright (c) 2026 Ericsson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""Tests for the counters of generated label numbers."""
+
+from flask import json
+from plantuml_gui.shared import documents, label_counters, routes
+from plantuml_gui.shared.documents import DocumentStore
+from plantuml_gui.shared.label_counters import (
+    LabelCounters,
+    edited_label_counters,
+    next_label,
+)
+
+PUML = """@startuml
+:Activity 3;
+fork
+:Activity 7;
+end fork
+-> Arrow label 2;
+switch (test?)
+case ( condition 4)
+endswitch
+@enduml"""
+
+SVG = "<svg><g></g></svg>"
+
+
+def post(client, url, data):
+    return client.post(url, data=json.dumps(data), content_type="application/json")
+
+
+def render(client, document, puml):
+    response = post(client, "/render", {"plantuml": puml, "document": document})
+    return response.headers["X-Document-Revision"]
+
+
+def add_activity(client, **reference):
+    return post(
+        client, "/addToFork", {**reference, "line": 3, "type": "activity"}
+    ).data.decode()
+
+
+class TestLabelCounters:
+    def test_one_past_the_highest_number(self):
+        assert label_counters.label_counters(PUML) == LabelCounters(
+            activity=7, arrow_label=2, case=4, participant=0
+        )
+        assert next_label(PUML, "activity") == 8
+        assert next_label("@startuml\n@enduml", "case") == 1
+        assert (
+            next_label("@startuml\nparticipant participant5\n@enduml", "participant")
+            == 6
+        )
+
+    def test_edit_scans_only_changed_lines(self, monkeypatch):
+        counters = label_counters.label_counters(PUML)
+        edited = PUML.replace(":Activity 7;", ":Activity 7;\n:Activity 12;")
+        scanned = []
+        scan = label_counters._scan
+        monkeypatch.setattr(
+            label_counters, "_scan", lambda puml: scanned.append(puml) or scan(puml)
+        )
+        assert edited_label_counters(counters, PUML, edited).activity == 12
+        assert scanned == [":Activity 12;"]
+
+    def test_numbers_stay_taken_after_deletion(self):
+        deleted = PUML.replace(":Activity 7;\n", "")
+        counters = label_counters.label_counters(PUML)
+        assert edited_label_counters(counters, PUML, deleted).activity == 7
+        # Without counters to carry, the puml is all there is.
+        assert label_counters.label_counters(deleted).activity == 3
+
+
+class TestDocumentLabels:
+    def test_document_keeps_numbers_across_revisions(self, client, monkeypatch):
+        monkeypatch.setattr(documents, "_document_store", DocumentStore(ttl=60))
+        monkeypatch.setattr(routes, "_create_svg_from_uml", lambda puml: SVG)
+        revision = render(client, "tab", PUML)
+        first = add_activity(client, document="tab", revision=revision)
+        assert ":Activity 8;" in first
+        render(client, "tab", first)
+        # Removing the new activity brings back the original text, but the
+        # document still has 8 taken.
+        revision = render(client, "tab", first.replace(":Activity 8;\n", ""))
+        second = add_activity(client, document="tab", revision=revision)
+        assert ":Activity 9;" in second
+
+    def test_documents_with_the_same_text_number_independently(
+        self, client, monkeypatch
+    ):
+        monkeypatch.setattr(documents, "_document_store", DocumentStore(ttl=60))
+        monkeypatch.setattr(routes, "_create_svg_from_uml", lambda puml: SVG)
+        render(client, "one", PUML)
+        render(client, "one", add_activity(client, plantuml=PUML))
+        render(client, "one", PUML)
+        revision = render(client, "two", PUML)
+        added = add_activity(client, document="two", revision=revision)
+        assert ":Activity 8;" in added
+        assert ":Activity 8;" in add_activity(client, plantuml=PUML)
+
+    def test_documents_on_disk_keep_their_numbers(self, client, monkeypatch, tmp_path):
+        store = DocumentStore(ttl=60, directory=tmp_path)
+        monkeypatch.setattr(documents, "_document_store", store)
+        monkeypatch.setattr(routes, "_create_svg_from_uml", lambda puml: SVG)
+        render(client, "tab", PUML.replace(":Activity 7;", ":Activity 11;"))
+        revision = render(client, "tab", PUML)
+        reread = DocumentStore(ttl=60, directory=tmp_path).get("tab")
+        assert reread.labels.activity == 11
+        assert ":Activity 12;" in add_activity(
+            client, document="tab", revision=revision
+        )
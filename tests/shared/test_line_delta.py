@@ -0,0 +1,131 @@
+# SPDX-License-Identifier: MIT
+#
+# MIT License
+#
+# Copyright (c) 2026 Ericsson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""Tests for line-delta responses from the edit routes."""
+
+import random
+
+from flask import json
+from plantuml_gui.shared import documents, routes
+from plantuml_gui.shared.documents import DocumentStore
+from plantuml_gui.shared.line_delta import (
+    apply_line_delta,
+    base_hash,
+    line_delta,
+    moved_line,
+)
+
+PUML = """@startuml
+:Activity 1;
+:Activity 2;
+@enduml"""
+
+SEQUENCE_PUML = """@startuml
+participant alice
+participant bob
+alice -> bob: m1
+bob -> alice: m2
+@enduml"""
+
+
+def post(client, url, data):
+    return client.post(url, data=json.dumps(data), content_type="application/json")
+
+
+class TestLineDelta:
+    def test_operations(self):
+        base = "a\nb\nc\nd"
+        assert line_delta(base, base) == []
+        assert line_delta(base, "a\nx\nb\nc\nd") == [
+            {"op": "insert", "index": 1, "count": 0, "lines": ["x"]}
+        ]
+        assert line_delta(base, "a\nd") == [{"op": "delete", "index": 1, "count": 2}]
+        assert line_delta(base, "a\nB\nc\nD") == [
+            {"op": "replace", "index": 1, "count": 1, "lines": ["B"]},
+            {"op": "replace", "index": 3, "count": 1, "lines": ["D"]},
+        ]
+
+    def test_applying_the_delta_restores_the_edit(self):
+        rng = random.Random(15)
+        words = ["if (a) then (yes)", ":x;", "endif", "", "stop"]
+        for _ in range(200):
+            base = "\n".join(rng.choices(words, k=rng.randrange(8)))
+            puml = "\n".join(rng.choices(words, k=rng.randrange(8)))
+            assert apply_line_delta(base, line_delta(base, puml)) == puml
+
+    def test_moved_line(self):
+        base = "a\nb\nc\nd\ne"
+        ops = line_delta(base, "x\na\nB\ne")  # insert x, c and d replaced by B
+        assert [moved_line(index, ops) for index in range(5)] == [1, 2, None, None, 3]
+        ops = line_delta(base, "a\nb\nC\nD\nE")
+        assert [moved_line(index, ops) for index in range(5)] == [0, 1, 2, 3, 4]
+
+
+class TestLineDeltaRoutes:
+    def test_activity_edit_returns_operations(self, client):
+        response = post(client, "/addTitle", {"plantuml": PUML, "delta": True})
+        assert response.headers["X-Line-Delta"] == "1"
+        delta = response.get_json()
+        assert delta == {
+            "base": base_hash(PUML),
+            "ops": [
+                {
+                    "op": "insert",
+                    "index": 1,
+                    "count": 0,
+                    "lines": ["title", "Placeholder Title", "endtitle"],
+                }
+            ],
+        }
+        full = post(client, "/addTitle", {"plantuml": PUML})
+        assert "X-Line-Delta" not in full.headers
+        assert apply_line_delta(PUML, delta["ops"]) == full.data.decode("utf-8")
+
+    def test_sequence_edit_names_its_field(self, client):
+        edit = {
+            "plantuml": SEQUENCE_PUML,
+            "participant": "bob",
+            "startMessageIndex": 3,
+            "endMessageIndex": 4,
+            "endType": "deactivate",
+        }
+        delta = post(client, "/addActivation", {**edit, "delta": True}).get_json()
+        full = post(client, "/addActivation", edit).get_json()
+        assert delta["field"] == "plantuml"
+        assert apply_line_delta(SEQUENCE_PUML, delta["ops"]) == full["plantuml"]
+
+    def test_delta_is_against_the_stored_document(self, client, monkeypatch):
+        monkeypatch.setattr(documents, "_document_store", DocumentStore(ttl=60))
+        monkeypatch.setattr(routes, "_create_svg_from_uml", lambda puml: "<svg/>")
+        indented = PUML.replace(":Activity", "  :Activity")
+        rendered = post(client, "/render", {"plantuml": indented, "document": "tab"})
+        revision = rendered.headers["X-Document-Revision"]
+        reference = {"document": "tab", "revision": revision, "trimlines": True}
+        delta = post(client, "/deleteTitle", {**reference, "delta": True}).get_json()
+        assert delta == {"base": base_hash(PUML), "ops": []}
+
+    def test_getters_ignore_delta(self, client):
+        response = post(client, "/getTextTitle", {"plantuml": PUML, "delta": True})
+        assert "X-Line-Delta" not in response.headers
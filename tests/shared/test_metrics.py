@@ -0,0 +1,213 @@
+# SPDX-License-Identifier: MIT
+#
+# MIT License
+#
+# Copyright (c) 2026 Ericsson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Tests for the Prometheus metrics and the /metrics route."""
+
+import json
+import os
+import time
+from subprocess import CompletedProcess, TimeoutExpired
+
+import pytest
+
+from plantuml_gui.shared import metrics as metrics_module
+from plantuml_gui.shared import render
+from plantuml_gui.shared.metrics import (
+    MetricsRegistry,
+    clear_shared_metrics,
+    exposition,
+    retire_shared_metrics,
+)
+from plantuml_gui.shared.render_pool import RenderTimeoutError
+
+
+@pytest.fixture()
+def registry(monkeypatch):
+    registry = MetricsRegistry()
+    monkeypatch.setattr(metrics_module, "_metrics", registry)
+    return registry
+
+
+@pytest.fixture()
+def uncached(monkeypatch, tmp_path):
+    monkeypatch.setenv("PLANTUML_JAR", str(tmp_path / "plantuml.jar"))
+    monkeypatch.setenv("PLANTUML_RENDER_CACHE_BYTES", "0")
+    monkeypatch.setenv("PLANTUML_POOL_SIZE", "0")
+
+
+class TestExposition:
+    def test_histogram_buckets_are_cumulative(self, registry):
+        registry.observe("plantuml_render_duration_seconds", 0.07, format="svg")
+        registry.observe("plantuml_render_duration_seconds", 3.0, format="svg")
+        registry.observe("plantuml_render_duration_seconds", 90.0, format="svg")
+        text = exposition([registry.snapshot()])
+        name = "plantuml_render_duration_seconds"
+        assert f'{name}_bucket{{format="svg",le="0.05"}} 0' in text
+        assert f'{name}_bucket{{format="svg",le="0.1"}} 1' in text
+        assert f'{name}_bucket{{format="svg",le="5"}} 2' in text
+        assert f'{name}_bucket{{format="svg",le="+Inf"}} 3' in text
+        assert f'{name}_sum{{format="svg"}} 93.07' in text
+        assert f'{name}_count{{format="svg"}} 3' in text
+        assert f"# TYPE {name} histogram" in text
+
+    def test_label_values_are_escaped(self, registry):
+        registry.inc("plantuml_cache_hits_total", cache='a"b\\c')
+        text = exposition([registry.snapshot()])
+        assert 'plantuml_cache_hits_total{cache="a\\"b\\\\c"} 1' in text
+
+    def test_hit_ratio(self, registry):
+        for hit in (True, True, True, False):
+            metrics_module.count_cache("render", hit)
+        text = exposition([registry.snapshot()])
+        assert 'plantuml_cache_hit_ratio{cache="render"} 0.75' in text
+
+
+class TestMultiprocess:
+    def test_files_of_other_processes_are_added(self, registry, tmp_path):
+        other = MetricsRegistry(tmp_path)
+        other.inc("plantuml_renders_total", format="svg", outcome="ok")
+        other.observe("plantuml_render_duration_seconds", 0.2, format="svg")
+        snapshot = other.snapshot()
+        (tmp_path / "metrics-1.json").write_text(json.dumps(snapshot))
+        (tmp_path / "metrics-2.json").write_text(json.dumps(snapshot))
+        own = MetricsRegistry(tmp_path)
+        own.inc("plantuml_renders_total", format="svg", outcome="ok")
+        text = exposition(own.snapshots())
+        assert 'plantuml_renders_total{format="svg",outcome="ok"} 3' in text
+        assert 'plantuml_render_duration_seconds_count{format="svg"} 2' in text
+
+    def test_flush_is_throttled(self, tmp_path):
+        registry = MetricsRegistry(tmp_path)
+        registry.inc("plantuml_renders_total", format="svg", outcome="ok")
+        registry.flush()
+        registry.inc("plantuml_renders_total", format="svg", outcome="ok")
+        registry.flush()
+        [path] = tmp_path.glob("metrics-*.json")
+        [[_, _, value]] = json.loads(path.read_text())["counters"]
+        assert value == 1
+        registry.flush(force=True)
+        [[_, _, value]] = json.loads(path.read_text())["counters"]
+        assert value == 2
+
+    def test_idle_process_is_flushed_when_the_interval_is_over(
+        self, tmp_path, monkeypatch
+    ):
+        monkeypatch.setattr(metrics_module, "FLUSH_INTERVAL", 0.2)
+        idle, scraper = MetricsRegistry(tmp_path), MetricsRegistry(tmp_path)
+        for _ in range(2):
+            idle.inc("plantuml_renders_total", format="svg", outcome="ok")
+            idle.flush()
+        # The second request's flush was held back, and no request follows.
+        counted = 'plantuml_renders_total{format="svg",outcome="ok"} 2'
+        assert counted not in exposition(scraper.snapshots())
+        deadline = time.monotonic() + 5
+        while counted not in exposition(scraper.snapshots()):
+            assert time.monotonic() < deadline
+            time.sleep(0.05)
+
+    def test_file_names_are_unique_per_process(self, tmp_path):
+        first, second = MetricsRegistry(tmp_path), MetricsRegistry(tmp_path)
+        assert first.file_name != second.file_name
+        assert first.file_name.startswith(f"metrics-{os.getpid()}-")
+
+    def test_reaped_worker_is_folded_into_retired_totals(
+        self, registry, tmp_path, monkeypatch
+    ):
+        monkeypatch.setenv("PLANTUML_METRICS_DIR", str(tmp_path))
+        snapshot = {"counters": [["plantuml_renders_total", {"format": "svg"}, 2]]}
+        for name in ("metrics-41-a.json", "metrics-42-b.json"):
+            (tmp_path / name).write_text(json.dumps(snapshot))
+        retire_shared_metrics(41)
+        retire_shared_metrics(42)
+        assert sorted(path.name for path in tmp_path.iterdir()) == [
+            "metrics-retired.json"
+        ]
+        own = MetricsRegistry(tmp_path)
+        assert 'plantuml_renders_total{format="svg"} 4' in exposition(own.snapshots())
+
+    def test_retired_file_is_not_counted_twice(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("PLANTUML_METRICS_DIR", str(tmp_path))
+        snapshot = {"counters": [["plantuml_renders_total", {"format": "svg"}, 2]]}
+        (tmp_path / "metrics-41-a.json").write_text(json.dumps(snapshot))
+        retire_shared_metrics(41)
+        # As if a scrape globbed the worker's file before it was removed.
+        (tmp_path / "metrics-41-a.json").write_text(json.dumps(snapshot))
+        own = MetricsRegistry(tmp_path)
+        assert 'plantuml_renders_total{format="svg"} 2' in exposition(own.snapshots())
+
+    def test_clear_removes_a_previous_run(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("PLANTUML_METRICS_DIR", str(tmp_path))
+        (tmp_path / "metrics-41-a.json").write_text("{}")
+        (tmp_path / "metrics-retired.json").write_text("{}")
+        (tmp_path / "unrelated.txt").write_text("")
+        clear_shared_metrics()
+        assert [path.name for path in tmp_path.iterdir()] == ["unrelated.txt"]
+
+
+class TestRoute:
+    def test_requests_are_counted_by_route(self, client, registry):
+        client.post("/encode", json={"plantuml": "@startuml\nstart\n@enduml"})
+        client.get("/no-such-route")
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.content_type.startswith("text/plain; version=0.0.4")
+        text = response.get_data(as_text=True)
+        assert (
+            'plantuml_http_requests_total{blueprint="shared",method="POST",'
+            'route="/encode",status="200"} 1'
+        ) in text
+        assert 'route="unmatched",status="404"} 1' in text
+        assert (
+            "plantuml_http_request_size_bytes_count"
+            '{blueprint="shared",route="/encode"} 1'
+        ) in text
+        assert (
+            "plantuml_http_request_duration_seconds_count"
+            '{blueprint="shared",route="/encode"} 1'
+        ) in text
+
+
+class TestRenderMetrics:
+    def test_outcomes(self, registry, uncached, monkeypatch):
+        def ok(command, **kwargs):
+            return CompletedProcess(command, 0, b"<svg/>", b"")
+
+        def syntax_error(command, **kwargs):
+            return CompletedProcess(command, 0, b"<svg/>", b"ERROR\n2\nSyntax Error?")
+
+        def timeout(command, **kwargs):
+            raise TimeoutExpired(command, kwargs["timeout"])
+
+        for run in (ok, syntax_error):
+            monkeypatch.setattr(render, "run", run)
+            render.render_diagram("@startuml\n@enduml", "svg")
+        monkeypatch.setattr(render, "run", timeout)
+        with pytest.raises(RenderTimeoutError):
+            render.render_diagram("@startuml\n@enduml", "svg")
+        text = exposition([registry.snapshot()])
+        for outcome in ("ok", "syntax_error", "timeout"):
+            assert (
+                f'plantuml_renders_total{{format="svg",outcome="{outcome}"}} 1' in text
+            )
+        assert 'plantuml_render_duration_seconds_count{format="svg"} 3' in text
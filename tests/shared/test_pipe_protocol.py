@@ -0,0 +1,112 @@
+# SPDX-License-Identifier: MIT
+#
+# MIT License
+#
+# Copyright (c) 2026 Ericsson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Tests for splitting PlantUML -pipe output into per-diagram results."""
+
+import io
+
+import pytest
+from plantuml_gui.shared.pipe_protocol import (
+    FrameReader,
+    encode_diagrams,
+    parse_error_report,
+    parse_frame,
+)
+
+DELIMITER = b"--end-of-diagram--"
+SVG = b'<?xml version="1.0"?><svg><g></g></svg>'
+PNG = b"\x89PNG\r\n\x1a\n....IEND\xaeB`\x82"
+
+
+class OneByteStream(io.BytesIO):
+    """A stream that hands out one byte per read, like a slow pipe."""
+
+    def read1(self, size=-1):
+        return super().read1(1)
+
+
+class TestFrameReader:
+    def test_several_frames_in_one_read(self):
+        stream = io.BytesIO(SVG + DELIMITER + b"\n" + PNG + DELIMITER + b"\n")
+        reader = FrameReader(stream, DELIMITER)
+        assert reader.read_frame() == SVG
+        assert reader.read_frame() == PNG
+
+    def test_delimiter_split_across_reads(self):
+        reader = FrameReader(OneByteStream(SVG + DELIMITER + b"\n"), DELIMITER)
+        assert reader.read_frame() == SVG
+
+    def test_crlf_after_delimiter(self):
+        reader = FrameReader(io.BytesIO(SVG + DELIMITER + b"\r\n"), DELIMITER)
+        assert reader.read_frame() == SVG
+
+    def test_end_of_stream(self):
+        reader = FrameReader(io.BytesIO(SVG), DELIMITER)
+        with pytest.raises(EOFError):
+            reader.read_frame()
+
+
+class TestParseFrame:
+    def test_svg_without_error(self):
+        result = parse_frame(SVG + b"\n")
+        assert not result.failed
+        assert result.data == SVG + b"\n"
+
+    def test_svg_with_error(self):
+        result = parse_frame(SVG + b"\nERROR\n3\nSyntax Error?\n")
+        assert result.failed
+        assert result.data == SVG
+        assert result.error_line == 3
+        assert result.error_messages == ["Syntax Error?"]
+
+    def test_png_with_error(self):
+        result = parse_frame(PNG + b"ERROR\n2\nSyntax Error?\n")
+        assert result.data == PNG
+        assert result.error_line == 2
+
+    def test_error_text_inside_svg_is_not_a_report(self):
+        svg = b"<svg><text>ERROR</text></svg>"
+        assert not parse_frame(svg).failed
+
+
+class TestParseErrorReport:
+    def test_not_a_report(self):
+        assert parse_error_report(b"") == (None, [])
+        assert parse_error_report(b"Some warning\n") == (None, [])
+
+    def test_report(self):
+        report = b"ERROR\n5\nSyntax Error?\nSome diagram description contains errors\n"
+        assert parse_error_report(report) == (
+            5,
+            ["Syntax Error?", "Some diagram description contains errors"],
+        )
+
+    def test_unparsable_line_number(self):
+        assert parse_error_report(b"ERROR\nunknown\n") == (-1, ["unknown"])
+
+
+def test_encode_diagrams():
+    assert encode_diagrams(["@startuml\n@enduml", "@startuml\n@enduml"]) == (
+        b"@startuml\n@enduml\n@startuml\n@enduml\n"
+    )
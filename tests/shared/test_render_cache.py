@@ -0,0 +1,116 @@
+# SPDX-License-Identifier: MIT
+#
+# MIT License
+#
+# Copyright (c) 2026 Ericsson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Tests for the content-addressed render cache."""
+
+import os
+
+import pytest
+from plantuml_gui.shared import render
+from plantuml_gui.shared.pipe_protocol import RenderResult
+from plantuml_gui.shared.render_cache import RenderCache, cache_key
+
+DIAGRAM = """@startuml
+:Activity;
+@enduml"""
+
+
+class TestCacheKey:
+    def test_same_inputs_same_key(self):
+        assert cache_key(DIAGRAM, "svg", "jar", "flag") == cache_key(
+            DIAGRAM, "svg", "jar", "flag"
+        )
+
+    def test_every_input_changes_the_key(self):
+        key = cache_key(DIAGRAM, "svg", "jar", "flag")
+        assert cache_key(DIAGRAM + " ", "svg", "jar", "flag") != key
+        assert cache_key(DIAGRAM, "png", "jar", "flag") != key
+        assert cache_key(DIAGRAM, "svg", "jar2", "flag") != key
+        assert cache_key(DIAGRAM, "svg", "jar", "flag2") != key
+
+
+class TestRenderCache:
+    def test_hit_and_miss_counters(self):
+        cache = RenderCache(1024)
+        assert cache.get("a") is None
+        cache.put("a", RenderResult(b"<svg/>"))
+        assert cache.get("a").data == b"<svg/>"
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["hit_ratio"]) == (1, 1, 0.5)
+
+    def test_evicts_least_recently_used_by_bytes(self):
+        cache = RenderCache(10)
+        cache.put("a", RenderResult(b"aaaa"))
+        cache.put("b", RenderResult(b"bbbb"))
+        cache.get("a")
+        cache.put("c", RenderResult(b"cccc"))
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+        assert cache.stats()["bytes"] == 8
+
+    def test_entry_larger_than_budget_is_not_kept(self):
+        cache = RenderCache(3)
+        cache.put("a", RenderResult(b"aaaa"))
+        assert cache.get("a") is None
+
+    def test_disk_tier_survives_new_instance(self, tmp_path):
+        result = RenderResult(b"<svg/>", 3, ["Syntax Error?"])
+        RenderCache(1024, tmp_path).put("a", result)
+        restarted = RenderCache(1024, tmp_path)
+        assert restarted.get("a") == result
+        assert restarted.stats()["disk_hits"] == 1
+        # Promoted to memory, so the next lookup is a memory hit.
+        restarted.get("a")
+        assert restarted.stats()["hits"] == 1
+
+    def test_corrupt_disk_entry_is_a_miss(self, tmp_path):
+        (tmp_path / "a").write_bytes(b"not a header")
+        assert RenderCache(1024, tmp_path).get("a") is None
+
+
+class TestRenderDiagramCache:
+    @pytest.fixture()
+    def cache(self, monkeypatch, tmp_path):
+        cache = RenderCache(1024)
+        monkeypatch.setattr(render, "_render_cache", cache)
+        monkeypatch.setenv("PLANTUML_JAR", str(tmp_path / "plantuml.jar"))
+        return cache
+
+    def test_cached_render_skips_plantuml(self, cache):
+        key = cache_key(
+            DIAGRAM,
+            "svg",
+            render._jar_version(os.environ["PLANTUML_JAR"]),
+            render.LIMIT_SIZE_FLAG,
+        )
+        cache.put(key, RenderResult(b"<svg>cached</svg>"))
+        # The jar does not exist, so only a cache hit can produce an image.
+        assert render._create_svg_from_uml(DIAGRAM) == "<svg>cached</svg>"
+
+    def test_stats_route(self, cache, client):
+        cache.get("missing")
+        response = client.get("/renderCacheStats")
+        assert response.get_json()["enabled"] is True
+        assert response.get_json()["misses"] == 1
@@ -0,0 +1,91 @@
+# SPDX-License-Identifier: MIT
+#
+# MIT License
+#
+# Copyright (c) 2026 Ericsson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Tests for render timeouts, JVM options and the structured render errors."""
+
+from subprocess import TimeoutExpired
+
+import pytest
+from flask import json
+from plantuml_gui.shared import render
+from plantuml_gui.shared.render_pool import RenderTimeoutError, WorkerDiedError
+
+
+@pytest.fixture()
+def uncached(monkeypatch, tmp_path):
+    monkeypatch.setenv("PLANTUML_JAR", str(tmp_path / "plantuml.jar"))
+    monkeypatch.setenv("PLANTUML_RENDER_CACHE_BYTES", "0")
+    monkeypatch.setenv("PLANTUML_POOL_SIZE", "0")
+
+
+def _post_render(client):
+    return client.post(
+        "/render",
+        data=json.dumps({"plantuml": "@startuml\n:Activity;\n@enduml"}),
+        content_type="application/json",
+    )
+
+
+class TestJvmOptions:
+    def test_default_options(self, uncached):
+        command = render._plantuml_command("svg")
+        assert command[:3] == ["java", "-Xmx1g", "-XX:+UseSerialGC"]
+
+    def test_options_from_environment(self, uncached, monkeypatch):
+        monkeypatch.setenv("PLANTUML_JVM_OPTIONS", "-Xmx256m -Xss2m")
+        command = render._plantuml_command("svg")
+        assert command[:3] == ["java", "-Xmx256m", "-Xss2m"]
+        assert command[-2:] == ["-pipe", "-tsvg"]
+
+
+class TestRenderTimeout:
+    def test_one_shot_timeout_raises(self, uncached, monkeypatch):
+        def run(command, **kwargs):
+            raise TimeoutExpired(command, kwargs["timeout"])
+
+        monkeypatch.setattr(render, "run", run)
+        with pytest.raises(RenderTimeoutError):
+            render.render_diagram("@startuml\n@enduml", "svg")
+
+    def test_timeout_is_a_structured_504(self, client, uncached, monkeypatch):
+        def run(command, **kwargs):
+            raise TimeoutExpired(command, kwargs["timeout"])
+
+        monkeypatch.setattr(render, "run", run)
+        response = _post_render(client)
+        assert response.status_code == 504
+        assert response.get_json()["error"] == "render_timeout"
+        assert "within" in response.get_json()["message"]
+
+    def test_dead_worker_is_a_structured_500(self, client, uncached, monkeypatch):
+        def run(command, **kwargs):
+            raise WorkerDiedError("PlantUML closed its output")
+
+        monkeypatch.setattr(render, "run", run)
+        response = _post_render(client)
+        assert response.status_code == 500
+        assert response.get_json() == {
+            "error": "render_failed",
+            "message": "PlantUML closed its output",
+        }
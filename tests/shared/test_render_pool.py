@@ -0,0 +1,114 @@
+# SPDX-License-Identifier: MIT
+#
+# MIT License
+#
+# Copyright (c) 2026 Ericsson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Tests for the warm PlantUML worker pool behind /render and /renderPNG."""
+
+from subprocess import PIPE, run
+
+import pytest
+from plantuml_gui.shared.render import _plantuml_command, _single_diagram
+from plantuml_gui.shared.render_pool import RenderPool, RenderTimeoutError
+
+DIAGRAM = """@startuml
+:Activity;
+@enduml"""
+
+
+def _one_shot(uml, output_format):
+    process = run(
+        _plantuml_command(output_format),
+        stdout=PIPE,
+        stderr=PIPE,
+        input=bytes(uml, "utf-8"),
+        check=False,
+    )
+    return process.stdout
+
+
+class TestSingleDiagram:
+    def test_single_block(self):
+        assert _single_diagram(DIAGRAM) == DIAGRAM
+
+    def test_surrounding_blank_lines_are_dropped(self):
+        assert _single_diagram("\n" + DIAGRAM + "\n\n") == DIAGRAM
+
+    def test_missing_enduml(self):
+        assert _single_diagram("@startuml\n:Activity;") is None
+
+    def test_two_diagrams(self):
+        assert _single_diagram(DIAGRAM + "\n" + DIAGRAM) is None
+
+    def test_text_outside_block(self):
+        assert _single_diagram(":Activity;\n" + DIAGRAM) is None
+
+
+class TestRenderPool:
+    def test_same_output_as_one_shot(self):
+        pool = RenderPool(_plantuml_command("svg"), 1, 60)
+        try:
+            expected = _one_shot(DIAGRAM, "svg")
+            assert pool.render(DIAGRAM).data == expected
+            # The second render reuses the warm process.
+            assert pool.render(DIAGRAM).data == expected
+        finally:
+            pool.close()
+
+    def test_png(self):
+        pool = RenderPool(_plantuml_command("png"), 1, 60)
+        try:
+            assert pool.render(DIAGRAM).data.startswith(b"\x89PNG")
+        finally:
+            pool.close()
+
+    def test_crashed_worker_is_replaced(self):
+        pool = RenderPool(_plantuml_command("svg"), 1, 60)
+        try:
+            worker = pool._idle.get()
+            worker.process.kill()
+            worker.process.wait()
+            pool._idle.put(worker)
+            assert b"<svg" in pool.render(DIAGRAM).data
+        finally:
+            pool.close()
+
+    def test_timeout_kills_worker(self):
+        pool = RenderPool(_plantuml_command("svg"), 1, 0.001)
+        try:
+            with pytest.raises(RenderTimeoutError):
+                pool.render(DIAGRAM)
+            pool.timeout = 60
+            assert b"<svg" in pool.render(DIAGRAM).data
+        finally:
+            pool.close()
+
+    def test_syntax_error_is_reported_per_diagram(self):
+        pool = RenderPool(_plantuml_command("svg"), 1, 60)
+        try:
+            broken = "@startuml\n:Activity;\nif (x) then\n@enduml"
+            results = pool.render_many([DIAGRAM, broken, DIAGRAM])
+            assert [result.failed for result in results] == [False, True, False]
+            assert results[1].error_line is not None
+            assert all(b"<svg" in result.data for result in results)
+        finally:
+            pool.close()
@@ -0,0 +1,149 @@
+# SPDX-License-Identifier: MIT
+#
+# MIT License
+#
+# Copyright (c) 2026 Ericsson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Tests for the bounded render scheduler and its 503 back-pressure."""
+
+import threading
+import time
+
+import pytest
+from flask import json
+from plantuml_gui.shared import render
+from plantuml_gui.shared.scheduler import RenderBusyError, RenderScheduler
+
+
+def _hold_slot(scheduler, started, release):
+    with scheduler.slot():
+        started.set()
+        release.wait(5)
+
+
+def _wait_for(condition):
+    deadline = time.monotonic() + 5
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+class TestRenderScheduler:
+    def test_slots_are_released(self):
+        scheduler = RenderScheduler(1, 0, 1)
+        for _ in range(3):
+            with scheduler.slot():
+                assert scheduler.stats()["active"] == 1
+        stats = scheduler.stats()
+        assert (stats["active"], stats["admitted"], stats["rejected"]) == (0, 3, 0)
+
+    def test_full_queue_is_rejected_at_once(self):
+        scheduler = RenderScheduler(1, 0, 5)
+        started, release = threading.Event(), threading.Event()
+        holder = threading.Thread(target=_hold_slot, args=(scheduler, started, release))
+        holder.start()
+        started.wait(5)
+        try:
+            begin = time.monotonic()
+            with pytest.raises(RenderBusyError) as error:
+                with scheduler.slot():
+                    pass
+            assert time.monotonic() - begin < 1
+            assert error.value.retry_after >= 1
+            assert scheduler.stats()["rejected"] == 1
+        finally:
+            release.set()
+            holder.join(5)
+
+    def test_queued_render_runs_when_slot_frees(self):
+        scheduler = RenderScheduler(1, 1, 5)
+        started, release = threading.Event(), threading.Event()
+        holder = threading.Thread(target=_hold_slot, args=(scheduler, started, release))
+        holder.start()
+        started.wait(5)
+        ran = []
+
+        def queued():
+            with scheduler.slot():
+                ran.append(True)
+
+        waiter = threading.Thread(target=queued)
+        waiter.start()
+        _wait_for(lambda: scheduler.stats()["queue_depth"] == 1)
+        release.set()
+        waiter.join(5)
+        holder.join(5)
+        stats = scheduler.stats()
+        assert ran == [True]
+        assert stats["max_queue_depth"] == 1
+        assert stats["max_wait_seconds"] > 0
+
+    def test_wait_timeout(self):
+        scheduler = RenderScheduler(1, 1, 0.01)
+        started, release = threading.Event(), threading.Event()
+        holder = threading.Thread(target=_hold_slot, args=(scheduler, started, release))
+        holder.start()
+        started.wait(5)
+        try:
+            with pytest.raises(RenderBusyError):
+                with scheduler.slot():
+                    pass
+            assert scheduler.stats()["queue_depth"] == 0
+        finally:
+            release.set()
+            holder.join(5)
+
+
+class TestConcurrencyDefault:
+    def test_follows_pool_size(self, monkeypatch):
+        monkeypatch.setenv("PLANTUML_POOL_SIZE", "3")
+        monkeypatch.delenv("PLANTUML_MAX_CONCURRENT_RENDERS", raising=False)
+        assert render._max_concurrent_renders() == 3
+
+    def test_capped_at_pool_size(self, monkeypatch):
+        monkeypatch.setenv("PLANTUML_POOL_SIZE", "2")
+        monkeypatch.setenv("PLANTUML_MAX_CONCURRENT_RENDERS", "4")
+        assert render._max_concurrent_renders() == 2
+        monkeypatch.setenv("PLANTUML_MAX_CONCURRENT_RENDERS", "1")
+        assert render._max_concurrent_renders() == 1
+
+    def test_without_pool(self, monkeypatch):
+        monkeypatch.setenv("PLANTUML_POOL_SIZE", "0")
+        monkeypatch.delenv("PLANTUML_MAX_CONCURRENT_RENDERS", raising=False)
+        assert render._max_concurrent_renders() == render.DEFAULT_MAX_CONCURRENT_RENDERS
+
+
+class TestRenderRouteBackPressure:
+    def test_saturated_render_returns_503(self, client, monkeypatch):
+        scheduler = RenderScheduler(0, 0, 1)
+        monkeypatch.setattr(render, "_render_scheduler", scheduler)
+        monkeypatch.setenv("PLANTUML_RENDER_CACHE_BYTES", "0")
+        response = client.post(
+            "/render",
+            data=json.dumps({"plantuml": "@startuml\n@enduml"}),
+            content_type="application/json",
+        )
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+
+    def test_queue_stats_route(self, client):
+        stats = client.get("/renderQueueStats").get_json()
+        assert {"active", "queue_depth", "mean_wait_seconds"} <= stats.keys()
@@ -0,0 +1,163 @@
+# SPDX-License-Identifier: MIT
+#
+# MIT License
+#
+# Copyright (c) 2026 Ericsson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Tests for the pre-fork server and the health and readiness routes."""
+
+import json
+import os
+import re
+import signal
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from subprocess import CompletedProcess
+
+import pytest
+
+from plantuml_gui.server import PooledWSGIServer, serve
+from plantuml_gui.shared import render
+
+
+@pytest.fixture()
+def cold(monkeypatch, tmp_path):
+    monkeypatch.setenv("PLANTUML_JAR", str(tmp_path / "plantuml.jar"))
+    monkeypatch.setenv("PLANTUML_POOL_SIZE", "0")
+    monkeypatch.setattr(render, "_renderer_warm", threading.Event())
+    monkeypatch.setattr(render, "_renderer_error", None)
+
+
+def _get(url):
+    with urllib.request.urlopen(url, timeout=10) as response:
+        return json.load(response)
+
+
+class TestProbes:
+    def test_healthz(self, client):
+        response = client.get("/healthz")
+        assert response.status_code == 200
+        assert response.get_json() == {"status": "ok", "pid": os.getpid()}
+
+    def test_readyz_is_503_until_warm(self, client, cold):
+        response = client.get("/readyz")
+        assert response.status_code == 503
+        assert response.get_json() == {"ready": False, "renderer": "cold"}
+
+    def test_warm_renderer(self, client, cold, monkeypatch):
+        monkeypatch.setattr(
+            render,
+            "run",
+            lambda command, **kwargs: CompletedProcess(command, 0, b"<svg/>", b""),
+        )
+        assert render.warm_renderer()
+        response = client.get("/readyz")
+        assert response.status_code == 200
+        assert response.get_json() == {"ready": True, "renderer": "warm"}
+
+    def test_failed_warm_up_is_reported(self, client, cold, monkeypatch):
+        def run(command, **kwargs):
+            raise FileNotFoundError(2, "No such file or directory", "java")
+
+        monkeypatch.setattr(render, "run", run)
+        assert not render.warm_renderer()
+        response = client.get("/readyz")
+        assert response.status_code == 503
+        assert response.get_json()["renderer"] == "failed"
+        assert response.get_json()["error"].startswith("FileNotFoundError")
+
+
+class TestPooledWSGIServer:
+    def test_serves_on_its_threads(self):
+        server = PooledWSGIServer("127.0.0.1", 0, threads=2)
+        serving = threading.Thread(target=server.serve_forever, daemon=True)
+        serving.start()
+        try:
+            url = f"http://127.0.0.1:{server.port}/healthz"
+            for _ in range(5):
+                assert _get(url)["status"] == "ok"
+        finally:
+            server.shutdown()
+            server.server_close()
+            server.finish_requests()
+            serving.join()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="serve needs os.fork()")
+class TestServe:
+    def test_several_workers_need_a_document_directory(self, monkeypatch):
+        monkeypatch.delenv("PLANTUML_DOCUMENT_DIR", raising=False)
+        with pytest.raises(SystemExit, match="PLANTUML_DOCUMENT_DIR"):
+            serve(port=0, workers=2)
+
+    def test_reload_and_stop(self, tmp_path):
+        env = {
+            **os.environ,
+            "PLANTUML_POOL_SIZE": "0",
+            "PLANTUML_JAR": "",
+            "PLANTUML_DOCUMENT_DIR": str(tmp_path),
+        }
+        process = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "plantuml_gui",
+                "serve",
+                "--port",
+                "0",
+                "--workers",
+                "2",
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+            env=env,
+        )
+        assert process.stderr is not None
+        try:
+            for line in process.stderr:
+                match = re.search(r"Listening on (http://\S+)", line)
+                if match:
+                    break
+            assert match
+            url = match[1]
+            started = [process.stderr.readline() for _ in range(2)]
+            old = {int(line.split("Started worker ")[1]) for line in started}
+            assert _get(url + "/healthz")["pid"] in old
+
+            process.send_signal(signal.SIGHUP)
+            for line in process.stderr:
+                if "Reloaded" in line:
+                    break
+            # Old workers may answer until they have stopped listening.
+            deadline = time.monotonic() + 10
+            while _get(url + "/healthz")["pid"] in old:
+                assert time.monotonic() < deadline
+
+            process.send_signal(signal.SIGTERM)
+            assert process.wait(timeout=30) == 0
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
@@ -0,0 +1,112 @@
+# SPDX-License-Identifier: MIT
+#
+# MIT License
+#
+# Copyright (c) 2026 Ericsson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Tests for the streaming SVG scanner."""
+
+import pytest
+from plantuml_gui.sequence.classes import Diagram
+from plantuml_gui.shared import svg_scan
+from plantuml_gui.shared.svg_scan import first_element, scan_svg
+
+FRAGMENT = (
+    '<rect height="33.9688" x="74.5" y="50"></rect>'
+    '<text textLength="43" x="84.5" y="70.9688">An\n  activity&nbsp;&nbsp;label</text>'
+    '<a href="https://example.com"><text x="1" y="2">link</text></a>'
+    "<!--note-->"
+    '<polygon points="1,2,3,4"></polygon>'
+)
+
+
+class TestScanSvg:
+    def test_elements_in_document_order(self):
+        elements = list(scan_svg(FRAGMENT))
+        assert [e.tag for e in elements] == ["rect", "text", "a", "text", "", "polygon"]
+        assert elements[0].attrs == {"height": "33.9688", "x": "74.5", "y": "50"}
+        assert elements[0].number("y") == 50.0
+
+    def test_text_is_squashed_like_pyquery(self):
+        text = list(scan_svg(FRAGMENT))[1]
+        assert text.text == "An activity\xa0\xa0label"
+        # HTML parsing lowercases attribute names, as PyQuery's fallback did.
+        assert "textlength" in text.attrs
+
+    def test_siblings_and_children_are_linked(self):
+        rect, text, link, link_text, comment, polygon = scan_svg(FRAGMENT)
+        assert rect.next is text
+        assert text.next is link
+        assert link.first_child is link_text
+        assert link_text.next is None
+        assert link.next is comment
+        assert comment.next is polygon
+        assert polygon.next is None
+
+    def test_elements_split_across_chunks(self, monkeypatch):
+        monkeypatch.setattr(svg_scan, "CHUNK_SIZE", 7)
+        elements = list(scan_svg(FRAGMENT * 3))
+        assert [e.tag for e in elements] == [
+            "rect",
+            "text",
+            "a",
+            "text",
+            "",
+            "polygon",
+        ] * 3
+        assert elements[7].text == "An activity\xa0\xa0label"
+        assert elements[5].next is elements[6]
+
+    def test_empty_input(self):
+        assert list(scan_svg("  ")) == []
+
+    def test_first_element(self):
+        assert first_element(FRAGMENT, "polygon").attrs["points"] == "1,2,3,4"
+        assert first_element('<rect fill="#d8d8d8" x="1" y="2"></rect>').tag == "rect"
+        with pytest.raises(ValueError):
+            first_element(FRAGMENT, "ellipse")
+
+
+class TestSequenceDiagramFromScan:
+    def test_participants_and_messages(self):
+        participant = (
+            '<rect height="30" style="stroke:#181818;stroke-width:0.5;" width="{w}" '
+            'x="{x}" y="5"></rect><text x="{x}" y="25">{name}</text>'
+        )
+        svg = (
+            participant.format(w=46, x=5, name="Alice")
+            + participant.format(w=40, x=108, name="Bob")
+            + '<polygon points="111,63,121,67,111,71,115,67"></polygon>'
+            + '<line x1="28" x2="117" y1="67.4" y2="67.4"></line>'
+            + '<text x="35" y="62">hello</text>'
+        )
+        puml = "@startuml\nparticipant Alice\nparticipant Bob\nAlice -> Bob: hello\n@enduml"
+        diagram = Diagram.from_svg(svg, puml)
+        assert [(p.name, p.cx, p.index) for p in diagram.participants] == [
+            ("Alice", 28.0, 1),
+            ("Bob", 128.0, 2),
+        ]
+        [message] = diagram.messages
+        assert (message.from_participant.name, message.to_participant.name) == (
+            "Alice",
+            "Bob",
+        )
+        assert (message.message, message.cy, message.index) == ("hello", 67.4, 3)
@@ -0,0 +1,118 @@
+# SPDX-License-Identifier: MIT
+#
+# MIT License
+#
+# Copyright (c) 2026 Ericsson
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""Tests for per-request stage timing and the Server-Timing header."""
+
+import time
+
+import pytest
+from flask import Response
+from loguru import logger
+from plantuml_gui.app import app
+from plantuml_gui.shared.timing import (
+    finish_request_timing,
+    stage,
+    start_request_timing,
+)
+
+PUML = "@startuml\n:First;\n:Second;\n@enduml"
+SVG = (
+    '<rect fill="#F1F1F1" height="33.9688" style="stroke:#181818;stroke-width:0.5;" '
+    'width="63" x="10" y="10"></rect><text x="20" y="30">First</text>'
+    '<rect fill="#F1F1F1" height="33.9688" style="stroke:#181818;stroke-width:0.5;" '
+    'width="63" x="10" y="60"></rect><text x="20" y="80">Second</text>'
+)
+
+
+def delete_first(client, title):
+    # A title of its own per test, so the puml is not scanned already.
+    return client.post(
+        "/deleteActivity",
+        json={
+            "plantuml": PUML.replace("@startuml", f"@startuml\ntitle {title}"),
+            "svg": SVG,
+            "svgelement": '<rect x="10" y="10"></rect>',
+            "delta": True,
+        },
+    )
+
+
+def durations(header):
+    return {
+        name: float(duration.removeprefix("dur="))
+        for name, duration in (entry.split(";") for entry in header.split(", "))
+    }
+
+
+@pytest.fixture()
+def timed(monkeypatch):
+    monkeypatch.setenv("PLANTUML_SERVER_TIMING", "1")
+
+
+class TestServerTiming:
+    def test_off_by_default(self, client, monkeypatch):
+        monkeypatch.delenv("PLANTUML_SERVER_TIMING", raising=False)
+        response = delete_first(client, "off")
+        assert response.status_code == 200
+        assert "Server-Timing" not in response.headers
+
+    def test_edit_lists_its_stages(self, client, timed):
+        response = delete_first(client, "stages")
+        stages = durations(response.headers["Server-Timing"])
+        assert list(stages)[0] == "json"
+        assert {"svg", "puml", "delta"} <= set(stages)
+        assert list(stages)[-1] == "total"
+        assert all(ms <= stages["total"] for ms in stages.values())
+
+    def test_nested_stage_is_counted_once(self, timed):
+        with app.test_request_context():
+            start_request_timing()
+            with stage("svg"):
+                with stage("svg"):
+                    time.sleep(0.02)
+            header = finish_request_timing(Response()).headers["Server-Timing"]
+        stages = durations(header)
+        assert 20 <= stages["svg"] <= stages["total"]
+
+    def test_stage_outside_a_request_does_nothing(self):
+        with stage("puml"):
+            pass
+
+
+class TestTimingLog:
+    def test_one_structured_line_per_request(self, client, monkeypatch):
+        monkeypatch.delenv("PLANTUML_SERVER_TIMING", raising=False)
+        monkeypatch.setenv("PLANTUML_TIMING_LOG", "1")
+        records = []
+        sink = logger.add(lambda message: records.append(message.record))
+        try:
+            response = delete_first(client, "log")
+        finally:
+            logger.remove(sink)
+        assert "Server-Timing" not in response.headers
+        (record,) = records
+        assert record["extra"]["path"] == "/deleteActivity"
+        assert record["extra"]["status"] == 200
+        assert "puml" in record["extra"]["stages"]